@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+accents.py
+
+Local accent restoration for learner input: "etre bien" -> "être bien".
+
+Every word from these sources is counted under its accent-folded key:
+
+  - the site: verb pages, hints and stories (search_index.iter_section_docs)
+    and the French columns of the vocabulary CSVs, examples.csv included;
+  - every form conjugator.py produces for the top verbs;
+  - the examples table, when NEON_DATABASE_URL is set (skip with --no-db);
+  - French word lists: --wordlist PATH, ACCENTS_WORDLIST (os.pathsep
+    separated) or the first of WORDLISTS found on the machine.  A line is
+    "word", "word<whitespace>count" (frequency lists) or hunspell's
+    "word/FLAGS"; plain entries count once, so they add spellings the site
+    never uses without outweighing the ones it does.
+
+  etre   -> être:412
+  marche -> marche:31, marché:18
+
+A word is restored only when its key has one spelling, or one that clearly
+dominates ("la" over "là") and is not beaten by the learner's own valid
+spelling; "marche" / "marché" stays ambiguous and is left to the caller.
+french-corrector.py --prescreen uses this to answer accent-only fixes
+without calling the API (it cannot tell a sentence is grammatical, so that
+is opt-in); api_app.py restores /examples and /pronounce queries with it
+before they go further.
+
+Build (run from the repo root, next to search_index.py):
+  python3 accents.py
+
+  python3 accents.py --wordlist /usr/share/dict/french --no-db
+  python3 accents.py --query "la cuillere a cafe"     # restore and time one text
+
+  Writes search-index/accents.tsv: sorted "key<TAB>spelling:count,..." lines.
+  The file is memory-mapped and binary searched per word (like the search
+  shards), so loading it costs nothing even with a full word list, and each
+  key is decoded once and then served from an LRU cache.  Without it the
+  index is built in memory on first use.
+
+Query:
+  from accents import get_accent_index
+  get_accent_index().restore("etre bien dans ses baskets")
+    -> ("être bien dans ses baskets", True)   # False if a word was unknown/ambiguous
+"""
+
+import argparse
+import csv
+import mmap
+import os
+import re
+import sys
+import time
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+
+from search_index import INDEX_DIR, SECTIONS, STATIC_DIR, fold, iter_section_docs
+
+ACCENTS_TSV = INDEX_DIR / "accents.tsv"
+
+# Vocabulary CSV headers holding French text (English glosses stay out:
+# "piece" must not compete with "pièce").
+FRENCH_COLUMNS = {"french", "expression_française", "exemple_fr"}
+
+# Used when neither --wordlist nor ACCENTS_WORDLIST is given
+WORDLISTS = (
+    Path("/usr/share/dict/french"),
+    Path("/usr/share/hunspell/fr_FR.dic"),
+    Path("/usr/share/hunspell/fr.dic"),
+)
+
+# Keys decoded from the memory-mapped TSV and kept
+LOOKUP_CACHE_SIZE = 65536
+
+WORD_RE = re.compile(r"[^\W\d_]+")
+
+# A spelling wins over the others under the same key only with this share
+# of the occurrences.
+DOMINANT_SHARE = 0.95
+
+
+def _iter_vocabulary():
+    """Yield the French cells of every vocabulary CSV."""
+    for csv_path in sorted(STATIC_DIR.glob("*-vocabulary/*.csv")):
+        with csv_path.open("r", encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
+            header = [h.strip().lower() for h in next(reader, [])]
+            columns = [i for i, h in enumerate(header) if h in FRENCH_COLUMNS]
+            for row in reader:
+                for i in columns:
+                    if i < len(row):
+                        yield row[i]
+
+
+def _iter_examples_table():
+    """Yield expressions and French sentences from the examples table."""
+    dsn = os.getenv("NEON_DATABASE_URL")
+    if not dsn:
+        return
+    try:
+        import psycopg
+    except ImportError:
+        print("[INFO] psycopg not installed, skipping the examples table", file=sys.stderr)
+        return
+    try:
+        with psycopg.connect(dsn) as conn, conn.cursor(name="accents") as cur:
+            cur.execute("SELECT expression, french FROM examples")
+            for expression, french in cur:
+                yield expression
+                yield french
+    except psycopg.Error as e:
+        print(f"[ERROR] examples table: {e}", file=sys.stderr)
+
+
+def default_wordlists() -> list[Path]:
+    env = os.getenv("ACCENTS_WORDLIST")
+    if env:
+        return [Path(p) for p in env.split(os.pathsep) if p]
+    return [p for p in WORDLISTS if p.exists()][:1]
+
+
+def read_wordlist(path: Path) -> Counter:
+    """Lowercase word -> count from a plain, frequency or hunspell .dic list."""
+    counts = Counter()
+    with path.open(encoding="utf-8", errors="replace") as f:
+        for n, line in enumerate(f):
+            fields = line.split()
+            if not fields or line.startswith("#"):
+                continue
+            if n == 0 and path.suffix == ".dic" and fields[0].isdigit():
+                continue  # hunspell's entry count
+            word = fields[0].split("/", 1)[0].lower()
+            if not WORD_RE.fullmatch(word):
+                continue
+            count = int(fields[1]) if len(fields) > 1 and fields[1].isdigit() else 1
+            counts[word] += count
+    return counts
+
+
+def _iter_corpus(use_db: bool = True):
+    """Yield text from the site, the conjugation engine and the examples table."""
+    for section in SECTIONS:
+        if section == "vocab":
+            continue  # read below, French columns only
+        for _meta, text in iter_section_docs(section):
+            yield text
+    yield from _iter_vocabulary()
+
+    from conjugator import ConjugationError, get_conjugator
+    conj = get_conjugator()
+    for inf in conj.index:
+        try:
+            forms = conj.conjugate(inf)["forms"]
+        except ConjugationError:
+            continue
+        for value in forms.values():
+            if isinstance(value, dict):
+                yield " ".join(value.values())
+            elif value:
+                yield value
+
+    if use_db:
+        yield from _iter_examples_table()
+
+
+def count_words(texts, wordlists=()) -> dict[str, Counter]:
+    """key -> Counter of lowercase spellings."""
+    index = {}
+    for text in texts:
+        for word in WORD_RE.findall(text.lower()):
+            index.setdefault(fold(word), Counter())[word] += 1
+    for path in wordlists:
+        for word, n in read_wordlist(path).items():
+            index.setdefault(fold(word), Counter())[word] += n
+    return index
+
+
+class AccentIndex:
+    def __init__(self, index: dict[str, list[tuple[str, int]]]):
+        # key -> [(spelling, count), ...], most frequent first
+        self.index = index
+
+    @classmethod
+    def build(cls, texts=None, wordlists=None, use_db: bool = True) -> "AccentIndex":
+        if texts is None:
+            texts = _iter_corpus(use_db)
+        counts = count_words(texts, default_wordlists() if wordlists is None else wordlists)
+        return cls({key: c.most_common() for key, c in counts.items()})
+
+    @classmethod
+    def load(cls, path: Path = ACCENTS_TSV) -> "AccentIndex":
+        index = {}
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                key, _, rest = line.rstrip("\n").partition("\t")
+                index[key] = [(s, int(n)) for s, _, n in (c.rpartition(":") for c in rest.split(","))]
+        return cls(index)
+
+    def save(self, path: Path = ACCENTS_TSV):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lines = sorted(f"{key}\t{','.join(f'{s}:{n}' for s, n in cands)}\n" for key, cands in self.index.items())
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text("".join(lines), encoding="utf-8")
+        tmp.replace(path)
+
+    def lookup(self, key: str) -> list[tuple[str, int]]:
+        """[(spelling, count), ...] for an accent-folded key, most frequent first."""
+        return self.index.get(key, [])
+
+    def candidates(self, word: str) -> list[str]:
+        """Known spellings of `word` with any accents, most frequent first."""
+        return [s for s, _ in self.lookup(fold(word))]
+
+    def resolve(self, word: str) -> str | None:
+        """The spelling to use for `word` (lowercase), or None if unknown or ambiguous."""
+        lower = word.lower()
+        cands = self.lookup(fold(lower))
+        if not cands:
+            return None
+        if len(cands) == 1:
+            return cands[0][0]
+        # Several spellings (mange / mangé, la / là): only one that clearly
+        # dominates is safe, and a learner's valid spelling only loses to itself.
+        total = sum(n for _, n in cands)
+        best, n = cands[0]
+        if n < DOMINANT_SHARE * total or (best != lower and any(s == lower for s, _ in cands)):
+            return None
+        return best
+
+    def restore(self, text: str) -> tuple[str, bool]:
+        """
+        Text with accents restored word by word (case kept), and whether
+        every word was known and unambiguous.
+        """
+        complete = True
+        out = []
+        pos = 0
+        for m in WORD_RE.finditer(text):
+            word = m.group()
+            spelling = self.resolve(word)
+            if spelling is None:
+                complete = False
+                spelling = word
+            elif word.isupper() and len(word) > 1:
+                spelling = spelling.upper()
+            elif word[0].isupper():
+                spelling = spelling[0].upper() + spelling[1:]
+            out.append(text[pos:m.start()])
+            out.append(spelling)
+            pos = m.end()
+        out.append(text[pos:])
+        return "".join(out), complete
+
+
+def _parse_candidates(rest: bytes) -> list[tuple[str, int]]:
+    return [(s, int(n)) for s, _, n in (c.rpartition(":") for c in rest.decode("utf-8").split(","))]
+
+
+class MappedAccentIndex(AccentIndex):
+    """accents.tsv memory-mapped read-only; lines are looked up by binary search."""
+
+    def __init__(self, path: Path = ACCENTS_TSV):
+        super().__init__({})
+        self._file = path.open("rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self.lookup = lru_cache(maxsize=LOOKUP_CACHE_SIZE)(self._lookup)
+
+    def _line_start(self, pos: int) -> int:
+        return self._mm.rfind(b"\n", 0, pos) + 1
+
+    def _read_line(self, start: int) -> tuple[bytes, bytes, int]:
+        end = self._mm.find(b"\n", start)
+        if end < 0:
+            end = len(self._mm)
+        key, _, rest = self._mm[start:end].partition(b"\t")
+        return key, rest, end + 1
+
+    def _lookup(self, key: str) -> list[tuple[str, int]]:
+        target = key.encode("utf-8")
+        lo, hi = 0, len(self._mm)
+        while lo < hi:
+            mid = self._line_start((lo + hi) // 2)
+            line_key, rest, nxt = self._read_line(mid)
+            if line_key == target:
+                return _parse_candidates(rest)
+            if line_key < target:
+                lo = nxt
+            else:
+                hi = mid
+        return []
+
+
+# Loaded (or built) once per process on first use
+_accent_index = None
+
+
+def get_accent_index() -> AccentIndex:
+    global _accent_index
+    if _accent_index is None:
+        if ACCENTS_TSV.exists():
+            _accent_index = MappedAccentIndex()
+        else:
+            print(f"[INFO] {ACCENTS_TSV} not found, building the accent index in memory", file=sys.stderr)
+            _accent_index = AccentIndex.build()
+    return _accent_index
+
+
+def query(text: str, repeat: int = 1000):
+    index = get_accent_index()
+    restored, complete = index.restore(text)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        index.restore(text)
+    us = (time.perf_counter() - start) / repeat * 1e6
+    print(f"{restored}  ({'complete' if complete else 'incomplete'}, {us:.1f} µs)")
+    for word in WORD_RE.findall(text):
+        print(f"  {word}: {', '.join(index.candidates(word)) or '-'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the accent-restoration index.")
+    parser.add_argument("--wordlist", action="append", type=Path, metavar="PATH",
+                        help="French word list to add (repeatable; default ACCENTS_WORDLIST "
+                             "or the first system list found)")
+    parser.add_argument("--no-db", action="store_true", help="Leave out the examples table")
+    parser.add_argument("--query", metavar="TEXT", help="Restore TEXT with the saved index instead of building")
+    args = parser.parse_args()
+
+    if args.query is not None:
+        query(args.query)
+        return
+
+    wordlists = args.wordlist if args.wordlist is not None else default_wordlists()
+    for path in wordlists:
+        if not path.exists():
+            print(f"ERROR: word list not found: {path}")
+            sys.exit(1)
+        print(f"[INFO] word list {path}", file=sys.stderr)
+    index = AccentIndex.build(wordlists=wordlists, use_db=not args.no_db)
+    index.save()
+    ambiguous = sum(1 for cands in index.index.values() if len(cands) > 1)
+    size = ACCENTS_TSV.stat().st_size
+    print(f"  ✓ {len(index.index)} keys ({ambiguous} with several spellings)  {size / 1024:.1f} KB -> {ACCENTS_TSV}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,9 @@ import psycopg2
 import psycopg
 import sys
 import io
-from werkzeug.security import generate_password_hash, check_password_hash
+import time
+# Hashing method and cost parameters: PASSWORD_HASH_METHOD (see password_policy.py)
+from password_policy import verify_password
 
 # Define tier constants
 TIER_GRATIS  = 0
@@ -23,6 +25,10 @@ app.secret_key = os.getenv('FLASK_SECRET_KEY')
 if not app.secret_key:
     raise ValueError("FLASK_SECRET_KEY not found in environment variables!")
 
+# Per-route latency, DB/OpenAI timings and GET /metrics (see app_metrics.py)
+from app_metrics import install as install_metrics
+metrics = install_metrics(app)
+
 # Make tier constants available in ALL templates
 @app.context_processor
 def inject_tiers():
@@ -47,20 +53,47 @@ class User(UserMixin):
         self.email    = email
         self.tier     = tier
 
+# Optional signed session claims, so load_user can skip the DB (see session_tokens.py)
+from session_tokens import (STATELESS_SESSIONS, SESSION_KEY, claims_valid, get_revocations,
+                            issue_claims)
+
+def remember_claims(user):
+    if not STATELESS_SESSIONS:
+        return
+    try:
+        session[SESSION_KEY] = issue_claims(user.id, user.username, user.email, user.tier)
+    except ValueError as e:
+        # No claims: this user is simply reloaded from the DB on each request
+        session.pop(SESSION_KEY, None)
+        print(f"[ERROR] no session claims for user {user.id}: {e}", file=sys.stderr)
+
 # User loader - Flask-Login uses this to reload user from session
 @login_manager.user_loader
 def load_user(user_id):
-    # Load user from your database
-    # This is called on every request for logged-in users
-    # For now, a simple example:
-    conn = psycopg2.connect(os.getenv('NEON_DATABASE_URL'))
+    # This is called on every request for logged-in users.  With
+    # STATELESS_SESSIONS, unexpired and unrevoked claims answer it without
+    # the DB; the query below then runs once per SESSION_TOKEN_TTL.
+    if STATELESS_SESSIONS:
+        claims = session.get(SESSION_KEY)
+        if claims_valid(claims, user_id, get_revocations()):
+            metrics.inc("session_user_loads_total", source="claims")
+            return User(id=claims["id"], username=claims["username"], email=claims["email"],
+                        tier=claims["tier"])
+
+    metrics.inc("session_user_loads_total", source="db")
+    with metrics.timer("db_connect_seconds"):
+        conn = psycopg2.connect(os.getenv('NEON_DATABASE_URL'))
     cur = conn.cursor()
-    cur.execute("SELECT id, username, email, tier FROM users WHERE id = %s", (user_id,))
-    result = cur.fetchone()
+    with metrics.timer("db_query_seconds", op="load_user"):
+        cur.execute("SELECT id, username, email, tier FROM users WHERE id = %s", (user_id,))
+        result = cur.fetchone()
     conn.close()
 
     if result:
-        return User(id=result[0], username=result[1], email=result[2], tier=result[3])
+        user = User(id=result[0], username=result[1], email=result[2], tier=result[3])
+        remember_claims(user)
+        return user
+    session.pop(SESSION_KEY, None)
     return None
 
 # vocab
@@ -89,18 +122,37 @@ def login():
         password = request.form.get('password')
         
         # Check credentials
-        conn = psycopg2.connect(os.getenv('NEON_DATABASE_URL'))
+        with metrics.timer("db_connect_seconds"):
+            conn = psycopg2.connect(os.getenv('NEON_DATABASE_URL'))
         cur = conn.cursor()
-        cur.execute(
-            "SELECT id, username, email, password_hash, tier FROM users WHERE username = %s",
-            (username,)
-        )
-        result = cur.fetchone()
+        with metrics.timer("db_query_seconds", op="login"):
+            cur.execute(
+                "SELECT id, username, email, password_hash, tier FROM users WHERE username = %s",
+                (username,)
+            )
+            result = cur.fetchone()
+
+        # Hashing dominates login CPU, so it is measured on its own; a hash
+        # made with an older policy is replaced while the password is at hand.
+        cpu = time.thread_time()
+        ok, new_hash = verify_password(result[3], password) if result else (False, None)
+        metrics.observe("login_cpu_seconds", time.thread_time() - cpu,
+                        result="rehash" if new_hash else "ok" if ok else "fail" if result else "unknown")
+        if new_hash:
+            try:
+                with metrics.timer("db_query_seconds", op="login_rehash"):
+                    cur.execute("UPDATE users SET password_hash = %s WHERE id = %s", (new_hash, result[0]))
+                conn.commit()
+                metrics.inc("password_rehash_total")
+            except psycopg2.Error as e:
+                conn.rollback()
+                print(f"[ERROR] rehash for user {result[0]} failed: {e}", file=sys.stderr)
         conn.close()
         
-        if result and check_password_hash(result[3], password):
-            user = User(id=result[0], username=result[1], email=result[2], tier=result[3])
+        if ok:
+            user = User(id=result[0], username=result[1], email=result[2], tier=result[4])
             login_user(user)
+            remember_claims(user)
             return redirect(url_for('index'))
         else:
             # Show login form again with error message
@@ -123,6 +175,7 @@ def login():
 @login_required
 def logout():
     logout_user()
+    session.pop(SESSION_KEY, None)
     return redirect(url_for('index'))
 
 @app.route('/register')
@@ -175,36 +228,188 @@ DSN = os.getenv("NEON_DATABASE_URL")
 if not DSN:
     raise RuntimeError("❌ NEON_DATABASE_URL not found in ~/.env or environment")
     
+class TimedCursor(psycopg.Cursor):
+    """Cursor that records every execute() in db_query_seconds, labelled by Flask endpoint."""
+    def execute(self, query, params=None, **kwargs):
+        from flask import has_request_context
+        op = request.endpoint if has_request_context() else None
+        with metrics.timer("db_query_seconds", op=op or "other"):
+            return super().execute(query, params, **kwargs)
+
 def get_conn():
-    return psycopg.connect(DSN, autocommit=True)
+    with metrics.timer("db_connect_seconds"):
+        return psycopg.connect(DSN, autocommit=True, cursor_factory=TimedCursor)
     
+# Accentless learner input ("etre", "la cuillere") restored locally (accents.py)
+from accents import get_accent_index
+
+# Best expression for a query: the same expression_key, else the same
+# expression_match (articles dropped), else the closest pg_trgm match.  Each
+# branch carries a literal priority and the lowest wins; UNION ALL alone does
+# not promise to return its branches in order.  Its examples come back in the
+# same round trip.  See tools/neon/migrations/0004_examples_expression_match.sql.
+EXAMPLES_LOOKUP = """
+    WITH best AS (
+        (SELECT expression_key, expression, 'exact'::text AS match, 1.0::real AS score, 1 AS priority
+           FROM examples
+          WHERE expression_key = fold_french(%(q)s)
+          LIMIT 1)
+        UNION ALL
+        (SELECT expression_key, expression, 'normalized', 1.0::real, 2
+           FROM examples
+          WHERE expression_match = match_french(%(q)s)
+          ORDER BY id
+          LIMIT 1)
+        UNION ALL
+        (SELECT expression_key, expression, 'fuzzy', similarity(expression_match, match_french(%(q)s)), 3
+           FROM examples
+          WHERE expression_match %% match_french(%(q)s)
+          ORDER BY expression_match <-> match_french(%(q)s), id
+          LIMIT 1)
+        ORDER BY priority
+        LIMIT 1
+    )
+    SELECT b.expression, b.match, b.score, e.french, e.english
+      FROM best b
+      JOIN examples e ON e.expression_key = b.expression_key
+     ORDER BY e.id
+"""
+
 @app.route("/examples")
 @login_required
 def get_examples():
     """
-    Example: GET /api/examples?expression=le%20manteau
-    Returns: JSON array of french/english examples
+    Example: GET /api/examples?expression=la%20cuillere
+    Returns: JSON with the best-matching stored expression and its
+    french/english examples:
+      {"expression": "la cuillere", "accented": "la cuillère",
+       "match": "la cuillère", "match_type": "exact", "score": 1.0,
+       "examples": [{"french": ..., "english": ...}, ...]}
+
+    match_type is "exact" (accent-folded, lowercased, whitespace collapsed:
+    "Le  Manteau"), "normalized" (leading article ignored: "manteau",
+    "un manteau") or "fuzzy" (trigram similarity, for typos: "le mantaeu");
+    match is null and examples empty when nothing is close enough.
+    "accented" is the query with its accents restored locally (accents.py).
     """
     expression = request.args.get("expression", "").strip()
     if not expression:
         return jsonify({"error": "missing expression parameter"}), 400
 
     rows = []
+    match = match_type = score = None
     with get_conn() as conn:
         with conn.cursor() as cur:
-            cur.execute(
-            """
-            SELECT french, english
-                FROM examples
-                WHERE expression = %s
-                ORDER BY id
-                """,
-                (expression,),
-            )
-            for french, english in cur.fetchall():
+            cur.execute(EXAMPLES_LOOKUP, {"q": expression})
+            for match, match_type, score, french, english in cur.fetchall():
                 rows.append({"french": french, "english": english})
 
-    return jsonify({"expression": expression, "examples": rows})
+    accented, _ = get_accent_index().restore(expression)
+    return jsonify({
+        "expression": expression,
+        "accented": accented,
+        "match": match,
+        "match_type": match_type,
+        "score": round(score, 3) if score is not None else None,
+        "examples": rows,
+    })
+
+#
+# Site-wide search (index built by search_index.py)
+#
+from search_index import get_search_index, SECTIONS
+
+@app.route("/search")
+def search():
+    """
+    Example: GET /api/search?q=cuillere&section=vocab&limit=10
+    Returns: {"query": "cuillere",
+              "results": [{"section", "score", "url", "title"}, ...]}   best first
+    """
+    query = request.args.get("q", "").strip()
+    if not query:
+        return jsonify({"error": "missing q parameter"}), 400
+
+    sections = [s for s in request.args.getlist("section") if s in SECTIONS] or None
+    try:
+        limit = max(1, min(int(request.args.get("limit", 20)), 100))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+
+    results = get_search_index().search(query, sections=sections, limit=limit)
+    return jsonify({"query": query, "results": results})
+
+#
+# Verb conjugations (static/learn-your-verbs/conjugations.json, conjugator.py for everything else)
+#
+from conjugations import get_conjugations
+from conjugator import ConjugationError, get_conjugator
+
+CONJUGATIONS_MAX_AGE = 3600
+
+@app.route("/conjugations")
+def conjugation_table():
+    """
+    Example: GET /api/conjugations?tense=pc&person=il
+    Returns: {"tense", "person", "forms": {"aimer": "a aimé", ...}}   (drag-pc exercises)
+
+    Without person, each verb maps to its person -> form dict; without tense,
+    returns the persons, the tenses and a summary of each verb.
+    """
+    conj = get_conjugations()
+    tense = request.args.get("tense", "").strip()
+    person = request.args.get("person", "").strip() or None
+    if not tense:
+        body = {
+            "persons": conj.persons,
+            "tenses": conj.tenses,
+            "verbs": {inf: {k: v for k, v in verb.items() if k != "forms"}
+                      for inf, verb in conj.verbs.items()},
+        }
+    elif tense not in conj.tenses:
+        return jsonify({"error": f"unknown tense {tense!r}", "tenses": list(conj.tenses)}), 400
+    elif person is not None and person not in conj.persons:
+        return jsonify({"error": f"unknown person {person!r}", "persons": conj.persons}), 400
+    else:
+        body = {"tense": tense, "person": person, "forms": conj.table(tense, person)}
+
+    response = jsonify(body)
+    response.cache_control.public = True
+    response.cache_control.max_age = CONJUGATIONS_MAX_AGE
+    return response
+
+@app.route("/conjugations/<verb>")
+def conjugation_verb(verb):
+    """
+    Example: GET /api/conjugations/etre?tense=present
+    Example: GET /api/conjugations/se%20souvenir?tense=pc&feminine=1
+    Returns: the verb's entry (all tenses, or only ?tense=), "source": "dataset" | "engine"
+
+    Verbs outside conjugations.json (or any verb with ?feminine=1) are
+    conjugated by conjugator.py; "known" says whether the verb is in the
+    top-verbs list rather than merely shaped like an infinitive.
+    """
+    conj = get_conjugations()
+    feminine = request.args.get("feminine", "").strip().lower() in ("1", "true", "yes")
+    entry = conj.verb(verb)
+    if entry is not None and not feminine:
+        entry["source"] = "dataset"
+    else:
+        try:
+            entry = dict(get_conjugator().conjugate(entry["infinitive"] if entry else verb, feminine))
+        except ConjugationError as e:
+            return jsonify({"error": str(e)}), 404
+        entry["source"] = "engine"
+    tense = request.args.get("tense", "").strip()
+    if tense:
+        if tense not in conj.tenses:
+            return jsonify({"error": f"unknown tense {tense!r}", "tenses": list(conj.tenses)}), 400
+        entry["forms"] = {tense: entry["forms"].get(tense)}
+
+    response = jsonify(entry)
+    response.cache_control.public = True
+    response.cache_control.max_age = CONJUGATIONS_MAX_AGE
+    return response
 
 #
 # Audio Capture
@@ -218,6 +423,9 @@ def speaker():
 
 from datetime import datetime
 from openai import OpenAI
+from llm_cache import cached_client, get_llm_cache
+from openai_gateway import (get_gateway, GatewayError, request_key, estimate_chat_tokens,
+                            estimate_speech_tokens, estimate_transcription_tokens)
 
 # Create client only once when first needed
 _client = None
@@ -228,6 +436,39 @@ def get_openai_client():
         _client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
     return _client
 
+def record_gateway_event(event, endpoint, queue_s=0.0, upstream_s=0.0, ok=True, reason=None):
+    if event == "call":
+        metrics.inc("openai_calls_total", endpoint=endpoint)
+        metrics.inc("openai_queue_seconds_total", queue_s, endpoint=endpoint)
+        metrics.observe("openai_upstream_seconds", upstream_s, endpoint=endpoint)
+        if not ok:
+            metrics.inc("openai_errors_total", endpoint=endpoint)
+    elif event == "coalesced":
+        metrics.inc("openai_coalesced_total", endpoint=endpoint)
+    elif event == "rejected":
+        metrics.inc("openai_rejected_total", endpoint=endpoint, reason=reason)
+
+get_gateway().add_listener(record_gateway_event)
+metrics.add_collector(get_llm_cache().metrics)
+
+def call_openai(endpoint, fn, key=None, cost=0, fallback=None):
+    """
+    Run an OpenAI call through the gateway on behalf of the current user:
+    concurrency limit, tier budget, coalescing and circuit breaker.
+    Raises GatewayError (with .status and .user_message) unless fallback is given.
+    """
+    return get_gateway().call(
+        endpoint, fn, key=key, cost=cost,
+        user_id=current_user.get_id(),
+        tier=getattr(current_user, 'tier', TIER_GRATIS),
+        fallback=fallback,
+    )
+
+def client_error_status(e):
+    """The 4xx an OpenAI error carries (e.g. 400 for unreadable audio), else 500."""
+    status = getattr(e, 'status_code', None)
+    return status if isinstance(status, int) and 400 <= status < 500 else 500
+
 # Initialize OpenAI client
 #client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
 
@@ -260,13 +501,20 @@ def upload_audio():
     try:
         # Transcribe with Whisper
         with open(filepath, 'rb') as audio:
-            transcript = client.audio.transcriptions.create(
+            audio_data = audio.read()
+
+        def transcribe():
+            return client.audio.transcriptions.create(
                 model="whisper-1",
-                file=audio,
+                file=(filename, audio_data),
                 language="fr"  # Specify French for better accuracy
-            )
-        
-        transcribed_text = transcript.text
+            ).text
+
+        transcribed_text = call_openai(
+            'transcribe', transcribe,
+            key=request_key("whisper-1", "fr", audio_data),
+            cost=estimate_transcription_tokens(len(audio_data)),
+        )
         
         # Get pronunciation feedback from GPT-4
         feedback = get_pronunciation_feedback(transcribed_text, expected_text)
@@ -278,14 +526,21 @@ def upload_audio():
             'feedback': feedback,
             'expected': expected_text
         })
-        
+
+    except GatewayError as e:
+        print(f"OpenAI gateway refused transcription: {e}")
+        return jsonify({
+            'status': 'error',
+            'error': e.user_message
+        }), e.status
+
     except Exception as e:
         # Log the error for debugging
         print(f"Error processing audio: {str(e)}")
         return jsonify({
             'status': 'error',
             'error': str(e)
-        }), 500
+        }), client_error_status(e)
 
 
 def get_pronunciation_feedback(transcribed, expected):
@@ -301,8 +556,9 @@ def get_pronunciation_feedback(transcribed, expected):
         Friendly feedback string
     """
 
-    # Get client when needed
-    client = get_openai_client()
+    # Get client when needed; the same (expected, heard) pair is answered
+    # from the LLM cache instead of asking GPT again
+    client = cached_client(get_openai_client())
     
     if not expected:
         # If no expected text provided, just acknowledge what was said
@@ -324,13 +580,10 @@ def get_pronunciation_feedback(transcribed, expected):
         return random.choice(praise_messages)
     
     # Otherwise, get detailed feedback from GPT-4
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o",  # or use gpt-4o-mini for lower cost
-            messages=[
-                {
-                    "role": "system",
-                    "content": """You are a friendly, encouraging French pronunciation tutor. 
+    messages = [
+        {
+            "role": "system",
+            "content": """You are a friendly, encouraging French pronunciation tutor. 
                     Compare what the student said with what they were trying to say.
                     Provide brief, specific, and encouraging feedback.
                     
@@ -346,22 +599,33 @@ def get_pronunciation_feedback(transcribed, expected):
                     Example good feedback:
                     "Good effort! You said 'le shat' but it should be 'le chat'. The 'ch' in French makes a 'sh' sound, like in 'shoe'. Try saying it again with that softer 'sh' sound!"
                     """
-                },
-                {
-                    "role": "user",
-                    "content": f"""Expected: "{expected}"
+        },
+        {
+            "role": "user",
+            "content": f"""Expected: "{expected}"
 Student said: "{transcribed}"
 
 Provide brief, encouraging pronunciation feedback."""
-                }
-            ],
+        }
+    ]
+
+    def ask_gpt():
+        return client.chat.completions.create(
+            model="gpt-4o",  # or use gpt-4o-mini for lower cost
+            messages=messages,
             temperature=0.7,
             max_tokens=150
+        ).choices[0].message.content
+
+    try:
+        return call_openai(
+            'chat', ask_gpt,
+            key=request_key("gpt-4o", messages),
+            cost=estimate_chat_tokens(messages, max_tokens=150),
         )
-        
-        return response.choices[0].message.content
-        
+
     except Exception as e:
+        # Includes GatewayError: over budget, queue full or circuit open
         print(f"Error getting GPT feedback: {str(e)}")
         # Fallback message if GPT call fails
         return f"You said '{transcribed}', trying to say '{expected}'. Keep practicing!"
@@ -466,20 +730,31 @@ def pronounce():
     
     if not text:
         return jsonify({'error': 'No text provided'}), 400
+
+    # "etre" is spoken as "être", and shares its cached audio
+    text, _ = get_accent_index().restore(text)
     
     try:
         client = get_openai_client()
         
         # Generate speech using OpenAI TTS
-        response = client.audio.speech.create(
-            model="tts-1",  # or "tts-1-hd" for higher quality
-            voice="alloy",  # Options: alloy, echo, fable, onyx, nova, shimmer
-            input=text,
-            speed=0.9  # Slightly slower for learning
+        def speak():
+            return client.audio.speech.create(
+                model="tts-1",  # or "tts-1-hd" for higher quality
+                voice="alloy",  # Options: alloy, echo, fable, onyx, nova, shimmer
+                input=text,
+                speed=0.9  # Slightly slower for learning
+            ).content
+
+        # Several learners asking for the same phrase at once share one call
+        content = call_openai(
+            'speech', speak,
+            key=request_key("tts-1", "alloy", 0.9, text),
+            cost=estimate_speech_tokens(text),
         )
-        
+
         # Return the audio file
-        audio_bytes = io.BytesIO(response.content)
+        audio_bytes = io.BytesIO(content)
         audio_bytes.seek(0)
         
         return send_file(
@@ -488,9 +763,12 @@ def pronounce():
             as_attachment=False,
             download_name='pronunciation.mp3'
         )
-        
+
+    except GatewayError as e:
+        return jsonify({'error': e.user_message}), e.status
+
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return jsonify({'error': str(e)}), client_error_status(e)
 
 """
 To use OpenAI TTS instead of browser TTS, update the JavaScript in audio-capture.html:
@@ -556,6 +834,14 @@ def premium_feature():
     # Show premium content
     return render_template('premium.html')
 
+@app.route('/admin/openai-gateway')
+@login_required
+def openai_gateway_stats():
+    """Queue times, upstream latency, refusals and circuit state per OpenAI endpoint (this process)."""
+    if current_user.tier < TIER_ADMIN:
+        return "Admins only", 403
+    return jsonify(get_gateway().snapshot())
+
 #
 # <!-- In any template -->
 # {% if current_user.is_authenticated %}
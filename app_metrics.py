@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+app_metrics.py - Prometheus-style metrics for the Flask API
+
+Each process keeps its counters, histograms and gauges in memory and every
+FLUSH_INTERVAL seconds writes them to <METRICS_DIR>/metrics-<pid>.json.
+GET /metrics reads every process file and sums them, so the numbers cover
+all mod_wsgi daemon processes, not just the one that answered the scrape.
+Files of processes that have exited are folded into metrics-archive.json
+(counters and histograms keep their totals; gauges are dropped).
+
+    metrics = get_metrics()
+    metrics.inc("llm_cache_lookups_total", result="hit")
+    metrics.observe("db_query_seconds", 0.012, op="examples")
+    with metrics.timer("db_connect_seconds"):
+        conn = psycopg.connect(DSN)
+
+    install(app)    # per-route latency, in-flight requests, template render time, /metrics
+
+Configuration (environment):
+  METRICS_DIR    directory shared by the worker processes
+                 (default <tmp>/frflashy-metrics; clear it when Apache restarts)
+  METRICS_TOKEN  if set, /metrics requires "Authorization: Bearer <token>";
+                 otherwise only loopback clients may scrape
+
+Usage:
+  python3 app_metrics.py          # print the aggregated metrics
+  python3 app_metrics.py --reset  # delete all metrics files
+"""
+
+import atexit
+import fcntl
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+DEFAULT_DIR = Path(tempfile.gettempdir()) / "frflashy-metrics"
+FLUSH_INTERVAL = 1.0
+ARCHIVE_FILE = "metrics-archive.json"
+
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# name -> (type, help); unlisted names take their type from how they were recorded
+METRIC_HELP = {
+    "http_request_duration_seconds": ("histogram", "Time from request start to response, by route, method and status"),
+    "http_requests_in_flight": ("gauge", "Requests being handled right now, summed over worker processes"),
+    "http_requests_in_flight_max": ("gauge", "Highest concurrency a worker process has seen"),
+    "template_render_seconds": ("histogram", "Jinja template render time"),
+    "db_connect_seconds": ("histogram", "Time to open a Postgres connection"),
+    "db_query_seconds": ("histogram", "Time spent in cursor.execute"),
+    "login_cpu_seconds": ("histogram", "CPU time of password verification (and rehash) per login, by result"),
+    "password_rehash_total": ("counter", "Stored password hashes upgraded to the current policy at login"),
+    "session_user_loads_total": ("counter", "Logged-in user reloads, from signed session claims or the DB"),
+    "openai_queue_seconds_total": ("counter", "Seconds calls waited for an OpenAI gateway slot"),
+    "openai_upstream_seconds": ("histogram", "OpenAI call latency as seen by the gateway"),
+    "openai_calls_total": ("counter", "OpenAI calls made by the gateway"),
+    "openai_coalesced_total": ("counter", "Requests answered by an identical call already in flight"),
+    "openai_errors_total": ("counter", "OpenAI calls that failed upstream"),
+    "openai_rejected_total": ("counter", "Calls the gateway refused, by reason"),
+    "llm_cache_lookups_total": ("counter", "LLM answer cache lookups, by result"),
+    "llm_cache_hit_ratio": ("gauge", "LLM answer cache hits / lookups since the metrics were reset"),
+    "process_metrics_files": ("gauge", "Live worker processes reporting metrics"),
+}
+
+
+def _labels_key(labels: dict) -> str:
+    return json.dumps(labels, sort_keys=True, separators=(",", ":"))
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class Metrics:
+    def __init__(self, directory=None, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.lock = threading.Lock()
+        self.counters = {}     # (name, labels_key) -> value
+        self.histograms = {}   # (name, labels_key) -> [bucket counts..., +Inf count, sum]
+        self.gauges = {}       # (name, labels_key) -> value
+        self.collectors = []   # callables run at flush time, see add_collector
+        self.last_flush = 0.0
+
+        self.dir = Path(directory or os.getenv("METRICS_DIR") or DEFAULT_DIR)
+        try:
+            self.dir.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            # Metrics must never break the app: fall back to this process only.
+            print(f"[WARN] metrics for this process only, cannot create {self.dir}: {e}", file=sys.stderr)
+            self.dir = None
+
+    # -----------------------------------------------------------------
+    # Recording
+    # -----------------------------------------------------------------
+    def inc(self, name: str, amount: float = 1, **labels):
+        key = (name, _labels_key(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def set(self, name: str, value: float, **labels):
+        with self.lock:
+            self.gauges[(name, _labels_key(labels))] = value
+
+    def add(self, name: str, amount: float, **labels):
+        """Move a gauge up or down (e.g. requests in flight)."""
+        key = (name, _labels_key(labels))
+        with self.lock:
+            value = self.gauges[key] = self.gauges.get(key, 0) + amount
+        return value
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = (name, _labels_key(labels))
+        with self.lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    hist[i] += 1
+                    break
+            else:
+                hist[len(self.buckets)] += 1
+            hist[-1] += seconds
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def add_collector(self, fn):
+        """
+        fn() -> {"counters": {(name, labels_json): value}, "gauges": ...} for
+        cumulative state another module already keeps (e.g. the LLM cache's
+        hit/miss counts); it is merged into this process's file at each flush.
+        labels_json must be formatted like _labels_key().
+        """
+        self.collectors.append(fn)
+
+    # -----------------------------------------------------------------
+    # Per-process files
+    # -----------------------------------------------------------------
+    def _state(self) -> dict:
+        with self.lock:
+            state = {
+                "counters": dict(self.counters),
+                "histograms": {k: list(v) for k, v in self.histograms.items()},
+                "gauges": dict(self.gauges),
+            }
+        for collect in self.collectors:
+            try:
+                extra = collect()
+            except Exception as e:
+                print(f"[WARN] metrics collector {collect.__name__} failed: {e}", file=sys.stderr)
+                continue
+            for kind, series in extra.items():
+                state[kind].update(series)
+        return {
+            "pid": os.getpid(),
+            "buckets": list(self.buckets),
+            **{kind: [[name, labels, value] for (name, labels), value in series.items()]
+               for kind, series in state.items()},
+        }
+
+    def flush(self, force: bool = False):
+        now = time.monotonic()
+        if self.dir is None or (not force and now - self.last_flush < FLUSH_INTERVAL):
+            return
+        self.last_flush = now
+        path = self.dir / f"metrics-{os.getpid()}.json"
+        tmp = path.with_suffix(".tmp")
+        try:
+            tmp.write_text(json.dumps(self._state()), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"[WARN] cannot write {path}: {e}", file=sys.stderr)
+
+    @contextmanager
+    def _dir_lock(self):
+        with open(self.dir / ".lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def collect(self) -> dict:
+        """This process's state merged with every other process's file."""
+        if self.dir is None:
+            return merge([self._state()], live=1)
+
+        self.flush(force=True)
+        with self._dir_lock():
+            archive_path = self.dir / ARCHIVE_FILE
+            archive = _read_json(archive_path)
+            live, dead = [], []
+            for path in self.dir.glob("metrics-*.json"):
+                if path.name == ARCHIVE_FILE:
+                    continue
+                data = _read_json(path)
+                if data is None:
+                    continue
+                (live if _pid_alive(data["pid"]) else dead).append((path, data))
+
+            if dead:
+                old = [archive] if archive else []
+                archive = merge(old + [d for _, d in dead], live=0, keep_gauges=False, raw=True)
+                tmp = archive_path.with_suffix(".tmp")
+                tmp.write_text(json.dumps(archive), encoding="utf-8")
+                os.replace(tmp, archive_path)
+                for path, _ in dead:
+                    path.unlink(missing_ok=True)
+
+        files = [d for _, d in live] + ([archive] if archive else [])
+        return merge(files, live=len(live))
+
+    def render(self) -> str:
+        return render_prometheus(self.collect())
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.gauges.clear()
+        if self.dir is not None:
+            for path in self.dir.glob("metrics-*"):
+                path.unlink(missing_ok=True)
+
+
+def _read_json(path: Path):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def merge(files: list[dict], live: int, keep_gauges: bool = True, raw: bool = False) -> dict:
+    """
+    Sum counters, histograms and gauges across process files.  With raw=True
+    the result has the file layout again (for the archive).
+    """
+    counters, histograms, gauges = {}, {}, {}
+    buckets = None
+    for data in files:
+        buckets = buckets or data.get("buckets")
+        for name, labels, value in data.get("counters", []):
+            counters[(name, labels)] = counters.get((name, labels), 0) + value
+        for name, labels, value in data.get("histograms", []):
+            prev = histograms.get((name, labels))
+            histograms[(name, labels)] = value if prev is None else [a + b for a, b in zip(prev, value)]
+        if keep_gauges:
+            for name, labels, value in data.get("gauges", []):
+                # Concurrency maxima are a max, everything else adds up.
+                if name.endswith("_max"):
+                    gauges[(name, labels)] = max(gauges.get((name, labels), 0), value)
+                else:
+                    gauges[(name, labels)] = gauges.get((name, labels), 0) + value
+
+    if raw:
+        return {
+            "pid": 0,
+            "buckets": buckets or list(DEFAULT_BUCKETS),
+            "counters": [[n, l, v] for (n, l), v in counters.items()],
+            "histograms": [[n, l, v] for (n, l), v in histograms.items()],
+            "gauges": [],
+        }
+
+    gauges[("process_metrics_files", "{}")] = live
+    hits = sum(v for (n, l), v in counters.items()
+               if n == "llm_cache_lookups_total" and json.loads(l).get("result") == "hit")
+    lookups = sum(v for (n, _), v in counters.items() if n == "llm_cache_lookups_total")
+    if lookups:
+        gauges[("llm_cache_hit_ratio", "{}")] = round(hits / lookups, 4)
+    return {"buckets": buckets or list(DEFAULT_BUCKETS),
+            "counters": counters, "histograms": histograms, "gauges": gauges}
+
+
+def _fmt_labels(labels_json: str, extra: dict | None = None) -> str:
+    labels = json.loads(labels_json)
+    if extra:
+        labels.update(extra)
+    if not labels:
+        return ""
+    parts = []
+    for k, v in sorted(labels.items()):
+        v = str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{k}="{v}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _fmt_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(merged: dict) -> str:
+    """Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    buckets = merged["buckets"]
+    by_name = {}
+    for kind in ("counters", "gauges", "histograms"):
+        for (name, labels), value in merged[kind].items():
+            by_name.setdefault(name, []).append((kind, labels, value))
+
+    for name in sorted(by_name):
+        kind_default = {"counters": "counter", "gauges": "gauge", "histograms": "histogram"}
+        mtype, text = METRIC_HELP.get(name, (kind_default[by_name[name][0][0]], ""))
+        if text:
+            lines.append(f"# HELP {name} {text}")
+        lines.append(f"# TYPE {name} {mtype}")
+        for kind, labels, value in sorted(by_name[name], key=lambda s: s[1]):
+            if kind != "histograms":
+                lines.append(f"{name}{_fmt_labels(labels)} {_fmt_value(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip(buckets, value):
+                cumulative += count
+                lines.append(f"{name}_bucket{_fmt_labels(labels, {'le': bound})} {cumulative}")
+            cumulative += value[len(buckets)]
+            lines.append(f"{name}_bucket{_fmt_labels(labels, {'le': '+Inf'})} {cumulative}")
+            lines.append(f"{name}_sum{_fmt_labels(labels)} {_fmt_value(round(value[-1], 6))}")
+            lines.append(f"{name}_count{_fmt_labels(labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------------------
+# Flask integration
+# ---------------------------------------------------------------------
+def install(app, metrics=None):
+    """Hook request timing, in-flight counts and template render time into app, add GET /metrics."""
+    from flask import Response, abort, g, request
+    from flask import before_render_template, template_rendered
+
+    metrics = metrics or get_metrics()
+    state = {"max": 0}
+
+    @app.before_request
+    def _metrics_start():
+        g._metrics_start = time.perf_counter()
+        in_flight = metrics.add("http_requests_in_flight", 1)
+        if in_flight > state["max"]:
+            state["max"] = in_flight
+            metrics.set("http_requests_in_flight_max", in_flight)
+
+    @app.after_request
+    def _metrics_status(response):
+        g._metrics_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def _metrics_finish(exc):
+        start = g.pop("_metrics_start", None)
+        if start is None:
+            return
+        metrics.add("http_requests_in_flight", -1)
+        rule = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        status = g.pop("_metrics_status", 500)
+        metrics.observe("http_request_duration_seconds", time.perf_counter() - start,
+                        route=rule, method=request.method, status=str(status))
+        metrics.flush()
+
+    def _render_start(sender, template, context, **extra):
+        g._metrics_render_start = time.perf_counter()
+
+    def _render_done(sender, template, context, **extra):
+        start = g.pop("_metrics_render_start", None)
+        if start is not None:
+            metrics.observe("template_render_seconds", time.perf_counter() - start,
+                            template=template.name or "<string>")
+
+    before_render_template.connect(_render_start, app)
+    template_rendered.connect(_render_done, app)
+
+    @app.route("/metrics")
+    def prometheus_metrics():
+        """Prometheus scrape target: metrics summed over all worker processes."""
+        token = os.getenv("METRICS_TOKEN")
+        if token:
+            if request.headers.get("Authorization", "") != f"Bearer {token}":
+                abort(403)
+        elif request.remote_addr not in ("127.0.0.1", "::1"):
+            abort(403)
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+    return metrics
+
+
+# Create the registry only once when first needed
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = Metrics()
+                atexit.register(_metrics.flush, True)
+    return _metrics
+
+
+def main():
+    metrics = get_metrics()
+    if "--reset" in sys.argv:
+        metrics.reset()
+        print(f"Removed metrics files from {metrics.dir}")
+        return
+    print(metrics.render(), end="")
+
+
+if __name__ == "__main__":
+    main()
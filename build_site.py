@@ -7,18 +7,39 @@ Build static HTML from Jinja templates.
 Now this:
   - Builds hint pages listed in hints/hints.json
   - Builds static top-level pages like about.html, index.html, etc.
+  - Builds the learn-your-verbs verb pages and verbs.html index from
+    static/learn-your-verbs/conjugations.json (verb -> tense -> person -> form)
+    and verb-pages.json (per-verb subtitle, table rows, notes, examples);
+    elision and agreement come from conjugator.py, which also flags any
+    form in the dataset that the engine would conjugate differently
+
+Usage:
+  python3 build_site.py            # everything
+  python3 build_site.py verbs      # only the named parts: hints, pages, verbs
 """
 
 import json
+import sys
 from pathlib import Path
 from datetime import datetime
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
+from conjugator import PLURAL, agree, elides, get_conjugator
+
 BASE_DIR = Path(__file__).resolve().parent
 TEMPLATES_DIR = BASE_DIR / "templates"
 HINTS_DIR = BASE_DIR / "hints"
 HINTS_JSON = HINTS_DIR / "hints.json"
 OUTPUT_DIR = BASE_DIR  # where to write about.html, index.html, etc.
+VERBS_DIR = BASE_DIR / "static" / "learn-your-verbs"
+CONJUGATIONS_JSON = VERBS_DIR / "conjugations.json"
+VERB_PAGES_JSON = VERBS_DIR / "verb-pages.json"
+
+# Tenses with a clickable row, a full panel and 5 examples on each verb page;
+# the rest of conjugations.json is shown as compact tables below them.
+A1_TENSES = ["present", "imperatif", "futur-proche", "pc", "infinitif"]
+PRONOUNS = {"je": "je", "tu": "tu", "il": "il / elle / on", "nous": "nous", "vous": "vous", "ils": "ils / elles"}
+SUBJUNCTIVE_TENSES = {"subjonctif", "subjonctif-passe"}
 
 env = Environment(
     loader=FileSystemLoader(str(TEMPLATES_DIR)),
@@ -69,11 +90,142 @@ def build_static_pages():
         out_path.write_text(html, encoding="utf-8")
         print(f"  ✓ wrote {out_path}")
 
+def pronoun(person, form, que=False, infinitive=None):
+    """ "je " / "j’" (before a vowel or mute h), optionally with "que"."""
+    pron = PRONOUNS[person]
+    if person == "je" and elides(form, infinitive):
+        pron = "j’"
+    else:
+        pron += " "
+    if que:
+        pron = ("qu’" if pron[0] in "ie" else "que ") + pron
+    return pron
+
+def conjugation_items(verb, infinitive, tense):
+    """
+    List items for a verb page panel.  With être the participle agrees, so
+    compound forms get their feminine spelled out the way the pages always have.
+    """
+    forms = verb["forms"][tense]
+    if tense == "imperatif":
+        return [{"pron": f"({p}) ", "form": f} for p, f in forms.items()]
+    agrees = tense == "pc" and verb["aux"] == "être"
+    items = []
+    for person, form in forms.items():
+        item = {"pron": pronoun(person, form, infinitive=infinitive), "form": form}
+        if agrees:
+            aux, pp = form.rsplit(" ", 1)
+            fem = f"{aux} {agree(verb['pp'], feminine=True, plural=person in PLURAL)}"
+            if person == "il":
+                item.update(pron="il ", alt=("elle", fem))
+            elif person == "ils":
+                item.update(pron="ils ", alt=("elles", fem))
+            elif person == "vous":
+                item.update(form=f"{aux} {verb['pp']}", suffix="(s)",
+                            note=f"(fem.: {agree(verb['pp'], feminine=True)}/s)")
+            else:
+                item["note"] = f"(fem.: {fem.split(' ', 1)[1]})"
+        items.append(item)
+    return items
+
+def build_verbs():
+    if not CONJUGATIONS_JSON.exists() or not VERB_PAGES_JSON.exists():
+        print(f"⚠️  {CONJUGATIONS_JSON.name} / {VERB_PAGES_JSON.name} not found in {VERBS_DIR}, skipping verbs.")
+        return
+
+    data = json.loads(CONJUGATIONS_JSON.read_text(encoding="utf-8"))
+    pages = json.loads(VERB_PAGES_JSON.read_text(encoding="utf-8"))
+    tenses = data["tenses"]
+    print(f"Building {len(data['verbs'])} verb page(s) from {CONJUGATIONS_JSON}.")
+
+    page_tpl = env.get_template("verbs/verb-page.html")
+    engine = get_conjugator()
+    index_entries = []
+    for infinitive, verb in data["verbs"].items():
+        page = pages.get(infinitive)
+        if page is None:
+            print(f"  ⚠️  no entry for {infinitive} in {VERB_PAGES_JSON.name}, skipping.")
+            continue
+        forms = verb["forms"]
+        differs = [t for t in tenses if engine.form(infinitive, t) != forms.get(t)]
+        if differs:
+            print(f"  ⚠️  {infinitive}: {', '.join(differs)} differ from conjugator.py (python3 conjugator.py --check)")
+        title = infinitive[0].upper() + infinitive[1:]
+
+        sections = []
+        for tense in A1_TENSES:
+            content = page["sections"][tense]
+            default_title = {
+                "futur-proche": f"{tenses[tense]['name']} – Conjugation (aller + {infinitive})",
+                "pc": f"{tenses[tense]['name']} – Conjugation ({verb['aux']} + {verb['pp']})",
+                "infinitif": f"{tenses[tense]['name']} – Form",
+            }.get(tense, f"{tenses[tense]['name']} – Conjugation")
+            sections.append({
+                "id": tense,
+                "name": tenses[tense]["name"],
+                "en": tenses[tense]["en"],
+                "row": page["rows"][tense],
+                "conj_title": content.get("conj_title", default_title),
+                "examples_title": content.get("examples_title", f"{tenses[tense]['name']} – 5 Examples"),
+                # A few pages list something other than the plain forms (e.g. vas-y !)
+                "conjugation_html": content.get("items"),
+                "conjugation": conjugation_items(verb, infinitive, tense) if tense != "infinitif" and forms[tense] else [],
+                "notes": content.get("notes", []),
+                "examples": content["examples"],
+            })
+
+        more = {}
+        for tense, meta in tenses.items():
+            if tense in A1_TENSES or forms.get(tense) is None:
+                continue
+            entry = {"name": meta["name"], "en": meta["en"]}
+            if isinstance(forms[tense], str):
+                entry["single"] = forms[tense]
+            else:
+                que = tense in SUBJUNCTIVE_TENSES
+                entry["lines"] = [{"pron": pronoun(p, f, que, infinitive), "form": f}
+                                  for p, f in forms[tense].items()]
+            more.setdefault(meta["level"], []).append(entry)
+
+        accent = page["accent"].lstrip("#")
+        accent_hover = "rgba({},{},{},.08)".format(*(int(accent[i:i + 2], 16) for i in (0, 2, 4)))
+        html = page_tpl.render(
+            verb={**verb, "infinitive": infinitive, "title": title,
+                  "agreement": [agree(verb["pp"], True), agree(verb["pp"], plural=True),
+                                agree(verb["pp"], True, True)]},
+            page={**page, "accent_hover": accent_hover},
+            sections=sections,
+            more=list(more.items()),
+        )
+        out_path = VERBS_DIR / "verbs" / verb["page"]
+        out_path.write_text(html, encoding="utf-8")
+        print(f"  ✓ wrote {out_path}")
+
+        index_entries.append({
+            "page": verb["page"],
+            "title": title,
+            "en": verb["en"],
+            "description": f"Auxiliary {verb['aux']} · past participle {verb['pp']} · "
+                           f"{sum(1 for t in tenses if forms.get(t))} tenses, A1 examples",
+        })
+
+    out_path = VERBS_DIR / "verbs.html"
+    html = env.get_template("verbs/verbs-index.html").render(verbs=index_entries, tense_count=len(tenses))
+    out_path.write_text(html, encoding="utf-8")
+    print(f"  ✓ wrote {out_path}")
+
+BUILDERS = {"hints": build_hints, "pages": build_static_pages, "verbs": build_verbs}
+
 def main():
+    parts = sys.argv[1:] or list(BUILDERS)
+    unknown = [p for p in parts if p not in BUILDERS]
+    if unknown:
+        print(f"ERROR: unknown part(s) {', '.join(unknown)}; choose from {', '.join(BUILDERS)}")
+        sys.exit(1)
     print(f"Templates dir: {TEMPLATES_DIR}")
     print(f"Hints dir:     {HINTS_DIR}")
-    build_hints()
-    build_static_pages()
+    for part in parts:
+        BUILDERS[part]()
     print("Done.")
 
 if __name__ == "__main__":
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+conjugations.py
+
+The learn-your-verbs conjugation dataset, static/learn-your-verbs/conjugations.json:
+
+  {"persons": ["je", "tu", "il", "nous", "vous", "ils"],
+   "tenses":  {"pc": {"name": "Passé composé", "en": "Compound past", "level": "A1"}, ...},
+   "verbs":   {"aller": {"en", "group", "aux", "pp", "page",
+                         "forms": {"present": {"je": "vais", ...},
+                                   "imperatif": {"tu": "va", "nous": ..., "vous": ...} or null,
+                                   "infinitif": "aller", ...}}}}
+
+Forms carry no pronoun (build_site.py adds je/j’, que...), compound tenses
+include the auxiliary, and être verbs are stored masculine ("sont allés").
+The same file feeds the generated verb pages (build_site.py verbs), the
+/api/conjugations endpoint and the drag-pc exercises.  Verbs that are not in
+it are conjugated by rule in conjugator.py, which must agree with every form
+here (python3 conjugator.py --check).
+
+Query (from api_app.py):
+  from conjugations import get_conjugations
+  get_conjugations().form("etre", "pc", "il")   -> "a été"
+  get_conjugations().table("pc", "il")          -> {"aimer": "a aimé", ...}
+
+Check the dataset:
+  python3 conjugations.py
+"""
+
+import json
+import sys
+from pathlib import Path
+
+from search_index import fold
+
+BASE_DIR = Path(__file__).resolve().parent
+CONJUGATIONS_JSON = BASE_DIR / "static" / "learn-your-verbs" / "conjugations.json"
+
+
+class Conjugations:
+    def __init__(self, path: Path = CONJUGATIONS_JSON):
+        data = json.loads(path.read_text(encoding="utf-8"))
+        self.persons = data["persons"]
+        self.tenses = data["tenses"]
+        self.verbs = data["verbs"]
+        # "etre", "Être" and "être" all name the same verb
+        self._by_key = {fold(inf): inf for inf in self.verbs}
+
+    def resolve(self, verb: str) -> str | None:
+        """The dataset's spelling of `verb`, or None if it is not in the dataset."""
+        return self._by_key.get(fold(verb.strip()))
+
+    def verb(self, verb: str) -> dict | None:
+        inf = self.resolve(verb)
+        return {"infinitive": inf, **self.verbs[inf]} if inf else None
+
+    def form(self, verb: str, tense: str, person: str | None = None):
+        """One form, the person -> form dict of a tense, or None."""
+        inf = self.resolve(verb)
+        if inf is None:
+            return None
+        forms = self.verbs[inf]["forms"].get(tense)
+        if person is None or not isinstance(forms, dict):
+            return forms
+        return forms.get(person)
+
+    def table(self, tense: str, person: str | None = None) -> dict:
+        """verb -> form (or person -> form dict) for one tense, in dataset order."""
+        table = {}
+        for inf, verb in self.verbs.items():
+            forms = verb["forms"].get(tense)
+            if forms is None:
+                continue
+            if person is not None and isinstance(forms, dict):
+                if person not in forms:
+                    continue
+                forms = forms[person]
+            table[inf] = forms
+        return table
+
+
+# Loaded once per process on first use
+_conjugations = None
+
+
+def get_conjugations() -> Conjugations:
+    global _conjugations
+    if _conjugations is None:
+        _conjugations = Conjugations()
+    return _conjugations
+
+
+def main():
+    conj = Conjugations()
+    problems = 0
+    for inf, verb in conj.verbs.items():
+        for tense in conj.tenses:
+            forms = verb["forms"].get(tense, "missing")
+            if forms == "missing":
+                print(f"[ERROR] {inf}: no {tense}", file=sys.stderr)
+                problems += 1
+            elif isinstance(forms, dict) and tense != "imperatif" and list(forms) != conj.persons:
+                print(f"[ERROR] {inf} {tense}: persons {list(forms)}", file=sys.stderr)
+                problems += 1
+    print(f"[INFO] {len(conj.verbs)} verbs x {len(conj.tenses)} tenses in {CONJUGATIONS_JSON}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,583 @@
+#!/usr/bin/env python3
+"""
+conjugator.py
+
+French conjugation engine for the tenses in static/learn-your-verbs/the-plan.md.
+
+conjugations.json only knows the verbs someone wrote pages for; this
+conjugates any verb from rules:
+  - regular -er verbs, with their spelling changes (commençons, mangeons,
+    lève, préfère, appelle, jette, nettoie)
+  - regular -ir (finir) and -re (vendre) verbs
+  - irregular models matched by ending, so one table covers a family
+    (prendre -> comprendre, apprendre; venir -> devenir, se souvenir;
+    -aindre/-eindre/-oindre, -uire, -cevoir, ...)
+  - pronominal verbs, with "en" too (s’en aller -> je m’en vais, va-t’en)
+  - the auxiliary (être for aller, venir, naître..., and pronominal verbs)
+  - past participle agreement (agree("pris", feminine=True, plural=True) -> "prises")
+
+Results have the shape of a conjugations.json verb entry ("forms": tense ->
+person -> form, no subject pronoun, masculine agreement unless asked), so
+the generated pages, /api/conjugations and the exercises can use either.
+
+Rule tables are compiled once at import.  The top verbs
+(static/learn-your-verbs/top-verbs.txt) are resolved to their model when the
+engine is created, and full conjugation tables are memoised in an LRU cache:
+a cold table takes tens of microseconds, a repeat lookup well under one
+(python3 tools/bench_conjugator.py).
+
+Query (from api_app.py or build_site.py):
+  from conjugator import get_conjugator, agree
+  get_conjugator().conjugate("se souvenir")["forms"]["pc"]["je"]   -> "me suis souvenu"
+  get_conjugator().form("comprendre", "futur", "nous")            -> "comprendrons"
+
+Check against the hand-verified dataset:
+  python3 conjugator.py --check
+  python3 conjugator.py lever [--feminine]
+"""
+
+import argparse
+import json
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+VERBS_DIR = BASE_DIR / "static" / "learn-your-verbs"
+TOP_VERBS_TXT = VERBS_DIR / "top-verbs.txt"
+CONJUGATIONS_JSON = VERBS_DIR / "conjugations.json"
+
+PERSONS = ("je", "tu", "il", "nous", "vous", "ils")
+IMPERATIVE_PERSONS = ("tu", "nous", "vous")
+PLURAL = {"nous", "vous", "ils"}
+
+# Memoised full tables; the whole top-verbs list fits (about 8 MB).
+CACHE_SIZE = 4096
+
+VOWELS = frozenset("aeiouyâàäéèêëîïôöûùüœæ")
+
+# Words starting with an "aspirated" h take no elision: je hais, de hurler.
+H_ASPIRE = frozenset("""
+    hacher haïr haleter hâler hanter happer harceler harnacher hasarder hâter hausser héler hennir
+    hérisser heurter hisser hocher honnir hoqueter huer hurler
+""".split())
+
+# Verbs conjugated with être (besides pronominal ones)
+ETRE_VERBS = frozenset("""
+    aller arriver décéder descendre redescendre devenir redevenir entrer rentrer monter remonter
+    mourir naître renaître partir repartir passer repasser rester retourner revenir sortir ressortir
+    tomber retomber venir survenir parvenir intervenir advenir provenir apparaître éclore
+""".split())
+# ...of which these take avoir with a direct object (Elle a sorti le chien): "aux_transitive"
+DUAL_AUX = frozenset("descendre redescendre rentrer monter remonter passer repasser retourner sortir ressortir".split())
+
+# -eler / -eter verbs that take è instead of doubling the consonant.
+E_GRAVE_ELER_ETER = frozenset("""
+    acheter racheter geler dégeler congeler surgeler modeler remodeler peler harceler marteler ciseler
+    démanteler écarteler celer receler déceler crocheter fureter haleter corseter
+""".split())
+
+# ---------------------------------------------------------------------
+# Endings
+# ---------------------------------------------------------------------
+ER_PRESENT = ("e", "es", "e", "ons", "ez", "ent")
+IR_PRESENT = ("is", "is", "it", "issons", "issez", "issent")
+RE_PRESENT = ("s", "s", "", "ons", "ez", "ent")
+IMPARFAIT = ("ais", "ais", "ait", "ions", "iez", "aient")
+FUTUR = ("ai", "as", "a", "ons", "ez", "ont")
+SUBJONCTIF = ("e", "es", "e", "ions", "iez", "ent")
+MUTE_E = (0, 1, 2, 5)   # persons whose -er ending is a silent e (je, tu, il, ils)
+
+# ---------------------------------------------------------------------
+# Irregular models
+#
+# ending: (present, future stem, past participle, extras)
+# Every string is the full form of the ending itself; a verb is matched to
+# its longest listed ending and whatever precedes it is prefixed to every
+# form (com + prendre -> com + prends).  extras may give "imparfait" (stem),
+# "subj" (6 forms), "imp" (3 forms, or None when there is no imperative),
+# "ppres" and "persons" (impersonal verbs).  Anything not given is derived:
+# imparfait and present participle from the nous form, the subjunctive from
+# ils + nous/vous of the imparfait, the imperative from the present.
+# ---------------------------------------------------------------------
+MODELS = {
+    "être": ("suis es est sommes êtes sont", "ser", "été",
+             {"imparfait": "ét", "subj": "sois sois soit soyons soyez soient", "imp": "sois soyons soyez",
+              "ppres": "étant"}),
+    "avoir": ("ai as a avons avez ont", "aur", "eu",
+              {"subj": "aie aies ait ayons ayez aient", "imp": "aie ayons ayez", "ppres": "ayant"}),
+    "aller": ("vais vas va allons allez vont", "ir", "allé",
+              {"subj": "aille ailles aille allions alliez aillent", "imp": "va allons allez"}),
+    "envoyer": ("envoie envoies envoie envoyons envoyez envoient", "enverr", "envoyé", {}),
+    # -ir
+    "venir": ("viens viens vient venons venez viennent", "viendr", "venu", {}),
+    "tenir": ("tiens tiens tient tenons tenez tiennent", "tiendr", "tenu", {}),
+    "partir": ("pars pars part partons partez partent", "partir", "parti", {}),
+    "sortir": ("sors sors sort sortons sortez sortent", "sortir", "sorti", {}),
+    "sentir": ("sens sens sent sentons sentez sentent", "sentir", "senti", {}),
+    "mentir": ("mens mens ment mentons mentez mentent", "mentir", "menti", {}),
+    "repentir": ("repens repens repent repentons repentez repentent", "repentir", "repenti", {}),
+    "dormir": ("dors dors dort dormons dormez dorment", "dormir", "dormi", {}),
+    "servir": ("sers sers sert servons servez servent", "servir", "servi", {}),
+    "vêtir": ("vêts vêts vêt vêtons vêtez vêtent", "vêtir", "vêtu", {}),
+    "vrir": ("vre vres vre vrons vrez vrent", "vrir", "vert", {}),          # ouvrir, couvrir
+    "frir": ("fre fres fre frons frez frent", "frir", "fert", {}),          # offrir, souffrir
+    "cueillir": ("cueille cueilles cueille cueillons cueillez cueillent", "cueiller", "cueilli", {}),
+    "courir": ("cours cours court courons courez courent", "courr", "couru", {}),
+    "mourir": ("meurs meurs meurt mourons mourez meurent", "mourr", "mort", {}),
+    "quérir": ("quiers quiers quiert quérons quérez quièrent", "querr", "quis", {}),  # acquérir
+    "fuir": ("fuis fuis fuit fuyons fuyez fuient", "fuir", "fui", {}),
+    "bouillir": ("bous bous bout bouillons bouillez bouillent", "bouillir", "bouilli", {}),
+    "haïr": ("hais hais hait haïssons haïssez haïssent", "haïr", "haï", {}),
+    # -oir
+    "voir": ("vois vois voit voyons voyez voient", "verr", "vu", {}),
+    "prévoir": ("prévois prévois prévoit prévoyons prévoyez prévoient", "prévoir", "prévu", {}),
+    "pourvoir": ("pourvois pourvois pourvoit pourvoyons pourvoyez pourvoient", "pourvoir", "pourvu", {}),
+    "cevoir": ("çois çois çoit cevons cevez çoivent", "cevr", "çu", {}),    # recevoir
+    "devoir": ("dois dois doit devons devez doivent", "devr", "dû", {}),
+    "pouvoir": ("peux peux peut pouvons pouvez peuvent", "pourr", "pu",
+                {"subj": "puisse puisses puisse puissions puissiez puissent", "imp": None}),
+    "savoir": ("sais sais sait savons savez savent", "saur", "su",
+               {"subj": "sache saches sache sachions sachiez sachent", "imp": "sache sachons sachez",
+                "ppres": "sachant"}),
+    "vouloir": ("veux veux veut voulons voulez veulent", "voudr", "voulu",
+                {"subj": "veuille veuilles veuille voulions vouliez veuillent", "imp": "veuille veuillons veuillez"}),
+    "valoir": ("vaux vaux vaut valons valez valent", "vaudr", "valu",
+               {"subj": "vaille vailles vaille valions valiez vaillent"}),
+    "mouvoir": ("meus meus meut mouvons mouvez meuvent", "mouvr", "mû", {}),
+    "émouvoir": ("émeus émeus émeut émouvons émouvez émeuvent", "émouvr", "ému", {}),
+    "promouvoir": ("promeus promeus promeut promouvons promouvez promeuvent", "promouvr", "promu", {}),
+    "asseoir": ("assieds assieds assied asseyons asseyez asseyent", "assiér", "assis", {}),
+    "falloir": ("- - faut - - -", "faudr", "fallu",
+                {"imparfait": "fall", "subj": "- - faille - - -", "imp": None, "ppres": None, "persons": ("il",)}),
+    "pleuvoir": ("- - pleut - - -", "pleuvr", "plu",
+                 {"imparfait": "pleuv", "subj": "- - pleuve - - -", "imp": None, "ppres": None, "persons": ("il",)}),
+    # -re
+    "faire": ("fais fais fait faisons faites font", "fer", "fait",
+              {"subj": "fasse fasses fasse fassions fassiez fassent"}),
+    "dire": ("dis dis dit disons dites disent", "dir", "dit", {}),
+    "contredire": ("contredis contredis contredit contredisons contredisez contredisent", "contredir", "contredit", {}),
+    "interdire": ("interdis interdis interdit interdisons interdisez interdisent", "interdir", "interdit", {}),
+    "prédire": ("prédis prédis prédit prédisons prédisez prédisent", "prédir", "prédit", {}),
+    "médire": ("médis médis médit médisons médisez médisent", "médir", "médit", {}),
+    "maudire": ("maudis maudis maudit maudissons maudissez maudissent", "maudir", "maudit", {}),
+    "prendre": ("prends prends prend prenons prenez prennent", "prendr", "pris", {}),
+    "mettre": ("mets mets met mettons mettez mettent", "mettr", "mis", {}),
+    "battre": ("bats bats bat battons battez battent", "battr", "battu", {}),
+    "rompre": ("romps romps rompt rompons rompez rompent", "rompr", "rompu", {}),
+    "vaincre": ("vaincs vaincs vainc vainquons vainquez vainquent", "vaincr", "vaincu", {}),
+    "aindre": ("ains ains aint aignons aignez aignent", "aindr", "aint", {}),   # craindre
+    "eindre": ("eins eins eint eignons eignez eignent", "eindr", "eint", {}),   # peindre
+    "oindre": ("oins oins oint oignons oignez oignent", "oindr", "oint", {}),   # joindre
+    "uire": ("uis uis uit uisons uisez uisent", "uir", "uit", {}),             # conduire
+    "nuire": ("nuis nuis nuit nuisons nuisez nuisent", "nuir", "nui", {}),
+    "luire": ("luis luis luit luisons luisez luisent", "luir", "lui", {}),
+    "aître": ("ais ais aît aissons aissez aissent", "aîtr", "u", {}),         # paraître
+    "connaître": ("connais connais connaît connaissons connaissez connaissent", "connaîtr", "connu", {}),
+    "naître": ("nais nais naît naissons naissez naissent", "naîtr", "né", {}),
+    "crire": ("cris cris crit crivons crivez crivent", "crir", "crit", {}),   # écrire
+    "lire": ("lis lis lit lisons lisez lisent", "lir", "lu", {}),
+    "rire": ("ris ris rit rions riez rient", "rir", "ri", {}),
+    "suffire": ("suffis suffis suffit suffisons suffisez suffisent", "suffir", "suffi", {}),
+    "suivre": ("suis suis suit suivons suivez suivent", "suivr", "suivi", {}),
+    "vivre": ("vis vis vit vivons vivez vivent", "vivr", "vécu", {}),
+    "boire": ("bois bois boit buvons buvez boivent", "boir", "bu", {}),
+    "croire": ("crois crois croit croyons croyez croient", "croir", "cru", {}),
+    "plaire": ("plais plais plaît plaisons plaisez plaisent", "plair", "plu", {}),
+    "taire": ("tais tais tait taisons taisez taisent", "tair", "tu", {}),
+    "traire": ("trais trais trait trayons trayez traient", "trair", "trait", {}),   # extraire
+    "coudre": ("couds couds coud cousons cousez cousent", "coudr", "cousu", {}),
+    "moudre": ("mouds mouds moud moulons moulez moulent", "moudr", "moulu", {}),
+    "soudre": ("sous sous sout solvons solvez solvent", "soudr", "solu", {}),   # résoudre
+    "absoudre": ("absous absous absout absolvons absolvez absolvent", "absoudr", "absous", {}),
+    "dissoudre": ("dissous dissous dissout dissolvons dissolvez dissolvent", "dissoudr", "dissous", {}),
+    "clure": ("clus clus clut cluons cluez cluent", "clur", "clu", {}),         # conclure
+    "inclure": ("inclus inclus inclut incluons incluez incluent", "inclur", "inclus", {}),
+}
+
+# Models that are whole verbs, not endings (installer is not in-st + aller)
+EXACT_ONLY = frozenset(("être", "avoir", "aller"))
+# Look-alikes of a model ending that conjugate regularly
+REGULAR_IR = frozenset("répartir impartir assortir asservir".split())
+
+
+class _Model:
+    """Compiled endings of one conjugation pattern, relative to its ending."""
+    __slots__ = ("name", "group", "present", "fut", "pp", "imparfait", "soft", "subj", "imp", "ppres", "persons")
+
+    def __init__(self, name, group, present, fut, pp, extras):
+        self.name = name
+        self.group = group
+        self.present = tuple(present)
+        self.fut = fut
+        self.pp = pp
+        self.persons = extras.get("persons", PERSONS)
+        self.soft = extras.get("soft")   # -cer / -ger: stem before a and o (commenç, mange)
+        nous = self.present[3]
+        self.imparfait = extras.get("imparfait", nous[:-3])
+        if "subj" in extras:
+            self.subj = tuple(extras["subj"].split())
+        else:
+            subj = [self.present[5][:-3] + e for e in SUBJONCTIF]
+            subj[3] = self.imparfait + "ions"
+            subj[4] = self.imparfait + "iez"
+            self.subj = tuple(subj)
+        if "imp" in extras:
+            self.imp = tuple(extras["imp"].split()) if extras["imp"] else None
+        else:
+            tu = self.present[1]
+            if tu.endswith("es") or tu == "vas":
+                tu = tu[:-1]   # parle, ouvre, va
+            self.imp = (tu, self.present[3], self.present[4])
+        self.ppres = extras.get("ppres", (self.soft or self.imparfait) + "ant")
+
+
+# Irregular models are third group, except these two
+MODEL_GROUPS = {"envoyer": 1, "haïr": 2}
+
+_MODELS = {ending: _Model(ending, MODEL_GROUPS.get(ending, 3), present.split(), fut, pp, extras)
+           for ending, (present, fut, pp, extras) in MODELS.items()}
+_ENDINGS_BY_LENGTH = sorted({len(e) for e in _MODELS}, reverse=True)
+
+
+def _aux_tables() -> dict:
+    """Simple tenses of avoir / être (for compound tenses) and aller / venir (futur proche, passé récent)."""
+    tables = {}
+    for verb in ("avoir", "être"):
+        model = _MODELS[verb]
+        tables[verb] = {
+            "present": model.present,
+            "imparfait": tuple(model.imparfait + e for e in IMPARFAIT),
+            "futur": tuple(model.fut + e for e in FUTUR),
+            "conditionnel": tuple(model.fut + e for e in IMPARFAIT),
+            "subjonctif": model.subj,
+        }
+    tables["aller"] = _MODELS["aller"].present
+    tables["venir"] = _MODELS["venir"].present
+    return tables
+
+
+_AUX = _aux_tables()
+
+
+# ---------------------------------------------------------------------
+# Regular patterns
+# ---------------------------------------------------------------------
+def _first_group(inf: str) -> _Model:
+    """An -er verb with its spelling changes, as a model of its own."""
+    stem = inf[:-2]
+    soft = None
+    if stem.endswith("c"):
+        soft = stem[:-1] + "ç"
+    elif stem.endswith("g"):
+        soft = stem + "e"
+
+    mute = stem                       # before a silent e
+    fut = inf
+    if stem.endswith(("oy", "uy", "ay")):
+        mute = stem[:-1] + "i"        # nettoie, essuie, paie
+        fut = mute + "er"
+    else:
+        tail = len(stem) - 1
+        while tail > 0 and (stem[tail] not in VOWELS or stem[tail - 1:tail + 1] in ("gu", "qu")):
+            tail -= 1                 # vowel before the final consonants (gu / qu count as one)
+        cluster = stem[tail + 1:]
+        if cluster and stem[tail] == "é":
+            mute = stem[:tail] + "è" + cluster        # préfère (but préférera)
+        elif cluster and stem[tail] == "e" and (len(cluster) == 1 or cluster in ("vr", "br")):
+            if cluster in ("l", "t") and inf not in E_GRAVE_ELER_ETER:
+                mute = stem + cluster                 # appelle, jette
+            else:
+                mute = stem[:tail] + "è" + cluster    # lève, achète
+            fut = mute + "er"
+
+    present = [(mute if i in MUTE_E else stem) + e for i, e in enumerate(ER_PRESENT)]
+    if soft:
+        present[3] = soft + "ons"
+    subj = " ".join((mute if i in MUTE_E else stem) + e for i, e in enumerate(SUBJONCTIF))
+    return _Model("er", 1, present, fut, stem + "é", {"imparfait": stem, "soft": soft, "subj": subj})
+
+
+def _second_group(inf: str) -> _Model:
+    stem = inf[:-2]
+    return _Model("ir", 2, [stem + e for e in IR_PRESENT], inf, stem + "i", {})
+
+
+def _third_group_re(inf: str) -> _Model:
+    stem = inf[:-2]
+    return _Model("re", 3, [stem + e for e in RE_PRESENT], inf[:-1], stem + "u", {})
+
+
+# ---------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------
+def elides(word: str, infinitive: str | None = None) -> bool:
+    """True if je / me / te / se / de / que elide before `word` (j’aime, d’habiter, je hais)."""
+    first = word[:1].lower()
+    if first == "h":
+        return (infinitive or word) not in H_ASPIRE
+    return first in VOWELS
+
+
+def agree(pp: str, feminine: bool = False, plural: bool = False) -> str:
+    """Past participle agreement: allé -> allée / allés; pris -> prise / pris; dû -> due / dus; dissous -> dissoute."""
+    if pp.endswith("û") and (feminine or plural):
+        pp = pp[:-1] + "u"
+    if feminine and pp.endswith(("absous", "dissous")):
+        pp = pp[:-1] + "t"
+    if feminine:
+        pp += "e"
+    if plural and not pp.endswith(("s", "x")):
+        pp += "s"
+    return pp
+
+
+def split_pronominal(verb: str) -> tuple[str, bool, bool]:
+    """'se lever' -> ('lever', True, False); "s'habiller" -> ('habiller', True, False);
+    "s'en aller" -> ('aller', True, True)."""
+    verb = " ".join(verb.strip().lower().replace("'", "’").split())
+    if verb.startswith("s’en "):
+        return verb[5:], True, True
+    if verb.startswith("se "):
+        return verb[3:], True, False
+    if verb.startswith("s’"):
+        return verb[2:], True, False
+    return verb, False, False
+
+
+REFLEXIVE = {"je": "me", "tu": "te", "il": "se", "nous": "nous", "vous": "vous", "ils": "se"}
+IMPERATIVE_REFLEXIVE = {"tu": "toi", "nous": "nous", "vous": "vous"}
+# With "en" (s'en aller): je m'en vais, va-t'en, allons-nous-en
+IMPERATIVE_REFLEXIVE_EN = {"tu": "t’en", "nous": "nous-en", "vous": "vous-en"}
+
+
+class ConjugationError(ValueError):
+    pass
+
+
+# ---------------------------------------------------------------------
+# Engine
+# ---------------------------------------------------------------------
+class Conjugator:
+    def __init__(self, top_verbs: list[str] | None = None, cache_size: int = CACHE_SIZE):
+        # Top verbs are resolved to their (model, prefix) once; full tables are memoised.
+        self.index = {}
+        for verb in top_verbs or []:
+            inf, _, _ = split_pronominal(verb)
+            try:
+                self.index[inf] = self._resolve(inf)
+            except ConjugationError as e:
+                print(f"[ERROR] {TOP_VERBS_TXT.name}: {e}", file=sys.stderr)
+        self.conjugate = lru_cache(maxsize=cache_size)(self._conjugate)
+
+    @staticmethod
+    def _resolve(inf: str) -> tuple[_Model, str]:
+        """(model, prefix) for an infinitive without 'se'."""
+        if inf in REGULAR_IR:
+            return _second_group(inf), ""
+        for n in _ENDINGS_BY_LENGTH:
+            ending = inf[-n:]
+            if n <= len(inf) and ending in _MODELS and (n == len(inf) or ending not in EXACT_ONLY):
+                return _MODELS[ending], inf[:-n]
+        if len(inf) > 2 and inf.endswith("er"):
+            return _first_group(inf), ""
+        if len(inf) > 2 and inf.endswith("ir"):
+            return _second_group(inf), ""
+        if len(inf) > 3 and inf.endswith("re"):
+            return _third_group_re(inf), ""
+        raise ConjugationError(f"{inf!r} is not an infinitive this engine can conjugate")
+
+    def warm(self) -> int:
+        """Fill the cache with every top verb; returns how many tables were built."""
+        for inf in self.index:
+            self.conjugate(inf)
+        return len(self.index)
+
+    def _conjugate(self, verb: str, feminine: bool = False) -> dict:
+        inf, pronominal, en = split_pronominal(verb)
+        model, prefix = self.index.get(inf) or self._resolve(inf)
+        aux = "être" if pronominal or inf in ETRE_VERBS else "avoir"
+        persons = model.persons
+
+        def reflexive(person, form):
+            """me lève, m’habille, se levant, m’en vais (pronominal verbs only)."""
+            if not pronominal:
+                return form
+            pron = REFLEXIVE[person]
+            if en:
+                form = "en " + form
+            if pron != "nous" and pron != "vous" and elides(form, inf):
+                return pron[0] + "’" + form
+            return f"{pron} {form}"
+
+        def simple(forms):
+            return {person: reflexive(person, prefix + forms[i])
+                    for i, person in enumerate(PERSONS) if person in persons}
+
+        def compound(tense):
+            out = {}
+            for i, person in enumerate(PERSONS):
+                if person in persons:
+                    part = agree(pp, feminine, person in PLURAL) if aux == "être" else pp
+                    out[person] = reflexive(person, f"{_AUX[aux][tense][i]} {part}")
+            return out
+
+        imparfait = [(model.soft if model.soft and i not in (3, 4) else model.imparfait) + e
+                     for i, e in enumerate(IMPARFAIT)]
+        futur = [model.fut + e for e in FUTUR]
+        conditionnel = [model.fut + e for e in IMPARFAIT]
+        pp = prefix + model.pp
+        ppres = reflexive("il", prefix + model.ppres) if model.ppres else None
+
+        forms = {
+            "present": simple(model.present),
+            "imperatif": None,
+            "futur-proche": {},
+            "pc": compound("present"),
+            "infinitif": reflexive("il", inf),
+            "imparfait": simple(imparfait),
+            "futur": simple(futur),
+            "conditionnel": simple(conditionnel),
+            "participe-present": ppres,
+            "passe-recent": {},
+            "plus-que-parfait": compound("imparfait"),
+            "subjonctif": simple(model.subj),
+            "conditionnel-passe": compound("conditionnel"),
+            "futur-anterieur": compound("futur"),
+            "subjonctif-passe": compound("subjonctif"),
+            "gerondif": f"en {ppres}" if ppres else None,
+        }
+        for i, person in enumerate(PERSONS):
+            if person in persons:
+                phrase = reflexive(person, inf)
+                de = "d’" if elides(phrase, inf) else "de "
+                forms["futur-proche"][person] = f"{_AUX['aller'][i]} {phrase}"
+                forms["passe-recent"][person] = f"{_AUX['venir'][i]} {de}{phrase}"
+        if model.imp:
+            pronouns = IMPERATIVE_REFLEXIVE_EN if en else IMPERATIVE_REFLEXIVE
+            forms["imperatif"] = {
+                person: prefix + form + (f"-{pronouns[person]}" if pronominal else "")
+                for person, form in zip(IMPERATIVE_PERSONS, model.imp)
+            }
+
+        return {
+            "infinitive": forms["infinitif"],
+            "group": model.group,
+            "aux": aux,
+            "aux_transitive": "avoir" if aux == "être" and not pronominal and inf in DUAL_AUX else None,
+            "pp": pp,
+            "pronominal": pronominal,
+            "model": model.name,
+            "known": inf in self.index,
+            "forms": forms,
+        }
+
+    def form(self, verb: str, tense: str, person: str | None = None, feminine: bool = False):
+        forms = self.conjugate(verb, feminine)["forms"].get(tense)
+        if person is None or not isinstance(forms, dict):
+            return forms
+        return forms.get(person)
+
+
+def load_top_verbs(path: Path = TOP_VERBS_TXT) -> list[str]:
+    """One infinitive per line, most frequent first; # comments allowed."""
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return []
+    return [line.split("#", 1)[0].strip() for line in lines if line.split("#", 1)[0].strip()]
+
+
+# Built once per process on first use
+_conjugator = None
+
+
+def get_conjugator() -> Conjugator:
+    global _conjugator
+    if _conjugator is None:
+        _conjugator = Conjugator(load_top_verbs())
+    return _conjugator
+
+
+def check_dataset(conj: Conjugator, path: Path = CONJUGATIONS_JSON) -> int:
+    """Compare the engine with conjugations.json; returns the number of differences."""
+    data = json.loads(path.read_text(encoding="utf-8"))
+    problems = 0
+    for inf, verb in data["verbs"].items():
+        got = conj.conjugate(inf)
+        for key in ("aux", "pp", "group"):
+            if got[key] != verb[key]:
+                print(f"[ERROR] {inf} {key}: dataset {verb[key]!r}, engine {got[key]!r}", file=sys.stderr)
+                problems += 1
+        for tense, expected in verb["forms"].items():
+            if got["forms"].get(tense) != expected:
+                print(f"[ERROR] {inf} {tense}:\n  dataset {expected}\n  engine  {got['forms'].get(tense)}",
+                      file=sys.stderr)
+                problems += 1
+    print(f"[INFO] {len(data['verbs'])} verbs checked against {path.name}: {problems} difference(s)")
+    return problems
+
+
+# Verbs outside conjugations.json whose forms the rules get wrong easily:
+# (verb, tense, person, feminine, expected)
+CHECK_FORMS = (
+    ("dissoudre", "pc", "je", False, "ai dissous"),
+    ("dissoudre", "present", "nous", False, "dissolvons"),
+    ("se dissoudre", "pc", "il", True, "s’est dissoute"),
+    ("absoudre", "pc", "il", False, "a absous"),
+    ("absoudre", "subjonctif", "je", False, "absolve"),
+    ("résoudre", "pc", "je", False, "ai résolu"),
+    ("mouvoir", "pc", "il", False, "a mû"),
+    ("mouvoir", "present", "ils", False, "meuvent"),
+    ("émouvoir", "pc", "il", False, "a ému"),
+    ("promouvoir", "futur", "je", False, "promouvrai"),
+    ("s’en aller", "present", "je", False, "m’en vais"),
+    ("s’en aller", "present", "nous", False, "nous en allons"),
+    ("s’en aller", "pc", "il", True, "s’en est allée"),
+    ("s’en aller", "imperatif", "tu", False, "va-t’en"),
+    ("s’en aller", "imperatif", "vous", False, "allez-vous-en"),
+    ("s’en aller", "futur-proche", "je", False, "vais m’en aller"),
+    ("s’en aller", "infinitif", None, False, "s’en aller"),
+)
+
+
+def check_forms(conj: Conjugator) -> int:
+    """Compare the engine with CHECK_FORMS; returns the number of differences."""
+    problems = 0
+    for verb, tense, person, feminine, expected in CHECK_FORMS:
+        got = conj.form(verb, tense, person, feminine)
+        if got != expected:
+            print(f"[ERROR] {verb} {tense} {person or ''}: expected {expected!r}, engine {got!r}", file=sys.stderr)
+            problems += 1
+    print(f"[INFO] {len(CHECK_FORMS)} forms of verbs outside {CONJUGATIONS_JSON.name} checked: "
+          f"{problems} difference(s)")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conjugate French verbs, or check the engine against conjugations.json.")
+    parser.add_argument("verbs", nargs="*", help="Infinitives, e.g. 'lever' 'se souvenir' \"s'en aller\"")
+    parser.add_argument("--feminine", action="store_true", help="Feminine agreement in être compound tenses")
+    parser.add_argument("--check", action="store_true", help=f"Compare with {CONJUGATIONS_JSON.name} and the top-verbs list")
+    args = parser.parse_args()
+
+    conj = get_conjugator()
+    if args.check:
+        problems = check_dataset(conj)
+        top = load_top_verbs()
+        problems += check_forms(conj)
+        failed = [v for v in top if split_pronominal(v)[0] not in conj.index]
+        print(f"[INFO] {len(top) - len(failed)} of {len(top)} verbs in {TOP_VERBS_TXT.name} resolved to a model")
+        sys.exit(1 if problems or failed else 0)
+    if not args.verbs:
+        parser.error("give verbs to conjugate, or --check")
+    for verb in args.verbs:
+        try:
+            print(json.dumps(conj.conjugate(verb, args.feminine), ensure_ascii=False, indent=1))
+        except ConjugationError as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
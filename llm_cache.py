@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+llm_cache.py - Persistent cache for OpenAI chat completions
+
+A single SQLite file shared by the generation scripts and the API app.
+Answers are keyed by (model, messages hash, temperature, response_format);
+the messages hash also covers any other request parameters (max_tokens, ...),
+so two requests only share an answer if they would have sent the same body.
+
+    client = cached_client(OpenAI())
+    client.chat.completions.create(model=..., messages=...)   # cached
+
+Everything else on the client (audio, images, ...) passes straight through.
+Pass cache_variant=<anything> to create() to ask the same prompt for a
+different answer, e.g. the 2nd and 3rd example sentence for one expression.
+
+Pass cache_validate=fn to create() to keep bad answers out of the cache:
+fn(response) raises ValueError (or KeyError/TypeError) for an answer the
+caller cannot use.  Such an answer is not stored, so asking again reaches the
+API instead of replaying it for 30 days; the error propagates as usual.  A
+cached answer that fails fn is treated as a miss.
+
+The scripts under static/<category>/ run from their own directory, so they
+put the repo root (this module) and tools/ (llm_batch.py, examples_sql.py)
+on sys.path before importing, with whichever of these lines they need:
+
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools"))
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+A lookup only reads the file (a hit refreshes last_used at most once an
+hour), so mod_wsgi processes and scripts do not queue on SQLite's write lock.
+Hit/miss counts are kept per process and exported through metrics().  A
+sqlite3 error while looking up or storing ("database is locked", disk full)
+is reported on stderr and treated as a miss or a skipped store.
+
+Configuration (environment):
+  LLM_CACHE_PATH         SQLite file (default ~/.cache/frflashy/llm-cache.sqlite3)
+  LLM_CACHE_MODE         on (default) | off | replay
+                         replay is read-only and raises CacheMiss instead of
+                         calling the API, for offline tests
+  LLM_CACHE_TTL          seconds an answer stays valid (default 30 days)
+  LLM_CACHE_MAX_ENTRIES  least recently used answers beyond this are evicted
+                         (default 50000)
+
+Usage:
+  python3 llm_cache.py            # show entries and hit/miss stats
+  python3 llm_cache.py --purge    # drop expired entries and enforce the size bound
+  python3 llm_cache.py --clear    # drop everything
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_PATH = Path.home() / ".cache" / "frflashy" / "llm-cache.sqlite3"
+DEFAULT_TTL = 30 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 50000
+MODES = ("on", "off", "replay")
+
+# Check the size bound every this many stores rather than on every write.
+EVICT_EVERY = 100
+# A hit refreshes an entry's last_used (for LRU eviction) at most this often,
+# so lookups are reads and do not queue on SQLite's write lock.
+TOUCH_EVERY = 3600
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS responses (
+        model            TEXT NOT NULL,
+        messages_hash    TEXT NOT NULL,
+        temperature      TEXT NOT NULL,
+        response_format  TEXT NOT NULL,
+        response         TEXT NOT NULL,
+        created_at       REAL NOT NULL,
+        last_used        REAL NOT NULL,
+        hits             INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (model, messages_hash, temperature, response_format)
+    );
+    CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used);
+"""
+
+
+class CacheMiss(LookupError):
+    """Raised in replay mode when a request has no cached answer."""
+
+
+def request_key(kwargs: dict) -> tuple[str, str, str, str]:
+    """(model, messages hash, temperature, response_format) for a create() call."""
+    rest = {k: v for k, v in kwargs.items()
+            if k not in ("model", "temperature", "response_format")}
+    messages_hash = hashlib.sha256(
+        json.dumps(rest, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    ).hexdigest()
+    return (
+        str(kwargs.get("model", "")),
+        messages_hash,
+        json.dumps(kwargs.get("temperature")),
+        json.dumps(kwargs.get("response_format"), sort_keys=True),
+    )
+
+
+class LLMCache:
+    def __init__(self, path=None, mode=None, ttl=None, max_entries=None):
+        self.path = Path(path or os.getenv("LLM_CACHE_PATH") or DEFAULT_PATH)
+        self.mode = (mode or os.getenv("LLM_CACHE_MODE") or "on").lower()
+        if self.mode not in MODES:
+            raise ValueError(f"LLM_CACHE_MODE must be one of {', '.join(MODES)}")
+        self.ttl = float(ttl if ttl is not None else os.getenv("LLM_CACHE_TTL", DEFAULT_TTL))
+        self.max_entries = int(max_entries if max_entries is not None
+                               else os.getenv("LLM_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        if self.mode != "off":
+            try:
+                self._conn()
+            except (sqlite3.Error, OSError) as e:
+                if self.mode == "replay":
+                    raise
+                # A cache that cannot be opened must never break the caller.
+                print(f"[WARN] LLM cache disabled, cannot open {self.path}: {e}", file=sys.stderr)
+                self.mode = "off"
+
+    # -----------------------------------------------------------------
+    # SQLite plumbing: one connection per thread, WAL so that several
+    # processes (scripts, mod_wsgi workers) can share the file.
+    # -----------------------------------------------------------------
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self.mode == "replay":
+                conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, timeout=10)
+            else:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(self.path, timeout=10)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: tuple) -> str | None:
+        """Cached response JSON for key, or None if absent, expired or unreadable."""
+        if self.mode == "off":
+            return None
+        now = time.time()
+        try:
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT response, created_at, last_used FROM responses "
+                "WHERE model = ? AND messages_hash = ? AND temperature = ? AND response_format = ?",
+                key,
+            ).fetchone()
+            hit = row is not None and now - row[1] <= self.ttl
+        except sqlite3.Error as e:
+            # A locked or broken cache file must never break the caller.
+            print(f"[WARN] LLM cache lookup failed, treated as a miss: {e}", file=sys.stderr)
+            row, hit = None, False
+        if hit and self.mode != "replay" and now - row[2] > TOUCH_EVERY:
+            try:
+                with conn:
+                    conn.execute(
+                        "UPDATE responses SET last_used = ?, hits = hits + 1 "
+                        "WHERE model = ? AND messages_hash = ? AND temperature = ? AND response_format = ?",
+                        (now, *key),
+                    )
+            except sqlite3.Error as e:
+                print(f"[WARN] LLM cache could not refresh last_used: {e}", file=sys.stderr)
+
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return row[0] if hit else None
+
+    def put(self, key: tuple, response_json: str):
+        if self.mode != "on":
+            return
+        now = time.time()
+        try:
+            conn = self._conn()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses "
+                    "(model, messages_hash, temperature, response_format, response, created_at, last_used, hits) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+                    (*key, response_json, now, now),
+                )
+        except sqlite3.Error as e:
+            print(f"[WARN] LLM cache store failed, answer not cached: {e}", file=sys.stderr)
+            return
+        with self._lock:
+            self.stores += 1
+            evict = self.stores % EVICT_EVERY == 0
+        if evict:
+            try:
+                self.purge()
+            except sqlite3.Error as e:
+                print(f"[WARN] LLM cache purge failed: {e}", file=sys.stderr)
+
+    def purge(self) -> int:
+        """Drop expired entries and the least recently used beyond max_entries."""
+        if self.mode != "on":
+            return 0
+        conn = self._conn()
+        with conn:
+            expired = conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,)
+            ).rowcount
+            over = conn.execute(
+                "DELETE FROM responses WHERE rowid IN ("
+                "  SELECT rowid FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+        return expired + over
+
+    def clear(self):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM responses")
+        conn.execute("VACUUM")
+
+    def stats(self) -> dict:
+        """This process's hits/misses plus what the cache file holds."""
+        stats = {"mode": self.mode, "path": str(self.path),
+                 "hits": self.hits, "misses": self.misses, "stores": self.stores}
+        lookups = self.hits + self.misses
+        stats["hit_ratio"] = round(self.hits / lookups, 3) if lookups else None
+        if self.mode != "off":
+            conn = self._conn()
+            stats["entries"], stats["entry_hits"] = conn.execute(
+                "SELECT count(*), coalesce(sum(hits), 0) FROM responses").fetchone()
+        return stats
+
+    def metrics(self) -> dict:
+        """This process's lookups, as an app_metrics collector."""
+        return {"counters": {
+            ("llm_cache_lookups_total", '{"result":"hit"}'): self.hits,
+            ("llm_cache_lookups_total", '{"result":"miss"}'): self.misses,
+        }}
+
+    # -----------------------------------------------------------------
+    # chat.completions.create with the cache in front
+    # -----------------------------------------------------------------
+    def chat_completion(self, completions, **kwargs):
+        variant = kwargs.pop("cache_variant", None)
+        validate = kwargs.pop("cache_validate", None)
+        if kwargs.get("stream") or self.mode == "off":
+            return completions.create(**kwargs)
+
+        key_kwargs = dict(kwargs, cache_variant=variant) if variant is not None else kwargs
+        key = request_key(key_kwargs)
+
+        from openai.types.chat import ChatCompletion
+
+        cached = self.get(key)
+        if cached is not None:
+            response = ChatCompletion.model_validate_json(cached)
+            try:
+                if validate is not None:
+                    validate(response)
+                return response
+            except (ValueError, KeyError, TypeError):
+                pass    # stored before the caller checked answers: ask again
+        if self.mode == "replay":
+            raise CacheMiss(f"No cached answer for {key[0]} request {key[1][:12]}")
+
+        response = completions.create(**kwargs)
+        if validate is not None:
+            validate(response)
+        self.put(key, response.model_dump_json())
+        return response
+
+    def wrap(self, client):
+        return CachedClient(client, self)
+
+
+class _CachedCompletions:
+    def __init__(self, completions, cache: LLMCache):
+        self._completions = completions
+        self._cache = cache
+
+    def create(self, **kwargs):
+        return self._cache.chat_completion(self._completions, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._completions, name)
+
+
+class _CachedChat:
+    def __init__(self, chat, cache: LLMCache):
+        self._chat = chat
+        self.completions = _CachedCompletions(getattr(chat, "completions", None), cache)
+
+    def __getattr__(self, name):
+        return getattr(self._chat, name)
+
+
+class CachedClient:
+    """An OpenAI client whose chat.completions.create() goes through the cache."""
+
+    def __init__(self, client, cache: LLMCache):
+        self._client = client
+        self.cache = cache
+        self.chat = _CachedChat(getattr(client, "chat", None), cache)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+# Create the cache only once when first needed
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMCache()
+    return _cache
+
+
+def cached_client(client) -> CachedClient:
+    return get_llm_cache().wrap(client)
+
+
+def main():
+    cache = get_llm_cache()
+    if cache.mode == "off":
+        print("LLM cache is off (LLM_CACHE_MODE=off)")
+        return
+
+    if "--clear" in sys.argv:
+        cache.clear()
+        print(f"Cleared {cache.path}")
+    elif "--purge" in sys.argv:
+        print(f"Removed {cache.purge()} entr(ies) from {cache.path}")
+
+    stats = cache.stats()
+    size_kb = cache.path.stat().st_size / 1024 if cache.path.exists() else 0
+    print(f"Cache:    {cache.path} ({size_kb:.1f} KB, mode {cache.mode})")
+    print(f"Entries:  {stats['entries']} (max {cache.max_entries}, TTL {cache.ttl / 86400:g} days)")
+    print(f"Reused:   {stats['entry_hits']} time(s) at least, counted once per entry per hour; "
+          "live hit/miss counts are llm_cache_lookups_total in the app's metrics")
+
+
+if __name__ == "__main__":
+    main()
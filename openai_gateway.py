@@ -0,0 +1,506 @@
+#!/usr/bin/env python3
+"""
+openai_gateway.py - One choke point for the web app's OpenAI calls
+
+Every upstream call made from a request handler goes through
+gateway.call(endpoint, fn, ...), which adds:
+
+  - per-endpoint concurrency limits: at most N calls in flight per endpoint;
+    extra callers queue up to QUEUE_TIMEOUT seconds and are then turned away
+  - token budgets: an hourly bucket per user, sized by tier, plus a shared
+    bucket per tier so one tier cannot starve the others
+  - coalescing: identical requests (same endpoint and key) that arrive
+    while one is in flight wait for it and share its upstream answer or
+    error; each caller's budget is still checked and charged first, and a
+    charge is refunded when the call is turned away (busy, circuit open)
+  - a circuit breaker per endpoint: after BREAKER_FAILURES consecutive
+    upstream failures (5xx, timeouts, lost connections - not a caller's 4xx)
+    calls fail fast for BREAKER_COOLDOWN seconds, then a single trial call
+    decides whether to close it again
+  - metrics: queue time and upstream latency per endpoint, via snapshot()
+    and add_listener() (api_app feeds them to app_metrics for /metrics)
+
+Refusals and upstream failures raise a GatewayError carrying an HTTP status
+and a message fit for the learner, unless the caller passed fallback=, in
+which case its return value is used instead.  Anything else fn() raises (a
+4xx such as openai.BadRequestError for unreadable audio) is re-raised as is.
+
+Users' budget buckets are dropped once they have been idle long enough to be
+full again, so a long-lived daemon does not keep one per user ever seen.
+
+State is per process; under mod_wsgi each daemon process enforces the
+limits and budgets on its own share of the traffic.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import Future
+
+# Tier numbers as in api_app.py
+TIER_GRATIS, TIER_BASIC, TIER_PRO, TIER_PREMIUM, TIER_ADMIN = range(5)
+
+# Calls in flight per endpoint
+ENDPOINT_CONCURRENCY = {
+    "transcribe": 4,
+    "chat": 8,
+    "speech": 8,
+}
+DEFAULT_CONCURRENCY = 4
+QUEUE_TIMEOUT = 10.0
+
+# Estimated tokens per user per hour, by tier (None = unlimited)
+USER_TOKENS_PER_HOUR = {
+    TIER_GRATIS: 5_000,
+    TIER_BASIC: 20_000,
+    TIER_PRO: 60_000,
+    TIER_PREMIUM: 150_000,
+    TIER_ADMIN: None,
+}
+# Estimated tokens per hour for all users of a tier together
+TIER_TOKENS_PER_HOUR = {
+    TIER_GRATIS: 200_000,
+    TIER_BASIC: 500_000,
+    TIER_PRO: 1_000_000,
+    TIER_PREMIUM: 2_000_000,
+    TIER_ADMIN: None,
+}
+
+BREAKER_FAILURES = 5
+BREAKER_COOLDOWN = 30.0
+
+# How often idle users' buckets are dropped (seconds).  A bucket untouched
+# for an hour has refilled completely, so dropping it changes nothing.
+PRUNE_EVERY = 300.0
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 30)
+
+
+class GatewayError(Exception):
+    """A call the gateway refused or that failed upstream."""
+
+    status = 503
+    user_message = "The pronunciation service is busy right now. Please try again in a moment."
+
+    def __init__(self, message: str = "", user_message: str | None = None):
+        super().__init__(message or self.user_message)
+        if user_message:
+            self.user_message = user_message
+
+
+class GatewayBusy(GatewayError):
+    status = 503
+
+
+class BudgetExceeded(GatewayError):
+    status = 429
+    user_message = "You have reached your hourly practice limit. Please try again later or upgrade your plan."
+
+
+class CircuitOpen(GatewayError):
+    status = 503
+    user_message = "The pronunciation service is temporarily unavailable. Please try again shortly."
+
+
+class UpstreamError(GatewayError):
+    status = 502
+
+
+class _LeaderGaveUp(Exception):
+    """Handed to coalesced followers when the leader never got an upstream answer."""
+
+
+def is_upstream_failure(e: BaseException) -> bool:
+    """Whether an error from fn() means the service is failing: 5xx, timeout or lost connection."""
+    status = getattr(e, "status_code", None)
+    if status is not None:
+        return status >= 500
+    if isinstance(e, (TimeoutError, ConnectionError)):
+        return True
+    # openai.APITimeoutError is an APIConnectionError; neither carries a status
+    return any(c.__name__ == "APIConnectionError" for c in type(e).__mro__)
+
+
+# ---------------------------------------------------------------------
+# Cost estimates (tokens, roughly what OpenAI bills) for budgeting
+# ---------------------------------------------------------------------
+def estimate_chat_tokens(messages: list[dict], max_tokens: int = 256) -> int:
+    chars = sum(len(str(m.get("content", ""))) for m in messages)
+    return chars // 4 + max_tokens
+
+
+def estimate_speech_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def estimate_transcription_tokens(audio_bytes: int) -> int:
+    # ~16 KB per second of compressed speech, billed like ~1000 tokens a minute
+    return max(1, audio_bytes // 1000)
+
+
+def request_key(*parts) -> str:
+    """Stable hash of the arguments that make two requests identical."""
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, bytes):
+            h.update(part)
+        else:
+            h.update(json.dumps(part, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+# ---------------------------------------------------------------------
+# Building blocks
+# ---------------------------------------------------------------------
+class TokenBucket:
+    """Refills `per_hour` tokens an hour, holding at most `per_hour`."""
+
+    def __init__(self, per_hour: float):
+        self.capacity = float(per_hour)
+        self.rate = per_hour / 3600.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self) -> float:
+        self._refill()
+        return self.tokens
+
+    def take(self, amount: float):
+        self._refill()
+        self.tokens -= amount
+
+    def give(self, amount: float):
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class CircuitBreaker:
+    def __init__(self, failures: int = BREAKER_FAILURES, cooldown: float = BREAKER_COOLDOWN):
+        self.threshold = failures
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.cooldown:
+            return "open"
+        return "half-open"
+
+    def before_call(self):
+        with self.lock:
+            state = self.state
+            if state == "open" or (state == "half-open" and self.trial_running):
+                raise CircuitOpen("circuit open")
+            if state == "half-open":
+                self.trial_running = True
+
+    def release(self):
+        """End a trial call without a verdict (it never reached the service, or the caller was at fault)."""
+        with self.lock:
+            self.trial_running = False
+
+    def record(self, ok: bool):
+        with self.lock:
+            self.trial_running = False
+            if ok:
+                self.failures = 0
+                self.opened_at = None
+            else:
+                self.failures += 1
+                if self.failures >= self.threshold or self.opened_at is not None:
+                    self.opened_at = time.monotonic()
+
+
+class EndpointMetrics:
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.rejected = {"busy": 0, "budget": 0, "circuit": 0}
+        self.in_flight = 0
+        self.queue_seconds = 0.0
+        self.queue_max = 0.0
+        self.upstream_seconds = 0.0
+        self.upstream_max = 0.0
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def observe_upstream(self, seconds: float):
+        self.upstream_seconds += seconds
+        self.upstream_max = max(self.upstream_max, seconds)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.latency_buckets[i] += 1
+                break
+        else:
+            self.latency_buckets[-1] += 1
+
+    def snapshot(self) -> dict:
+        done = max(1, self.calls)
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "rejected": dict(self.rejected),
+            "in_flight": self.in_flight,
+            "queue_avg_s": round(self.queue_seconds / done, 4),
+            "queue_max_s": round(self.queue_max, 4),
+            "queue_seconds_total": round(self.queue_seconds, 4),
+            "upstream_avg_s": round(self.upstream_seconds / done, 4),
+            "upstream_max_s": round(self.upstream_max, 4),
+            "upstream_seconds_total": round(self.upstream_seconds, 4),
+            "latency_buckets": dict(zip([*map(str, LATENCY_BUCKETS), "+Inf"], self.latency_buckets)),
+        }
+
+
+# ---------------------------------------------------------------------
+# The gateway
+# ---------------------------------------------------------------------
+class OpenAIGateway:
+    def __init__(self, concurrency=None, user_budgets=None, tier_budgets=None,
+                 queue_timeout: float = QUEUE_TIMEOUT):
+        concurrency = concurrency or ENDPOINT_CONCURRENCY
+        self.queue_timeout = queue_timeout
+        self.user_budgets = user_budgets or USER_TOKENS_PER_HOUR
+        self.tier_budgets = tier_budgets or TIER_TOKENS_PER_HOUR
+        self.lock = threading.Lock()
+        self.semaphores = {ep: threading.BoundedSemaphore(n) for ep, n in concurrency.items()}
+        self.breakers = {}
+        self.metrics = {}
+        self.user_buckets = {}
+        self.tier_buckets = {}
+        self.pruned = time.monotonic()
+        self.in_flight = {}
+        self.listeners = []
+
+    def add_listener(self, fn):
+        """
+        fn(event, endpoint, **values) is called for every "call" (queue_s,
+        upstream_s, ok), "coalesced" and "rejected" (reason) event, e.g. to
+        feed app_metrics.  Listener errors are ignored.
+        """
+        self.listeners.append(fn)
+
+    def _notify(self, event: str, endpoint: str, **values):
+        for fn in self.listeners:
+            try:
+                fn(event, endpoint, **values)
+            except Exception:
+                pass
+
+    def _semaphore(self, endpoint):
+        with self.lock:
+            if endpoint not in self.semaphores:
+                self.semaphores[endpoint] = threading.BoundedSemaphore(DEFAULT_CONCURRENCY)
+            return self.semaphores[endpoint]
+
+    def _breaker(self, endpoint) -> CircuitBreaker:
+        with self.lock:
+            return self.breakers.setdefault(endpoint, CircuitBreaker())
+
+    def _metrics(self, endpoint) -> EndpointMetrics:
+        with self.lock:
+            return self.metrics.setdefault(endpoint, EndpointMetrics())
+
+    def _prune_user_buckets(self):
+        """Drop the buckets of users idle for an hour (caller holds self.lock)."""
+        now = time.monotonic()
+        if now - self.pruned < PRUNE_EVERY:
+            return
+        self.pruned = now
+        for k in [k for k, b in self.user_buckets.items() if now - b.updated >= 3600]:
+            del self.user_buckets[k]
+
+    def _budget_buckets(self, user_id, tier: int) -> list:
+        user_limit = self.user_budgets.get(tier, self.user_budgets[TIER_GRATIS])
+        tier_limit = self.tier_budgets.get(tier, self.tier_budgets[TIER_GRATIS])
+        buckets = []
+        if user_limit is not None:
+            buckets.append(self.user_buckets.setdefault((tier, user_id), TokenBucket(user_limit)))
+        if tier_limit is not None:
+            buckets.append(self.tier_buckets.setdefault(tier, TokenBucket(tier_limit)))
+        return buckets
+
+    def _charge(self, user_id, tier: int, cost: int):
+        """Take `cost` from the user's and the tier's buckets, or raise BudgetExceeded."""
+        with self.lock:
+            self._prune_user_buckets()
+            buckets = self._budget_buckets(user_id, tier)
+            if any(b.available() < cost for b in buckets):
+                raise BudgetExceeded(f"token budget exhausted for user {user_id} (tier {tier})")
+            for b in buckets:
+                b.take(cost)
+
+    def _refund(self, user_id, tier: int, cost: int):
+        """Give back a charge for a call that never reached the API."""
+        with self.lock:
+            for b in self._budget_buckets(user_id, tier):
+                b.give(cost)
+
+    def call(self, endpoint: str, fn, *, key: str | None = None, cost: int = 0,
+             user_id=None, tier: int = TIER_GRATIS, fallback=None):
+        """
+        Run fn() for `endpoint` under the gateway's limits.
+
+        key:       identical keys in flight at the same time share one call
+        cost:      estimated tokens charged to the user's and tier's budgets
+        fallback:  fallback(error) -> value used instead of raising
+        """
+        try:
+            return self._call(endpoint, fn, key, cost, user_id, tier)
+        except GatewayError as e:
+            if fallback is None:
+                raise
+            return fallback(e)
+
+    def _call(self, endpoint, fn, key, cost, user_id, tier):
+        m = self._metrics(endpoint)
+
+        # Every caller pays for its own request, leader or not, so one
+        # user's exhausted budget never decides another user's answer.
+        if cost:
+            try:
+                self._charge(user_id, tier, cost)
+            except BudgetExceeded:
+                with self.lock:
+                    m.rejected["budget"] += 1
+                self._notify("rejected", endpoint, reason="budget")
+                raise
+
+        try:
+            return self._coalesced(endpoint, fn, key, m)
+        except (GatewayBusy, CircuitOpen):
+            # Never reached the API: the charge is given back
+            if cost:
+                self._refund(user_id, tier, cost)
+            raise
+
+    def _coalesced(self, endpoint, fn, key, m: EndpointMetrics):
+        """Run fn, or share the result of an identical call already in flight."""
+        if key is None:
+            return self._run(endpoint, fn, m)
+
+        with self.lock:
+            fut = self.in_flight.get((endpoint, key))
+            leader = fut is None
+            if leader:
+                fut = self.in_flight[(endpoint, key)] = Future()
+            else:
+                m.coalesced += 1
+        if not leader:
+            self._notify("coalesced", endpoint)
+            try:
+                return fut.result()
+            except _LeaderGaveUp:
+                # The leader was turned away before the API answered (busy,
+                # circuit open): nothing to share, so make the call ourselves.
+                return self._run(endpoint, fn, m)
+
+        try:
+            result = self._run(endpoint, fn, m)
+        except (GatewayBusy, CircuitOpen):
+            fut.set_exception(_LeaderGaveUp())
+            raise
+        except Exception as e:
+            # UpstreamError, or the caller's own error (bad audio): the same
+            # request would get the same answer, so followers share it.
+            fut.set_exception(e)
+            raise
+        except BaseException:
+            fut.set_exception(_LeaderGaveUp())
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            with self.lock:
+                self.in_flight.pop((endpoint, key), None)
+
+    def _run(self, endpoint, fn, m: EndpointMetrics):
+        breaker = self._breaker(endpoint)
+        try:
+            breaker.before_call()
+        except CircuitOpen:
+            with self.lock:
+                m.rejected["circuit"] += 1
+            self._notify("rejected", endpoint, reason="circuit")
+            raise
+
+        sem = self._semaphore(endpoint)
+        queued = time.perf_counter()
+        if not sem.acquire(timeout=self.queue_timeout):
+            with self.lock:
+                m.rejected["busy"] += 1
+            self._notify("rejected", endpoint, reason="busy")
+            breaker.release()
+            raise GatewayBusy(f"{endpoint}: queue wait exceeded {self.queue_timeout}s")
+
+        waited = time.perf_counter() - queued
+        with self.lock:
+            m.calls += 1
+            m.in_flight += 1
+            m.queue_seconds += waited
+            m.queue_max = max(m.queue_max, waited)
+
+        start = time.perf_counter()
+        ok = False
+        upstream_failed = False
+        try:
+            result = fn()
+            ok = True
+            return result
+        except Exception as e:
+            upstream_failed = is_upstream_failure(e)
+            if not upstream_failed:
+                raise   # the caller's fault (4xx, invalid input): its own error and status
+            raise UpstreamError(f"{endpoint}: {type(e).__name__}: {e}") from e
+        finally:
+            sem.release()
+            elapsed = time.perf_counter() - start
+            # A client error (bad audio, invalid input) says nothing about
+            # the service, so only 5xx, timeouts and lost connections count.
+            if ok or upstream_failed:
+                breaker.record(ok)
+            else:
+                breaker.release()
+            with self.lock:
+                m.in_flight -= 1
+                m.observe_upstream(elapsed)
+                if not ok:
+                    m.errors += 1
+            self._notify("call", endpoint, queue_s=waited, upstream_s=elapsed, ok=ok)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "endpoints": {ep: {**m.snapshot(), "circuit": self.breakers[ep].state
+                                   if ep in self.breakers else "closed"}
+                              for ep, m in self.metrics.items()},
+                "users_tracked": len(self.user_buckets),
+            }
+
+
+# Create the gateway only once when first needed
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway() -> OpenAIGateway:
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = OpenAIGateway()
+    return _gateway
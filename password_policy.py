@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+password_policy.py
+
+One password-hashing policy for the API (login) and tools/manage-passwords.py.
+
+Hashes are werkzeug's "method$salt$hash" strings; the method carries its cost
+parameters ("scrypt:32768:8:1", "pbkdf2:sha256:600000").  The policy is the
+method new hashes are made with:
+
+  PASSWORD_HASH_METHOD        default scrypt:32768:8:1 (werkzeug's default)
+  PASSWORD_HASH_SALT_LENGTH   default 16
+
+A stored hash made with any other method or parameters still verifies, and
+verify_password() hands back a replacement made with the policy, so api_app.py
+rehashes users transparently as they log in.  Use tools/bench_password_hash.py
+to pick parameters that fit the server's login bursts.
+
+  from password_policy import hash_password, verify_password
+  ok, new_hash = verify_password(stored_hash, password)
+  if new_hash:
+      ... UPDATE users SET password_hash = new_hash ...
+
+  python3 password_policy.py    # print the policy and the cost of one hash
+"""
+
+import os
+import time
+from functools import lru_cache
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_METHOD = "scrypt:32768:8:1"
+DEFAULT_SALT_LENGTH = 16
+
+HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", DEFAULT_METHOD)
+SALT_LENGTH = int(os.getenv("PASSWORD_HASH_SALT_LENGTH", DEFAULT_SALT_LENGTH))
+
+
+def hash_password(password: str) -> str:
+    return generate_password_hash(password, method=HASH_METHOD, salt_length=SALT_LENGTH)
+
+
+def hash_method(stored_hash: str) -> str:
+    """The method and parameters a hash was made with: "scrypt:32768:8:1"."""
+    return stored_hash.split("$", 1)[0]
+
+
+@lru_cache(maxsize=1)
+def policy_method() -> str:
+    # werkzeug fills in defaults ("pbkdf2" -> "pbkdf2:sha256:600000"), so
+    # compare against what it actually writes, worked out once per process.
+    return hash_method(hash_password(""))
+
+
+def needs_rehash(stored_hash: str) -> bool:
+    """Whether a hash was made with another method, other parameters or a shorter salt."""
+    method, _, rest = stored_hash.partition("$")
+    salt = rest.partition("$")[0]
+    return method != policy_method() or len(salt) < SALT_LENGTH
+
+
+def verify_password(stored_hash: str, password: str) -> tuple[bool, str | None]:
+    """
+    (whether password matches, a policy hash to store instead or None).
+    The replacement is only made for a correct password on an outdated hash.
+    """
+    if not stored_hash or not check_password_hash(stored_hash, password):
+        return False, None
+    if needs_rehash(stored_hash):
+        return True, hash_password(password)
+    return True, None
+
+
+def main():
+    start = time.perf_counter()
+    cpu = time.thread_time()
+    stored = hash_password("benchmark")
+    cpu = time.thread_time() - cpu
+    wall = time.perf_counter() - start
+    print(f"policy: {policy_method()}  salt length {SALT_LENGTH}")
+    print(f"one hash: {wall * 1e3:.1f} ms wall, {cpu * 1e3:.1f} ms CPU  ({stored[:40]}...)")
+
+
+if __name__ == "__main__":
+    main()
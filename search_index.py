@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+search_index.py
+
+Site-wide search over the verb pages, hint pages, stories and vocabulary CSVs.
+
+Build (run from the repo root, after the static pages are generated):
+  python3 search_index.py
+
+  Writes one shard per section into search-index/:
+    <section>.idx   - sorted "term<TAB>doc,doc,..." lines (accent-folded)
+    <section>.docs  - JSON list of {"url", "title"} for the doc ids above
+
+Query (from api_app.py):
+  from search_index import get_search_index
+  hits = get_search_index().search("cuillere", limit=10)
+
+The .idx shards are opened with mmap and binary searched in place, so a
+query never loads the whole index into memory and never touches the DB.
+"""
+
+import csv
+import json
+import mmap
+import os
+import re
+import unicodedata
+from html.parser import HTMLParser
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+STATIC_DIR = BASE_DIR / "static"
+INDEX_DIR = BASE_DIR / "search-index"
+
+SECTIONS = ("verbs", "hints", "stories", "vocab")
+
+MIN_TOKEN_LEN = 2
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+# What is left of qu' (qu'il, qu'elle); shorter elisions fall under MIN_TOKEN_LEN
+ELIDED = frozenset(("qu",))
+
+# Exact matches outrank prefix matches, which outrank fuzzy ones.
+SCORE_EXACT = 3
+SCORE_PREFIX = 2
+SCORE_FUZZY = 1
+
+
+# ---------------------------------------------------------------------
+# Normalisation
+# ---------------------------------------------------------------------
+def fold(text: str) -> str:
+    """Lowercase and strip accents: 'Cuillère' -> 'cuillere', 'œuf' -> 'oeuf'."""
+    text = text.lower().replace("œ", "oe").replace("æ", "ae")
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into folded tokens; elided words (l', d', j', qu') are dropped."""
+    return [t for t in TOKEN_RE.findall(fold(text)) if len(t) >= MIN_TOKEN_LEN and t not in ELIDED]
+
+
+# ---------------------------------------------------------------------
+# Document extraction
+# ---------------------------------------------------------------------
+class _TextExtractor(HTMLParser):
+    """Collect the <title> and the visible text of an HTML page."""
+
+    SKIP_TAGS = {"script", "style", "head"}
+
+    def __init__(self):
+        super().__init__()
+        self.title = ""
+        self.parts = []
+        self._skip = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "title":
+            self._in_title = True
+        elif tag in self.SKIP_TAGS:
+            self._skip += 1
+        # Glosses live in attributes (data-gloss="to like"); index them too.
+        for attr, value in attrs:
+            if attr == "data-gloss" and value:
+                self.parts.append(value)
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        elif tag in self.SKIP_TAGS and self._skip:
+            self._skip -= 1
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skip:
+            self.parts.append(data)
+
+
+def _url_for(path: Path) -> str:
+    return "/" + path.relative_to(BASE_DIR).as_posix()
+
+
+def _html_doc(path: Path):
+    parser = _TextExtractor()
+    try:
+        parser.feed(path.read_text(encoding="utf-8", errors="replace"))
+    except Exception as e:
+        print(f"⚠️  Could not parse {path}: {e}")
+        return None
+    title = re.sub(r"\s+", " ", parser.title).strip() or path.stem
+    return {"url": _url_for(path), "title": title}, " ".join(parser.parts)
+
+
+def iter_section_docs(section: str):
+    """Yield ({"url", "title"}, text) pairs for one section."""
+    if section == "verbs":
+        for path in sorted((STATIC_DIR / "learn-your-verbs" / "verbs").glob("*.html")):
+            doc = _html_doc(path)
+            if doc:
+                yield doc
+
+    elif section == "hints":
+        for path in sorted((STATIC_DIR / "hints").glob("*.html")):
+            doc = _html_doc(path)
+            if doc:
+                yield doc
+
+    elif section == "stories":
+        for path in sorted((STATIC_DIR / "stories").rglob("*.html")):
+            doc = _html_doc(path)
+            if doc:
+                yield doc
+        for path in sorted((STATIC_DIR / "stories").rglob("*.txt")):
+            text = path.read_text(encoding="utf-8", errors="replace")
+            yield {"url": _url_for(path), "title": path.stem}, text
+
+    elif section == "vocab":
+        # One doc per CSV row: French word plus its English gloss.
+        for csv_path in sorted(STATIC_DIR.glob("*-vocabulary/*-vocabulary.csv")) + \
+                        sorted(STATIC_DIR.glob("*-vocabulary/*-a1-a2.csv")):
+            category = csv_path.parent.name.replace("-vocabulary", "")
+            with csv_path.open("r", encoding="utf-8", newline="") as f:
+                reader = csv.reader(f)
+                next(reader, None)  # header
+                for row in reader:
+                    if len(row) < 2 or not row[1].strip():
+                        continue
+                    english, french = row[0].strip(), row[1].strip()
+                    yield ({"url": f"/vocab/{category}/", "title": f"{french} ({english})"},
+                           f"{french} {english}")
+
+    else:
+        raise ValueError(f"Unknown section: {section}")
+
+
+# ---------------------------------------------------------------------
+# Build
+# ---------------------------------------------------------------------
+def build_shard(section: str, out_dir: Path = INDEX_DIR) -> tuple[int, int]:
+    """Write <section>.idx and <section>.docs; return (docs, terms)."""
+    docs = []
+    postings = {}
+    for doc_id, (meta, text) in enumerate(iter_section_docs(section)):
+        docs.append(meta)
+        for token in set(tokenize(text)):
+            postings.setdefault(token, []).append(doc_id)
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    # Byte order must match the order used by the binary search in _Shard.
+    lines = sorted(
+        (term.encode("utf-8") + b"\t" + ",".join(map(str, ids)).encode("ascii") + b"\n")
+        for term, ids in postings.items()
+    )
+    (out_dir / f"{section}.idx").write_bytes(b"".join(lines))
+    (out_dir / f"{section}.docs").write_text(
+        json.dumps(docs, ensure_ascii=False, separators=(",", ":")), encoding="utf-8"
+    )
+    return len(docs), len(lines)
+
+
+def build_all(out_dir: Path = INDEX_DIR):
+    for section in SECTIONS:
+        n_docs, n_terms = build_shard(section, out_dir)
+        size = (out_dir / f"{section}.idx").stat().st_size
+        print(f"  ✓ {section:<8} {n_docs:>5} docs  {n_terms:>6} terms  {size / 1024:.1f} KB")
+
+
+# ---------------------------------------------------------------------
+# Query
+# ---------------------------------------------------------------------
+def _within_distance(a: str, b: str, max_dist: int) -> bool:
+    """Bounded Levenshtein check; bails out as soon as a row exceeds max_dist."""
+    if abs(len(a) - len(b)) > max_dist:
+        return False
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        if min(cur) > max_dist:
+            return False
+        prev = cur
+    return prev[-1] <= max_dist
+
+
+def _max_distance(token: str) -> int:
+    return 1 if len(token) <= 5 else 2
+
+
+class _Shard:
+    """One section's index, memory-mapped read-only."""
+
+    def __init__(self, idx_path: Path, docs_path: Path):
+        self.docs = json.loads(docs_path.read_text(encoding="utf-8"))
+        self._file = idx_path.open("rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def _line_start(self, pos: int) -> int:
+        return self._mm.rfind(b"\n", 0, pos) + 1
+
+    def _read_line(self, start: int) -> tuple[bytes, list[int], int]:
+        end = self._mm.find(b"\n", start)
+        if end < 0:
+            end = len(self._mm)
+        term, _, ids = self._mm[start:end].partition(b"\t")
+        return term, [int(i) for i in ids.split(b",") if i], end + 1
+
+    def _lower_bound(self, key: bytes) -> int:
+        """Offset of the first line whose term is >= key."""
+        lo, hi = 0, len(self._mm)
+        while lo < hi:
+            mid = self._line_start((lo + hi) // 2)
+            term, _, nxt = self._read_line(mid)
+            if term < key:
+                lo = nxt
+            else:
+                hi = mid
+        return lo
+
+    def iter_from(self, key: bytes):
+        pos = self._lower_bound(key)
+        while pos < len(self._mm):
+            term, ids, pos = self._read_line(pos)
+            yield term, ids
+
+    def lookup(self, token: str, prefix: bool) -> dict[int, int]:
+        """Return {doc_id: score} for token (exact, prefix, then fuzzy fallback)."""
+        key = token.encode("utf-8")
+        scores = {}
+        for term, ids in self.iter_from(key):
+            if not term.startswith(key) or not prefix and term != key:
+                break
+            score = SCORE_EXACT if term == key else SCORE_PREFIX
+            for doc_id in ids:
+                scores[doc_id] = max(scores.get(doc_id, 0), score)
+        if scores:
+            return scores
+
+        # Fuzzy: only scan terms sharing the first letter.
+        max_dist = _max_distance(token)
+        first = key[:1]
+        for term, ids in self.iter_from(first):
+            if not term.startswith(first):
+                break
+            if _within_distance(token, term.decode("utf-8"), max_dist):
+                for doc_id in ids:
+                    scores[doc_id] = max(scores.get(doc_id, 0), SCORE_FUZZY)
+        return scores
+
+
+class SearchIndex:
+    """All section shards found in an index directory."""
+
+    def __init__(self, index_dir: Path = INDEX_DIR):
+        self.shards = {}
+        for section in SECTIONS:
+            idx_path = index_dir / f"{section}.idx"
+            docs_path = index_dir / f"{section}.docs"
+            if idx_path.exists() and docs_path.exists():
+                self.shards[section] = _Shard(idx_path, docs_path)
+
+    def search(self, query: str, sections=None, limit: int = 20) -> list[dict]:
+        """
+        Rank docs by how well they match every token of query.
+
+        The last token is matched as a prefix (search-as-you-type); every
+        token falls back to a fuzzy match when it has no exact hit.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        results = []
+        for section, shard in self.shards.items():
+            if sections and section not in sections:
+                continue
+            combined = None
+            for i, token in enumerate(tokens):
+                hits = shard.lookup(token, prefix=(i == len(tokens) - 1))
+                if combined is None:
+                    combined = hits
+                else:
+                    # All tokens must match somewhere in the doc.
+                    combined = {d: s + hits[d] for d, s in combined.items() if d in hits}
+                if not combined:
+                    break
+            for doc_id, score in (combined or {}).items():
+                results.append({"section": section, "score": score, **shard.docs[doc_id]})
+
+        results.sort(key=lambda r: (-r["score"], r["title"]))
+        return results[:limit]
+
+
+# Loaded once per process on first use
+_index = None
+
+
+def get_search_index() -> SearchIndex:
+    global _index
+    if _index is None:
+        _index = SearchIndex()
+    return _index
+
+
+def main():
+    print(f"Static dir: {STATIC_DIR}")
+    print(f"Index dir:  {INDEX_DIR}")
+    build_all()
+    print("Done.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+session_tokens.py
+
+Optional stateless sessions: Flask-Login calls load_user on every request,
+which normally costs a Postgres round trip.  With STATELESS_SESSIONS=1 the
+user's identity and tier are kept in the session as short-lived claims:
+
+  {"id": 7, "username": "ann", "email": "ann@example.org", "tier": 2,
+   "iat": 1760000000, "exp": 1760000900}
+
+Flask's session cookie is signed with app.secret_key, so the claims cannot be
+edited by the browser (they are readable, not encrypted).  load_user trusts
+them until they expire, then reloads the user from the DB and issues new ones;
+a page view in between needs no DB at all.
+
+A user whose tier, email or account changed can be made to re-validate
+before expiry through the revocation list, a small text file shared by every
+mod_wsgi process:
+
+  <user_id> <unix time>    sessions of that user issued before the time
+  * <unix time>            every session issued before the time
+
+Each request only stat()s the file; it is re-read when its mtime changes.
+tools/manage-passwords.py appends to it (revoke, del).
+
+Configuration (environment):
+  STATELESS_SESSIONS       1 to enable (default: off, load_user always queries)
+  SESSION_TOKEN_TTL        seconds claims are trusted (default 900)
+  SESSION_REVOCATIONS      revocation list path (default <repo>/session-revocations.txt)
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+
+STATELESS_SESSIONS = os.getenv("STATELESS_SESSIONS", "").lower() in ("1", "true", "yes", "on")
+SESSION_TOKEN_TTL = int(os.getenv("SESSION_TOKEN_TTL", "900"))
+REVOCATIONS_FILE = Path(os.getenv("SESSION_REVOCATIONS", BASE_DIR / "session-revocations.txt"))
+
+# Key of the claims in flask.session
+SESSION_KEY = "user_claims"
+
+ALL_USERS = "*"
+
+
+class RevocationList:
+    """The revocation file, re-read only when its mtime changes."""
+
+    def __init__(self, path: Path = REVOCATIONS_FILE):
+        self.path = path
+        self._mtime = None
+        self._revoked = {}   # user id (str) or "*" -> latest revocation time
+
+    def _refresh(self):
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        revoked = {}
+        if mtime is not None:
+            with self.path.open(encoding="utf-8") as f:
+                for line in f:
+                    fields = line.split()
+                    if len(fields) != 2:
+                        continue
+                    try:
+                        when = float(fields[1])
+                    except ValueError:
+                        continue
+                    revoked[fields[0]] = max(when, revoked.get(fields[0], 0.0))
+        self._revoked = revoked
+        self._mtime = mtime
+
+    def revoked_after(self, user_id) -> float:
+        """Sessions of user_id issued at or before this time must re-validate (0.0: none)."""
+        self._refresh()
+        return max(self._revoked.get(str(user_id), 0.0), self._revoked.get(ALL_USERS, 0.0))
+
+    def revoke(self, user_id=ALL_USERS, when: float | None = None):
+        """Append a revocation; one short append, so concurrent writers do not interleave."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(f"{user_id} {time.time() if when is None else when:.3f}\n")
+
+
+def _is_tier(tier) -> bool:
+    return isinstance(tier, int) and not isinstance(tier, bool)
+
+
+def issue_claims(user_id, username: str, email: str, tier: int, now: float | None = None) -> dict:
+    """Claims for a user; ValueError unless tier is an int (nothing else belongs in the cookie)."""
+    if not _is_tier(tier):
+        raise ValueError(f"tier must be an int, got {type(tier).__name__}")
+    now = time.time() if now is None else now
+    return {"id": user_id, "username": username, "email": email, "tier": tier,
+            "iat": now, "exp": now + SESSION_TOKEN_TTL}
+
+
+def claims_valid(claims, user_id, revocations: "RevocationList", now: float | None = None) -> bool:
+    """Whether claims from the session can stand in for a DB lookup of user_id."""
+    if not isinstance(claims, dict) or str(claims.get("id")) != str(user_id):
+        return False
+    if not _is_tier(claims.get("tier")):
+        return False
+    now = time.time() if now is None else now
+    try:
+        issued, expires = float(claims["iat"]), float(claims["exp"])
+    except (KeyError, TypeError, ValueError):
+        return False
+    return now < expires and issued > revocations.revoked_after(user_id)
+
+
+# Shared by every request in the process
+_revocations = None
+
+
+def get_revocations() -> RevocationList:
+    global _revocations
+    if _revocations is None:
+        _revocations = RevocationList()
+    return _revocations
+
+
+def main():
+    revocations = get_revocations()
+    if len(sys.argv) == 3 and sys.argv[1] == "revoke":
+        revocations.revoke(sys.argv[2])
+        print(f"✓ Sessions of {sys.argv[2]} revoked in {revocations.path}")
+        return
+    if len(sys.argv) != 1:
+        print("Usage: python3 session_tokens.py [revoke <user_id>|*]")
+        sys.exit(1)
+    revocations._refresh()
+    print(f"stateless sessions: {'on' if STATELESS_SESSIONS else 'off'}  ttl {SESSION_TOKEN_TTL}s")
+    print(f"revocations: {revocations.path} ({len(revocations._revoked)} entries)")
+
+
+if __name__ == "__main__":
+    main()
@@ -28,6 +28,11 @@ import psycopg
 from dotenv import load_dotenv
 from openai import OpenAI
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools"))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from examples_sql import UNIQUE_SENTENCE, require_migration  # noqa: E402
+from llm_cache import cached_client  # noqa: E402
+
 
 # ---------------------------------------------------------------------
 # Logging setup
@@ -74,32 +79,42 @@ def load_environment():
 # DB helpers
 # ---------------------------------------------------------------------
 def get_existing_count(cur, expression: str) -> int:
+    # expression_key is accent/case-folded, so "Le Lavabo" counts "le lavabo"
     cur.execute(
-        "SELECT COUNT(*) FROM examples WHERE expression = %s",
+        "SELECT COUNT(*) FROM examples WHERE expression_key = fold_french(%s)",
         (expression,),
     )
     (count,) = cur.fetchone()
     return int(count)
 
 
-def insert_example(cur, expression: str, french: str, english: str) -> None:
+def insert_example(cur, expression: str, french: str, english: str) -> bool:
+    """
+    Insert one example; return False if the same sentence (after
+    normalisation) is already stored for this expression.
+    """
     cur.execute(
-        """
+        f"""
         INSERT INTO examples (expression, french, english)
         VALUES (%s, %s, %s)
+        ON CONFLICT ON CONSTRAINT {UNIQUE_SENTENCE} DO NOTHING
         """,
         (expression, french, english),
     )
+    return cur.rowcount == 1
 
 
 # ---------------------------------------------------------------------
 # AI helper
 # ---------------------------------------------------------------------
-def generate_example(client: OpenAI, expression: str) -> tuple[str, str]:
+def generate_example(client: OpenAI, expression: str, variant: str = "") -> tuple[str, str]:
     """
     Ask the OpenAI API to generate ONE simple French sentence
     using the given expression, plus its English translation.
 
+    The prompt is the same every time, so `variant` tells the answer cache
+    which example this is; a re-run gets the same answers back for free.
+
     Returns:
         (french_sentence, english_sentence)
     """
@@ -125,8 +140,15 @@ def generate_example(client: OpenAI, expression: str) -> tuple[str, str]:
             {"role": "system", "content": system_msg},
             {"role": "user", "content": user_msg},
         ],
+        cache_variant=variant,
+        # Unusable answers are not cached, so a re-run asks again
+        cache_validate=parse_example,
     )
+    return parse_example(response)
+
 
+def parse_example(response) -> tuple[str, str]:
+    """(french, english) from a generate_example answer, or ValueError."""
     content = response.choices[0].message.content
     try:
         data = json.loads(content)
@@ -186,12 +208,13 @@ def main():
         sys.exit(1)
 
     dsn = load_environment()
-    client = OpenAI()  # uses OPENAI_API_KEY from environment
+    client = cached_client(OpenAI())  # uses OPENAI_API_KEY from environment
 
     # Connect to Neon/Postgres
     logger.info("Connecting to database...")
     with psycopg.connect(dsn) as conn:
         with conn.cursor() as cur:
+            require_migration(cur)
             for expression in iter_french_expressions(csv_arg):
                 logger.info("Processing expression: %r", expression)
 
@@ -219,12 +242,18 @@ def main():
 
                 for n in range(needed):
                     try:
-                        french, english = generate_example(client, expression)
+                        french, english = generate_example(
+                            client, expression, variant=str(count + n + 1)
+                        )
                         logger.info(
                             "Generated example %d for %r: FR=%r EN=%r",
                             count + n + 1, expression, french, english
                         )
-                        insert_example(cur, expression, french, english)
+                        if not insert_example(cur, expression, french, english):
+                            logger.info(
+                                "Example for %r already exists; not inserted.",
+                                expression
+                            )
                     except Exception as e:
                         logger.error(
                             "Failed to generate/insert example for %r: %s",
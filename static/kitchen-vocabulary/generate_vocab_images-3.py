@@ -8,6 +8,10 @@ from tenacity import retry, stop_after_attempt, wait_exponential
 from dotenv import load_dotenv
 from openai import OpenAI
 
+# Images are optimised in memory by tools/optimize_image.py
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools"))
+from optimize_image import optimize_bytes  # noqa: E402
+
 # --------- CONFIG ---------
 CSV_PATH = "french_kitchen_vocabulary.csv"
 OUTPUT_DIR = Path("generated_images")
@@ -18,6 +22,13 @@ BACKGROUND = "plain white background"
 
 # NEW FLAG → whether to display the French word in the picture
 SHOW_LABEL_ON_IMAGE = True  # Set to False for unlabeled images
+
+# Web-ready output: size budget, optional thumbnail (<name>-<w>w.png), and
+# where full-size originals go when run with --archive
+IMAGE_MAX_KB = 100
+THUMBNAIL_WIDTH = None  # e.g. 160
+ARCHIVE_DIR = OUTPUT_DIR / "originals"
+ARCHIVE = "--archive" in sys.argv
 # --------------------------
 
 # Load environment variables from ~/.env or local .env
@@ -72,7 +83,8 @@ def main():
         raise FileNotFoundError(f"CSV not found: {CSV_PATH}")
 
     # Optional: limit generation to a single word via command-line arg
-    single_target = sys.argv[1].strip().lower() if len(sys.argv) > 1 else None
+    args = [a for a in sys.argv[1:] if a != "--archive"]
+    single_target = args[0].strip().lower() if args else None
 
     with open(CSV_PATH, newline="", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -101,7 +113,8 @@ def main():
             print(f"→ Generating: {french}  ({english}) | label={SHOW_LABEL_ON_IMAGE}")
             try:
                 png_bytes = generate_image_b64(prompt)
-                outpath.write_bytes(png_bytes)
+                optimize_bytes(png_bytes, outpath, IMAGE_MAX_KB, thumbnail_width=THUMBNAIL_WIDTH,
+                               archive_dir=ARCHIVE_DIR if ARCHIVE else None)
                 print(f"  Saved: {outpath}")
             except Exception as e:
                 print(f"  Failed for {french}: {e}")
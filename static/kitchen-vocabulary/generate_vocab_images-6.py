@@ -8,6 +8,10 @@ from dotenv import load_dotenv
 from openai import OpenAI
 from openai import BadRequestError, APIError, APIConnectionError, RateLimitError
 
+# Images are optimised in memory by tools/optimize_image.py
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools"))
+from optimize_image import optimize_bytes  # noqa: E402
+
 # --------- CONFIG ---------
 CSV_PATH = "french_kitchen_vocabulary.csv"
 OUTPUT_DIR = Path("generated_images")
@@ -20,6 +24,13 @@ BACKGROUND = "plain white background"
 
 # Show the French word in the image?
 SHOW_LABEL_ON_IMAGE = True  # default True
+
+# Web-ready output: size budget, optional thumbnail (<name>-<w>w.png), and
+# where full-size originals go when run with --archive
+IMAGE_MAX_KB = 100
+THUMBNAIL_WIDTH = None  # e.g. 160
+ARCHIVE_DIR = OUTPUT_DIR / "originals"
+ARCHIVE = "--archive" in sys.argv
 # --------------------------
 
 # Load env from ~/.env then local .env
@@ -138,9 +149,10 @@ def main():
         sanity_test()
         sys.exit(0)
 
+    args = [a for a in sys.argv[1:] if a != "--archive"]
     single_target = None
-    if len(sys.argv) > 1:
-        single_target = sys.argv[1].strip().lower()
+    if args:
+        single_target = args[0].strip().lower()
 
     if not Path(CSV_PATH).exists():
         raise FileNotFoundError(f"CSV not found: {CSV_PATH}")
@@ -168,7 +180,8 @@ def main():
             print(f"→ Generating: {french}  ({english}) | label={SHOW_LABEL_ON_IMAGE}")
             try:
                 png_bytes = generate_image_b64(french, english)
-                outpath.write_bytes(png_bytes)
+                optimize_bytes(png_bytes, outpath, IMAGE_MAX_KB, thumbnail_width=THUMBNAIL_WIDTH,
+                               archive_dir=ARCHIVE_DIR if ARCHIVE else None)
                 print(f"  Saved: {outpath}")
             except Exception:
                 print("  Failed for", french, "— see error details above.")
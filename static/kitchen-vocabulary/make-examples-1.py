@@ -4,6 +4,7 @@
 """
 Usage:
     python make-examples.py vocab.csv
+    python make-examples.py --batch [--batch-size 20] [--workers 4] [--rpm 60] vocab.csv
 
 Reads a CSV whose middle column is the French expression. For each expression:
 
@@ -14,8 +15,14 @@ Reads a CSV whose middle column is the French expression. For each expression:
 
 Table:
     examples(expression, french, english)
+
+With --batch, all expressions that still need examples are sent together:
+many per JSON request, several requests at once under a rate limiter.
+Each expression's answer is validated on its own and only failed
+expressions are retried (see tools/llm_batch.py).
 """
 
+import argparse
 import csv
 import sys
 import os
@@ -27,6 +34,21 @@ import psycopg
 from dotenv import load_dotenv
 from openai import OpenAI
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools"))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from examples_sql import UNIQUE_SENTENCE, require_migration  # noqa: E402
+from llm_cache import cached_client  # noqa: E402
+from llm_batch import (  # noqa: E402
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_REQUESTS_PER_MINUTE,
+    DEFAULT_WORKERS,
+    RateLimiter,
+    run_batched,
+)
+
+MODEL_EXAMPLES = "gpt-4.1-mini"
+EXAMPLES_PER_EXPRESSION = 3
+
 
 # ---------------------------------------------------------------------
 # Logging setup
@@ -73,34 +95,64 @@ def load_environment():
 def get_existing_french(cur, expression: str) -> set[str]:
     """
     Return a set of French sentences already stored for this expression.
+    Looks up by expression_key, so case and accent variants of the
+    expression share their examples.
     """
     cur.execute(
-        "SELECT french FROM examples WHERE expression = %s",
+        "SELECT french FROM examples WHERE expression_key = fold_french(%s)",
         (expression,),
     )
     rows = cur.fetchall()
-    # We keep exact strings, but you could normalize (strip/lower) if desired
+    # Exact strings; near-duplicates are caught by the unique constraint
     return {r[0].strip() for r in rows if r and r[0]}
 
 
-def insert_example(cur, expression: str, french: str, english: str) -> None:
+def get_existing_french_many(cur, expressions: list[str]) -> dict[str, set[str]]:
+    """
+    get_existing_french() for many expressions in a single query.
+    """
+    existing = {expression: set() for expression in expressions}
     cur.execute(
         """
+        SELECT x.expression, e.french
+          FROM unnest(%s::text[]) AS x(expression)
+          JOIN examples e ON e.expression_key = fold_french(x.expression)
+        """,
+        (list(expressions),),
+    )
+    for expression, french in cur.fetchall():
+        if french:
+            existing[expression].add(french.strip())
+    return existing
+
+
+def insert_example(cur, expression: str, french: str, english: str) -> bool:
+    """
+    Insert one example; return False if the same sentence (ignoring case,
+    accents and punctuation) is already stored for this expression.
+    """
+    cur.execute(
+        f"""
         INSERT INTO examples (expression, french, english)
         VALUES (%s, %s, %s)
+        ON CONFLICT ON CONSTRAINT {UNIQUE_SENTENCE} DO NOTHING
         """,
         (expression, french, english),
     )
+    return cur.rowcount == 1
 
 
 # ---------------------------------------------------------------------
 # AI helper
 # ---------------------------------------------------------------------
-def generate_example(client: OpenAI, expression: str) -> tuple[str, str]:
+def generate_example(client: OpenAI, expression: str, variant: str = "") -> tuple[str, str]:
     """
     Ask the OpenAI API to generate ONE simple French sentence
     using the given expression, plus its English translation.
 
+    The prompt is the same every time, so `variant` tells the answer cache
+    which example this is; a re-run gets the same answers back for free.
+
     Returns:
         (french_sentence, english_sentence)
     """
@@ -120,14 +172,21 @@ def generate_example(client: OpenAI, expression: str) -> tuple[str, str]:
     )
 
     response = client.chat.completions.create(
-        model="gpt-4.1-mini",
+        model=MODEL_EXAMPLES,
         response_format={"type": "json_object"},
         messages=[
             {"role": "system", "content": system_msg},
             {"role": "user", "content": user_msg},
         ],
+        cache_variant=variant,
+        # Unusable answers are not cached, so a re-run asks again
+        cache_validate=parse_example,
     )
+    return parse_example(response)
 
+
+def parse_example(response) -> tuple[str, str]:
+    """(french, english) from a generate_example answer, or ValueError."""
     content = response.choices[0].message.content
     try:
         data = json.loads(content)
@@ -145,6 +204,41 @@ def generate_example(client: OpenAI, expression: str) -> tuple[str, str]:
     return french, english
 
 
+BATCH_SYSTEM_MSG = (
+    "You are helping A1/A2 French learners. "
+    'You receive JSON {"items": [{"id", "expression", "count", "avoid"}]}. '
+    "For every item, write `count` different simple, natural French sentences "
+    "using the expression, each with its English translation. "
+    "None may repeat a sentence listed in `avoid`. "
+    "Use present, passé composé, or futur proche only. "
+    "No slang, no complex tenses. "
+    "Respond in strict JSON with one entry per input id: "
+    '{"items": [{"id": "…", "examples": [{"french": "…", "english": "…"}]}]}'
+)
+
+
+def validate_examples(item: dict, answer: dict) -> list[tuple[str, str]]:
+    """
+    Check one expression's answer from a batch; return `count` new
+    (french, english) pairs or raise ValueError so it is retried.
+    """
+    seen = set(item["avoid"])
+    examples = []
+    for example in answer.get("examples") or []:
+        if not isinstance(example, dict):
+            continue
+        french = str(example.get("french", "")).strip()
+        english = str(example.get("english", "")).strip()
+        if not french or not english or french in seen:
+            continue
+        seen.add(french)
+        examples.append((french, english))
+
+    if len(examples) < item["count"]:
+        raise ValueError(f"got {len(examples)} usable example(s), need {item['count']}")
+    return examples[:item["count"]]
+
+
 # ---------------------------------------------------------------------
 # CSV handling
 # ---------------------------------------------------------------------
@@ -176,22 +270,89 @@ def iter_french_expressions(csv_path: Path):
 # ---------------------------------------------------------------------
 # Main logic
 # ---------------------------------------------------------------------
-def main():
-    if len(sys.argv) != 2:
-        print("Usage: python make-examples.py <csv-file>", file=sys.stderr)
-        sys.exit(1)
+def run_batch(cur, client: OpenAI, csv_arg: Path, args) -> None:
+    """
+    Batch mode: fetch existing examples for every expression in one query,
+    generate the missing ones with batched concurrent requests, insert them.
+    """
+    expressions = list(dict.fromkeys(iter_french_expressions(csv_arg)))
+    existing = get_existing_french_many(cur, expressions)
+
+    items = {}
+    for i, expression in enumerate(expressions):
+        needed = EXAMPLES_PER_EXPRESSION - len(existing[expression])
+        if needed > 0:
+            items[str(i)] = {
+                "expression": expression,
+                "count": needed,
+                "avoid": sorted(existing[expression]),
+            }
+    logger.info(
+        "%d expression(s), %d need examples.",
+        len(expressions), len(items)
+    )
+    if not items:
+        return
+
+    results, failed = run_batched(
+        client, MODEL_EXAMPLES, BATCH_SYSTEM_MSG, items, validate_examples,
+        batch_size=args.batch_size, workers=args.workers,
+        limiter=RateLimiter(args.rpm),
+    )
+
+    inserted = skipped = 0
+    for item_id, examples in results.items():
+        expression = items[item_id]["expression"]
+        for french, english in examples:
+            if insert_example(cur, expression, french, english):
+                inserted += 1
+            else:
+                skipped += 1
+                logger.info(
+                    "Near-duplicate French example for %r: %r",
+                    expression, french
+                )
 
-    csv_arg = Path(sys.argv[1])
+    for item_id, error in failed.items():
+        logger.warning(
+            "Could not generate examples for %r: %s",
+            items[item_id]["expression"], error
+        )
+    logger.info(
+        "Inserted %d example(s); %d near-duplicate(s) skipped; %d expression(s) failed.",
+        inserted, skipped, len(failed)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate example sentences for a vocabulary CSV.")
+    parser.add_argument("csv_file", help="Vocabulary CSV (French in the middle column)")
+    parser.add_argument("--batch", action="store_true",
+                        help="Batch many expressions per request and run requests concurrently")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Expressions per request in batch mode (default {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Concurrent requests in batch mode (default {DEFAULT_WORKERS})")
+    parser.add_argument("--rpm", type=float, default=DEFAULT_REQUESTS_PER_MINUTE,
+                        help=f"Request rate limit per minute (default {DEFAULT_REQUESTS_PER_MINUTE})")
+    args = parser.parse_args()
+
+    csv_arg = Path(args.csv_file)
     if not csv_arg.exists():
         logger.error("CSV file not found: %s", csv_arg)
         sys.exit(1)
 
     dsn = load_environment()
-    client = OpenAI()  # uses OPENAI_API_KEY from environment
+    client = cached_client(OpenAI())  # uses OPENAI_API_KEY from environment
 
     logger.info("Connecting to database...")
     with psycopg.connect(dsn) as conn:
         with conn.cursor() as cur:
+            require_migration(cur)
+            if args.batch:
+                run_batch(cur, client, csv_arg, args)
+                return
+
             for expression in iter_french_expressions(csv_arg):
                 logger.info("Processing expression: %r", expression)
 
@@ -205,14 +366,14 @@ def main():
                     continue
 
                 count = len(existing_french)
-                if count >= 3:
+                if count >= EXAMPLES_PER_EXPRESSION:
                     logger.info(
                         "Already have %d examples for %r; skipping.",
                         count, expression
                     )
                     continue
 
-                needed = 3 - count
+                needed = EXAMPLES_PER_EXPRESSION - count
                 logger.info(
                     "Need %d more unique example(s) for %r.",
                     needed, expression
@@ -224,7 +385,9 @@ def main():
                     max_attempts = 5
                     for attempt in range(1, max_attempts + 1):
                         try:
-                            french, english = generate_example(client, expression)
+                            french, english = generate_example(
+                                client, expression, variant=f"{count + 1}.{attempt}"
+                            )
                         except Exception as e:
                             logger.error(
                                 "Generation error for %r (attempt %d): %s",
@@ -254,7 +417,13 @@ def main():
                             "Inserting example %d for %r: FR=%r EN=%r",
                             count + 1, expression, french, english
                         )
-                        insert_example(cur, expression, french, english)
+                        if not insert_example(cur, expression, french, english):
+                            logger.info(
+                                "Near-duplicate French example for %r (attempt %d): %r",
+                                expression, attempt, french
+                            )
+                            existing_french.add(french)
+                            continue
                         existing_french.add(french)
                         count += 1
                         break  # break out of attempts loop, go to next needed example
@@ -1,7 +1,7 @@
 #!/bin/bash
 # Usage: ./move_and_resize.sh <basename>
 # Example: ./move_and_resize.sh spoon
-# Moves image.png from Downloads, renames it, and resizes to 100px.
+# Moves image.png from Downloads, renames it, and optimises it to 100 KB.
 
 # Exit immediately if a command fails
 set -euo pipefail
@@ -27,8 +27,8 @@ echo "Moving $SRC → $DEST"
 mv "$SRC" "$DEST"
 
 # --- Resize ---
-echo "Resizing $DEST to 100 px"
-python ../tools/resize_png-2.py "$DEST" 100
+echo "Optimising $DEST to 100 KB"
+python ../tools/optimize_image.py "$DEST" 100
 
-echo "✅ Done: $DEST resized."
+echo "✅ Done: $DEST optimised."
 
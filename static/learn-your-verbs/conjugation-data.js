@@ -0,0 +1,44 @@
+/*
+ * conjugation-data.js - Exercise data from the conjugation dataset
+ *
+ * The drag-pc exercises used to embed their own copy of the verb list.
+ * They now ask /api/conjugations for one tense and person:
+ *
+ *   loadConjugations('pc', 'il').then(pairs => { DATA = pairs; render(); });
+ *   // pairs: [["aimer", "a aimé"], ["aller", "est allé"], ...]
+ *
+ * If the API is unreachable (e.g. the page is opened from disk) the static
+ * conjugations.json next to the pages is read instead.  Both come from the
+ * same file, so the exercises and the verb pages cannot disagree.
+ */
+(function (global) {
+  'use strict';
+
+  const API_URL = '/api/conjugations';
+  const STATIC_URL = new URL('conjugations.json', document.currentScript.src).href;
+
+  function fromApi(tense, person) {
+    const url = `${API_URL}?tense=${encodeURIComponent(tense)}&person=${encodeURIComponent(person)}`;
+    return fetch(url).then(r => {
+      if (!r.ok) throw new Error(`${url}: ${r.status}`);
+      return r.json();
+    }).then(body => body.forms);
+  }
+
+  function fromStatic(tense, person) {
+    return fetch(STATIC_URL).then(r => r.json()).then(data => {
+      const forms = {};
+      Object.entries(data.verbs).forEach(([inf, verb]) => {
+        const f = verb.forms[tense];
+        if (f && f[person]) forms[inf] = f[person];
+      });
+      return forms;
+    });
+  }
+
+  global.loadConjugations = function (tense, person) {
+    return fromApi(tense, person)
+      .catch(() => fromStatic(tense, person))
+      .then(forms => Object.entries(forms));
+  };
+})(window);
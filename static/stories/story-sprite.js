@@ -0,0 +1,79 @@
+/*
+ * story-sprite.js - Play a story's gloss phrases from one audio sprite
+ *
+ * tools/build_audio_sprite.py joins a story's phrase MP3s into
+ * <story>-sprite.mp3 and records each phrase's [start, duration] in
+ * audio-manifest.json.  This loads that manifest once and plays a phrase
+ * by seeking within the single sprite file, so a page makes one audio
+ * request instead of one per gloss span.
+ *
+ *   const sprite = StorySprite.load('audio-manifest.json');
+ *   sprite.play('lrrh_un_jour.mp3', 1.0);
+ *
+ * Phrases missing from the sprite (or a page without a manifest) fall back
+ * to playing the individual MP3 file as before.
+ */
+(function (global) {
+  'use strict';
+
+  // Stop a little early rather than let the next clip's first syllable leak in
+  const END_GUARD = 0.02;
+
+  function StorySprite(manifestUrl) {
+    this.clips = {};
+    this.audio = null;
+    this.single = null;
+    this.stopTimer = null;
+    this.stopAt = null;
+
+    const base = new URL(manifestUrl, document.baseURI);
+    this.ready = fetch(base)
+      .then(r => (r.ok ? r.json() : null))
+      .then(manifest => {
+        if (!manifest || !manifest.sprite) return;
+        this.clips = manifest.sprite.clips || {};
+        this.audio = new Audio(new URL(manifest.sprite.file, base).href);
+        this.audio.preload = 'auto';
+        this.audio.addEventListener('timeupdate', () => {
+          if (this.stopAt !== null && this.audio.currentTime >= this.stopAt) this.stop();
+        });
+      })
+      .catch(() => {});
+  }
+
+  StorySprite.prototype.stop = function () {
+    clearTimeout(this.stopTimer);
+    this.stopTimer = null;
+    this.stopAt = null;
+    if (this.audio) this.audio.pause();
+    if (this.single) { this.single.pause(); this.single = null; }
+  };
+
+  StorySprite.prototype.play = function (file, rate) {
+    rate = rate || 1.0;
+    this.stop();
+    const clip = this.clips[file];
+    if (!this.audio || !clip) {
+      this.single = new Audio(file);
+      this.single.playbackRate = rate;
+      this.single.play().catch(() => {});
+      return;
+    }
+
+    const audio = this.audio;
+    const stopAt = clip[0] + clip[1] - END_GUARD;
+    audio.playbackRate = rate;
+    audio.currentTime = clip[0];
+    this.stopAt = stopAt;
+    audio.play().then(() => {
+      if (this.stopAt !== stopAt) return;  // another phrase started meanwhile
+      // timeupdate fires only every ~250 ms; the timer gives the precise stop.
+      const remaining = Math.max(0, stopAt - audio.currentTime) / rate;
+      this.stopTimer = setTimeout(() => this.stop(), remaining * 1000);
+    }).catch(() => {});
+  };
+
+  global.StorySprite = {
+    load: function (manifestUrl) { return new StorySprite(manifestUrl || 'audio-manifest.json'); }
+  };
+})(window);
@@ -6,6 +6,7 @@ build_examples_from_vocab.py
 
 Usage:
   python3 build_examples_from_vocab.py vocab.csv
+  python3 build_examples_from_vocab.py --batch [--batch-size 20] [--workers 4] [--rpm 60] vocab.csv
 
 Input CSV:
   col1: English name
@@ -28,8 +29,14 @@ For each row:
 Output:
   examples.csv — created in the same directory as the input CSV.
   examples-error.log — errors and warnings written here.
+
+With --batch, all lines are translated together: many lines per JSON
+request, several requests at once under a rate limiter, and only lines
+whose translation came back missing or empty are retried
+(see tools/llm_batch.py).
 """
 
+import argparse
 import csv
 import sys
 import os
@@ -37,8 +44,27 @@ from pathlib import Path
 
 from openai import OpenAI
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools"))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from llm_cache import cached_client  # noqa: E402
+from llm_batch import (  # noqa: E402
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_REQUESTS_PER_MINUTE,
+    DEFAULT_WORKERS,
+    RateLimiter,
+    run_batched,
+)
+
 MODEL_TRANSLATE = "gpt-4o-mini"
 
+BATCH_SYSTEM_MSG = (
+    "You are a precise and concise translator. "
+    'You receive JSON {"items": [{"id": "…", "french": "…"}]}. '
+    "Translate each French sentence into natural English. "
+    'Respond in strict JSON with one entry per input id: '
+    '{"items": [{"id": "…", "english": "…"}]}'
+)
+
 
 def load_client() -> OpenAI:
     api_key = os.getenv("OPENAI_API_KEY")
@@ -46,7 +72,7 @@ def load_client() -> OpenAI:
         msg = "[FATAL] OPENAI_API_KEY not found in environment."
         print(msg, file=sys.stderr)
         raise SystemExit(1)
-    return OpenAI(api_key=api_key)
+    return cached_client(OpenAI(api_key=api_key))
 
 
 def translate_line(client: OpenAI, french: str) -> str:
@@ -68,9 +94,40 @@ def translate_line(client: OpenAI, french: str) -> str:
             },
         ],
         temperature=0.2,
+        cache_validate=parse_translation,
     )
-    content = resp.choices[0].message.content or ""
-    return content.strip()
+    return parse_translation(resp)
+
+
+def parse_translation(resp) -> str:
+    """The translation in a translate_line answer; ValueError (and not cached) if empty."""
+    content = (resp.choices[0].message.content or "").strip()
+    if not content:
+        raise ValueError("empty translation")
+    return content
+
+
+def validate_translation(item: dict, answer: dict) -> str:
+    english = str(answer.get("english") or "").strip()
+    if not english:
+        raise ValueError("empty translation")
+    return english
+
+
+def translate_batch(client: OpenAI, lines: list[str], args, error_log) -> list[str]:
+    """
+    Translate many French lines with batched concurrent requests.
+    Returns translations in input order; lines that never succeed get "".
+    """
+    items = {str(i): {"french": french} for i, french in enumerate(lines)}
+    results, failed = run_batched(
+        client, MODEL_TRANSLATE, BATCH_SYSTEM_MSG, items, validate_translation,
+        batch_size=args.batch_size, workers=args.workers,
+        limiter=RateLimiter(args.rpm), temperature=0.2,
+    )
+    for item_id, error in failed.items():
+        log(f"[ERROR] Translation failed for {lines[int(item_id)]!r}: {error}", error_log)
+    return [results.get(str(i), "") for i in range(len(lines))]
 
 
 def log(msg: str, fh):
@@ -97,11 +154,19 @@ def make_base_name(french_name: str) -> str:
 
 
 def main():
-    if len(sys.argv) != 2:
-        print("Usage: python3 build_examples_from_vocab.py <input.csv>")
-        sys.exit(1)
-
-    input_csv = Path(sys.argv[1])
+    parser = argparse.ArgumentParser(description="Build examples.csv from a vocabulary CSV and its .txt files.")
+    parser.add_argument("input_csv", help="Vocabulary CSV (English, French, gender)")
+    parser.add_argument("--batch", action="store_true",
+                        help="Batch many lines per request and run requests concurrently")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Lines per request in batch mode (default {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Concurrent requests in batch mode (default {DEFAULT_WORKERS})")
+    parser.add_argument("--rpm", type=float, default=DEFAULT_REQUESTS_PER_MINUTE,
+                        help=f"Request rate limit per minute (default {DEFAULT_REQUESTS_PER_MINUTE})")
+    args = parser.parse_args()
+
+    input_csv = Path(args.input_csv)
     if not input_csv.exists():
         print(f"[FATAL] CSV file not found: {input_csv}", file=sys.stderr)
         sys.exit(1)
@@ -131,6 +196,9 @@ def main():
             log("[WARN] Input CSV appears to be empty.", error_log)
             return
 
+        # (french_name, txt_name, line number, French example) to write
+        pending = []
+
         for row_num, row in enumerate(reader, start=2):
             if len(row) < 2:
                 log(f"[WARN] Row {row_num} has fewer than 2 columns, skipping.", error_log)
@@ -167,24 +235,32 @@ def main():
                 )
 
             for i, french_example in enumerate(lines[:3], start=1):
+                pending.append((french_name, txt_path.name, i, french_example))
+
+        if args.batch:
+            translations = translate_batch(client, [p[3] for p in pending], args, error_log)
+        else:
+            translations = []
+            for french_name, txt_name, i, french_example in pending:
                 try:
-                    english_translation = translate_line(client, french_example)
+                    translations.append(translate_line(client, french_example))
                 except Exception as e:
                     log(
-                        f"[ERROR] Translation failed for {txt_path} line {i}: {e}",
+                        f"[ERROR] Translation failed for {txt_name} line {i}: {e}",
                         error_log,
                     )
-                    english_translation = ""
-
-                # col1: original French name (from col2 of input)
-                # col2: example line in French
-                # col3: English translation
-                writer.writerow([french_name, french_example, english_translation])
-
-                print(
-                    f"[INFO] Wrote example {i} for '{french_name}' "
-                    f"from {txt_path.name} to {output_csv.name}"
-                )
+                    translations.append("")
+
+        for (french_name, txt_name, i, french_example), english_translation in zip(pending, translations):
+            # col1: original French name (from col2 of input)
+            # col2: example line in French
+            # col3: English translation
+            writer.writerow([french_name, french_example, english_translation])
+
+            print(
+                f"[INFO] Wrote example {i} for '{french_name}' "
+                f"from {txt_name} to {output_csv.name}"
+            )
 
     error_log.close()
     print(f"[DONE] Examples written to {output_csv}")
@@ -16,6 +16,8 @@ Behavior:
       * Calls the LLM to generate examples.
       * Writes them to <expression>.txt (one per line).
   - Then calls the translator LLM to get English translations.
+  - Both LLM calls go through the shared answer cache (llm_cache.py), so
+    re-running for the same expression costs nothing.
   - Prints an HTML block to stdout (no files written other than <expression>.txt).
 """
 
@@ -27,6 +29,9 @@ from pathlib import Path
 from dotenv import load_dotenv
 from openai import OpenAI
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from llm_cache import cached_client  # noqa: E402
+
 MODEL_EXAMPLES = "gpt-4o"
 MODEL_TRANSLATE = "gpt-4o-mini"
 TRACE_ENABLED = True
@@ -160,7 +165,7 @@ def main():
     txt_path = Path(f"{base_name}.txt")
 
     api_key = load_api_key()
-    client = OpenAI(api_key=api_key)
+    client = cached_client(OpenAI(api_key=api_key))
 
     # ------------------------------------------------------------
     # 1) Load or generate French examples (cache in .txt)
@@ -182,7 +187,7 @@ def main():
         print(f"[INFO] Generated new examples and cached to {txt_path}", file=sys.stderr)
 
     # ------------------------------------------------------------
-    # 2) Translate examples to English (no caching for now)
+    # 2) Translate examples to English (cached by llm_cache)
     # ------------------------------------------------------------
     try:
         translations = translate_all_to_english(client, examples)
@@ -3,10 +3,14 @@
 
 import csv
 import os
+import sys
 from pathlib import Path
 
 import psycopg
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools"))
+from examples_sql import UNIQUE_SENTENCE, require_migration  # noqa: E402
+
 CSV_PATH = Path("examples.csv")  # adjust if needed
 
 def main():
@@ -19,6 +23,7 @@ def main():
 
     with psycopg.connect(dsn, autocommit=True) as conn:
         with conn.cursor() as cur:
+            require_migration(cur)
             with CSV_PATH.open("r", encoding="utf-8", newline="") as f:
                 reader = csv.reader(f)
                 for row_num, row in enumerate(reader, start=1):
@@ -29,13 +34,17 @@ def main():
                     french = row[1].strip()
                     english = row[2].strip()
                     cur.execute(
-                        """
+                        f"""
                         INSERT INTO examples (expression, french, english)
                         VALUES (%s, %s, %s)
+                        ON CONFLICT ON CONSTRAINT {UNIQUE_SENTENCE} DO NOTHING
                         """,
                         (expression, french, english),
                     )
-                    print(f"Inserted row {row_num}: {expression}")
+                    if cur.rowcount:
+                        print(f"Inserted row {row_num}: {expression}")
+                    else:
+                        print(f"Skipping row {row_num}: already in examples")
 
 if __name__ == "__main__":
     main()
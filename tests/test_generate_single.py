@@ -0,0 +1,32 @@
+"""generate-single.py --list --trial-run must leave the progress journal alone, even with --restart."""
+
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).resolve().parents[1] / "tools"
+sys.path.insert(0, str(TOOLS_DIR))
+
+spec = importlib.util.spec_from_file_location("generate_single", TOOLS_DIR / "generate-single.py")
+generate_single = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(generate_single)
+
+
+def test_trial_run_restart_keeps_journal(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    journal = tmp_path / generate_single.PROGRESS_FILE
+    entry = {"expression": "la pomme", "step": "mp3"}
+    journal.write_text(json.dumps(entry) + "\n", encoding="utf-8")
+    (tmp_path / "list.txt").write_text("la pomme\nle chat\n", encoding="utf-8")
+    monkeypatch.setattr(sys, "argv", ["generate-single.py", "--list", "list.txt", "--trial-run", "--restart"])
+
+    try:
+        generate_single.main()
+    except SystemExit as e:
+        assert e.code == 0
+
+    assert journal.read_text(encoding="utf-8") == json.dumps(entry) + "\n"
+    # --restart is still previewed: the recorded mp3 step is planned again
+    assert "[TRIAL] la pomme: image, mp3, examples" in capsys.readouterr().out
+    assert not list(tmp_path.glob("*.html"))
@@ -0,0 +1,83 @@
+"""Login with STATELESS_SESSIONS: the session carries the user's tier, never the password hash."""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("FLASK_SECRET_KEY", "test-secret")
+os.environ.setdefault("NEON_DATABASE_URL", "postgresql://test@localhost/test")
+os.environ.setdefault("METRICS_DIR", "/tmp/frflashy-test-metrics")
+
+import api_app  # noqa: E402
+import session_tokens  # noqa: E402
+from password_policy import hash_password  # noqa: E402
+
+PASSWORD = "correct horse"
+PASSWORD_HASH = hash_password(PASSWORD)
+# id, username, email, password_hash, tier - the columns login selects
+USER_ROW = (7, "ann", "ann@example.org", PASSWORD_HASH, api_app.TIER_BASIC)
+
+
+class FakeCursor:
+    def __init__(self, queries):
+        self.queries = queries
+
+    def execute(self, query, params=None):
+        self.queries.append(query)
+
+    def fetchone(self):
+        return USER_ROW
+
+
+class FakeConnection:
+    def __init__(self, queries):
+        self.queries = queries
+
+    def cursor(self):
+        return FakeCursor(self.queries)
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    queries = []
+    monkeypatch.setattr(api_app.psycopg2, "connect", lambda dsn: FakeConnection(queries))
+    monkeypatch.setattr(api_app, "STATELESS_SESSIONS", True)
+    monkeypatch.setattr(session_tokens, "_revocations", session_tokens.RevocationList(tmp_path / "revocations.txt"))
+    api_app.app.config["TESTING"] = True
+    with api_app.app.test_client() as client:
+        client.queries = queries
+        yield client
+
+
+def test_login_stores_int_tier_claims(client):
+    response = client.post("/login", data={"username": "ann", "password": PASSWORD})
+    assert response.status_code == 302
+
+    with client.session_transaction() as sess:
+        claims = sess[session_tokens.SESSION_KEY]
+    assert claims["id"] == 7
+    assert claims["tier"] == api_app.TIER_BASIC
+    assert PASSWORD_HASH not in claims.values()
+
+    # Served from the claims: no DB query, and the tier compares as an int
+    client.queries.clear()
+    response = client.get("/premium-feature")
+    assert response.status_code == 403
+    assert client.queries == []
+
+
+def test_claims_reject_non_int_tier(tmp_path):
+    with pytest.raises(ValueError):
+        session_tokens.issue_claims(7, "ann", "ann@example.org", PASSWORD_HASH)
+    claims = session_tokens.issue_claims(7, "ann", "ann@example.org", 1)
+    claims["tier"] = PASSWORD_HASH
+    assert not session_tokens.claims_valid(claims, 7, session_tokens.RevocationList(tmp_path / "r.txt"))
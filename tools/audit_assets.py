@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+audit_assets.py - Cross-check vocabulary CSVs against their PNG/MP3 assets
+
+Generalises check_mp3_png.py.  For every vocabulary category:
+  - each CSV row must have <safeName(French)>.png and .mp3 (same
+    normalisation as safeName() in the Nommez-image.html templates)
+  - PNG/MP3 files that no row refers to are reported as orphans
+  - zero-byte files, truncated/corrupt MP3s (MPEG frame headers are walked
+    to end of file) and undecodable PNGs (chunk CRCs + full IDAT inflate)
+    are reported as broken
+
+Categories without a CSV (e.g. lesanimaux) fall back to mp3 <-> png pairing.
+Files are checked in parallel; each result is cached by the file's SHA-256
+in .asset-audit-cache.json at the repo root.  A file whose size and mtime
+match its cache entry is not read at all; one whose stat changed (a fresh
+checkout, a touch, a copy or rename) is hashed, and only content never seen
+before is checked again.  Exits 1 if any problem is found (for CI).
+
+Usage:
+  python3 tools/audit_assets.py [--jobs N] [--no-cache] [category-dir ...]
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import struct
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+CACHE_PATH = BASE_DIR / ".asset-audit-cache.json"
+
+# Category directory -> the CSV its Nommez-image.html template loads
+CATEGORY_CSVS = {
+    "bathroom-vocabulary": "bathroom-vocabulary.csv",
+    "kitchen-vocabulary": "kitchen-vocabulary.csv",
+    "vetements-vocabulary": "vetements-a1-a2.csv",
+}
+
+# Responsive variants written by build_image_variants.py are not cards
+VARIANT_RE = re.compile(r"-\d+w$")
+
+# Bump when the checks change so stale cache entries are ignored
+CHECK_VERSION = 1
+
+
+# ---------------------------------------------------------------------
+# Names
+# ---------------------------------------------------------------------
+def safe_name(name: str) -> str:
+    """Python twin of safeName() in templates/vocab/*/Nommez-image.html."""
+    result = name.strip()
+    result = re.sub(r"\s*/\s*", "-", result)
+    result = re.sub(r"^l'", "l-", result, flags=re.IGNORECASE)
+    result = re.sub(r"\s+", "-", result)
+    result = re.sub(r"'", "-", result)
+    result = re.sub(r"-+", "-", result)
+    return result
+
+
+def read_expected(csv_path: Path) -> list[str]:
+    """safeName of the French column of every data row (header skipped)."""
+    names = []
+    with csv_path.open("r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            if len(row) >= 2 and row[1].strip():
+                names.append(safe_name(row[1]))
+    return names
+
+
+# ---------------------------------------------------------------------
+# MP3 validation
+# ---------------------------------------------------------------------
+_BITRATES = {
+    # (mpeg1?, layer) -> kbps by index 1..14
+    (True, 1): [32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (True, 2): [32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (True, 3): [32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (False, 1): [32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (False, 2): [8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (False, 3): [8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+def mp3_frame_length(header: bytes) -> int | None:
+    """Length in bytes of the MPEG audio frame starting with header, or None."""
+    if len(header) < 4 or header[0] != 0xFF or (header[1] & 0xE0) != 0xE0:
+        return None
+    version = (header[1] >> 3) & 0x03      # 0=2.5, 1=reserved, 2=2, 3=1
+    layer = 4 - ((header[1] >> 1) & 0x03)  # 1..3, 4 = reserved
+    bitrate_idx = header[2] >> 4
+    rate_idx = (header[2] >> 2) & 0x03
+    padding = (header[2] >> 1) & 0x01
+    if version == 1 or layer == 4 or bitrate_idx in (0, 15) or rate_idx == 3:
+        return None
+
+    mpeg1 = version == 3
+    bitrate = _BITRATES[(mpeg1, layer)][bitrate_idx - 1] * 1000
+    sample_rate = _SAMPLE_RATES[version][rate_idx]
+    if layer == 1:
+        return (12 * bitrate // sample_rate + padding) * 4
+    if layer == 3 and not mpeg1:
+        return 72 * bitrate // sample_rate + padding
+    return 144 * bitrate // sample_rate + padding
+
+
+def check_mp3(data: bytes) -> str | None:
+    """None if every frame header chains cleanly to EOF, else the problem."""
+    pos = 0
+    if data[:3] == b"ID3" and len(data) >= 10:
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        pos = 10 + size + (10 if data[5] & 0x10 else 0)
+
+    # Tolerate a little padding between the tag and the first frame.
+    end = len(data)
+    if data[-128:-125] == b"TAG":
+        end -= 128
+    scan_limit = min(end, pos + 4096)
+    while pos < scan_limit and mp3_frame_length(data[pos:pos + 4]) is None:
+        pos += 1
+
+    frames = 0
+    while pos < end:
+        length = mp3_frame_length(data[pos:pos + 4])
+        if length is None:
+            return f"bad frame header at byte {pos}" if frames else "no MPEG audio frames found"
+        if pos + length > end:
+            return f"truncated: last frame needs {pos + length - end} more byte(s)"
+        pos += length
+        frames += 1
+    return None if frames else "no MPEG audio frames found"
+
+
+# ---------------------------------------------------------------------
+# PNG validation
+# ---------------------------------------------------------------------
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+
+def check_png(data: bytes) -> str | None:
+    """None if all chunk CRCs match and the IDAT stream inflates fully."""
+    if not data.startswith(PNG_SIGNATURE):
+        if data.startswith(b"\xff\xd8\xff"):
+            return "JPEG data with a .png name"
+        return "not a PNG (bad signature)"
+    pos = len(PNG_SIGNATURE)
+    inflater = zlib.decompressobj()
+    raw_len = 0
+    ihdr = None
+    seen_iend = False
+    while pos + 8 <= len(data):
+        length, ctype = struct.unpack(">I4s", data[pos:pos + 8])
+        chunk = data[pos + 8:pos + 8 + length]
+        crc_bytes = data[pos + 8 + length:pos + 12 + length]
+        if len(chunk) < length or len(crc_bytes) < 4:
+            return f"truncated in {ctype.decode('latin-1')} chunk"
+        if zlib.crc32(ctype + chunk) != struct.unpack(">I", crc_bytes)[0]:
+            return f"CRC mismatch in {ctype.decode('latin-1')} chunk"
+        if ctype == b"IHDR":
+            ihdr = struct.unpack(">IIBBBBB", chunk)
+        elif ctype == b"IDAT":
+            try:
+                raw_len += len(inflater.decompress(chunk))
+            except zlib.error as e:
+                return f"IDAT does not inflate: {e}"
+        elif ctype == b"IEND":
+            seen_iend = True
+            break
+        pos += 12 + length
+
+    if ihdr is None:
+        return "missing IHDR"
+    if not seen_iend:
+        return "truncated: no IEND chunk"
+    if not inflater.eof:
+        return "truncated: IDAT stream incomplete"
+
+    width, height, depth, color_type, _, _, interlace = ihdr
+    if color_type not in _PNG_CHANNELS:
+        return f"invalid colour type {color_type}"
+    if not interlace:
+        row_bytes = (width * _PNG_CHANNELS[color_type] * depth + 7) // 8
+        expected = height * (row_bytes + 1)
+        if raw_len != expected:
+            return f"pixel data is {raw_len} bytes, expected {expected}"
+    return None
+
+
+# ---------------------------------------------------------------------
+# Per-file check (runs in worker processes)
+# ---------------------------------------------------------------------
+def hash_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def check_file(path: str) -> dict:
+    data = Path(path).read_bytes()
+    result = {"sha256": hashlib.sha256(data).hexdigest(), "version": CHECK_VERSION}
+    if not data:
+        result["problem"] = "zero-byte file"
+    elif path.lower().endswith(".mp3"):
+        result["problem"] = check_mp3(data)
+    else:
+        result["problem"] = check_png(data)
+    return result
+
+
+def load_cache() -> dict:
+    if CACHE_PATH.exists():
+        try:
+            return json.loads(CACHE_PATH.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            pass
+    return {}
+
+
+def save_cache(cache: dict) -> None:
+    tmp = CACHE_PATH.with_suffix(".tmp")
+    tmp.write_text(json.dumps(cache, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, CACHE_PATH)
+
+
+def check_files(paths: list[Path], jobs: int, use_cache: bool) -> dict[Path, str | None]:
+    """
+    Problem (or None) for each path.  The cache maps relative path to
+    {size, mtime_ns, sha256, problem}; results are looked up by sha256, with
+    the stat as a pre-check: an unchanged size and mtime reuse the entry
+    without reading the file, otherwise the file is hashed and any entry
+    with the same content (under any path) is reused.
+    """
+    cache = load_cache() if use_cache else {}
+    by_hash = {e["sha256"]: e["problem"] for e in cache.values()
+               if e.get("version") == CHECK_VERSION and "sha256" in e}
+    results = {}
+    stale = []
+    for path in paths:
+        key = str(path.relative_to(BASE_DIR)) if path.is_relative_to(BASE_DIR) else str(path)
+        st = path.stat()
+        hit = cache.get(key)
+        if (hit and hit.get("version") == CHECK_VERSION
+                and hit.get("size") == st.st_size and hit.get("mtime_ns") == st.st_mtime_ns):
+            results[path] = hit["problem"]
+        else:
+            stale.append((path, key, st))
+
+    todo = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        if stale and by_hash:
+            hashes = pool.map(hash_file, [str(p) for p, _, _ in stale], chunksize=16)
+            for (path, key, st), sha in zip(stale, hashes):
+                if sha in by_hash:
+                    results[path] = by_hash[sha]
+                    cache[key] = {"sha256": sha, "version": CHECK_VERSION, "problem": by_hash[sha],
+                                  "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+                else:
+                    todo.append((path, key, st))
+        else:
+            todo = stale
+        if todo:
+            checked = pool.map(check_file, [str(p) for p, _, _ in todo], chunksize=16)
+            for (path, key, st), result in zip(todo, checked):
+                results[path] = result["problem"]
+                cache[key] = {**result, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+    if use_cache:
+        save_cache(cache)
+    print(f"Checked {len(todo)} file(s), {len(paths) - len(todo)} from cache "
+          f"({len(stale) - len(todo)} by content hash)")
+    return results
+
+
+# ---------------------------------------------------------------------
+# Audit
+# ---------------------------------------------------------------------
+def default_categories() -> list[Path]:
+    return [d for d in sorted((BASE_DIR / "static").glob("*-vocabulary")) if d.is_dir()]
+
+
+def list_assets(directory: Path) -> tuple[dict, dict]:
+    pngs = {p.stem: p for p in directory.glob("*.png") if not VARIANT_RE.search(p.stem)}
+    mp3s = {p.stem: p for p in directory.glob("*.mp3")}
+    return pngs, mp3s
+
+
+def audit_category(directory: Path, problems: dict) -> list[str]:
+    """Return a list of human-readable issues for one category directory."""
+    issues = []
+    pngs, mp3s = list_assets(directory)
+
+    csv_name = CATEGORY_CSVS.get(directory.name)
+    if csv_name and (directory / csv_name).exists():
+        expected = read_expected(directory / csv_name)
+        expected_set = set(expected)
+        for name in expected:
+            if name not in pngs:
+                issues.append(f"missing PNG for row '{name}' (expected {name}.png)")
+            if name not in mp3s:
+                issues.append(f"missing MP3 for row '{name}' (expected {name}.mp3)")
+        for name in sorted(set(pngs) - expected_set):
+            issues.append(f"orphan PNG {name}.png (no CSV row)")
+        for name in sorted(set(mp3s) - expected_set):
+            issues.append(f"orphan MP3 {name}.mp3 (no CSV row)")
+    else:
+        # No CSV: same pairing rule as check_mp3_png.py
+        for name in sorted(set(mp3s) - set(pngs)):
+            issues.append(f"{name}.mp3 has no matching {name}.png")
+
+    for path in sorted(list(pngs.values()) + list(mp3s.values())):
+        problem = problems.get(path)
+        if problem:
+            issues.append(f"broken {path.name}: {problem}")
+    return issues
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit vocabulary PNG/MP3 assets against their CSVs.")
+    parser.add_argument("dirs", nargs="*", help="Category directories (default: static/*-vocabulary)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore and do not update the result cache")
+    args = parser.parse_args()
+
+    directories = [Path(d).resolve() for d in args.dirs] if args.dirs else default_categories()
+    for d in directories:
+        if not d.is_dir():
+            print(f"ERROR: Directory '{d}' does not exist!")
+            sys.exit(2)
+
+    print("=" * 60)
+    print(f"Asset audit: {len(directories)} categor{'y' if len(directories) == 1 else 'ies'}")
+    print("=" * 60)
+
+    all_files = []
+    for d in directories:
+        pngs, mp3s = list_assets(d)
+        all_files.extend(pngs.values())
+        all_files.extend(mp3s.values())
+    problems = check_files(all_files, args.jobs, use_cache=not args.no_cache)
+
+    total_issues = 0
+    for d in directories:
+        issues = audit_category(d, problems)
+        total_issues += len(issues)
+        mark = "✓" if not issues else "✗"
+        print(f"\n{mark} {d.name}: {len(issues)} issue(s)")
+        for issue in issues:
+            print(f"  - {issue}")
+
+    print("\n" + "=" * 60)
+    if total_issues:
+        print(f"ERROR: {total_issues} issue(s) found")
+    else:
+        print("✓ All assets present and valid!")
+    print("=" * 60)
+    sys.exit(1 if total_issues else 0)
+
+
+if __name__ == "__main__":
+    main()
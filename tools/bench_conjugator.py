@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+bench_conjugator.py - Benchmark the conjugation engine (conjugator.py)
+
+Measures, per verb in static/learn-your-verbs/top-verbs.txt:
+  cold      a full 16-tense table built from the rule tables (cache cleared)
+  cached    the same table again, from the LRU cache
+  form      one form through Conjugator.form() (cached table + two lookups)
+  dataset   conjugations.Conjugations.verb() for the 28 hand-checked verbs,
+            the lookup the engine is meant to be as cheap as
+
+plus the one-off cost of resolving the whole top-verbs list to its models.
+
+Usage:
+  python3 tools/bench_conjugator.py [--verbs 500] [--repeat 5] [--json]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from conjugations import Conjugations  # noqa: E402
+from conjugator import Conjugator, load_top_verbs  # noqa: E402
+
+
+def per_call_us(fn, items, repeat: int) -> float:
+    """Best-of-`repeat` microseconds per call of fn(item)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, time.perf_counter() - start)
+    return best / len(items) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark conjugator.py.")
+    parser.add_argument("--verbs", type=int, default=0, help="Only the first N top verbs (default: all)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement; the best is kept")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    verbs = load_top_verbs()
+    if args.verbs:
+        verbs = verbs[:args.verbs]
+    if not verbs:
+        print("ERROR: no verbs in top-verbs.txt")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    conj = Conjugator(verbs)
+    index_ms = (time.perf_counter() - start) * 1e3
+
+    def cold(verb):
+        conj.conjugate.cache_clear()
+        conj.conjugate(verb)
+
+    clear_us = per_call_us(lambda _: conj.conjugate.cache_clear(), verbs, args.repeat)
+    cold_us = max(0.0, per_call_us(cold, verbs, args.repeat) - clear_us)
+    conj.warm()
+    cached_us = per_call_us(conj.conjugate, verbs, args.repeat)
+    form_us = per_call_us(lambda v: conj.form(v, "subjonctif", "nous"), verbs, args.repeat)
+    dataset = Conjugations()
+    dataset_us = per_call_us(dataset.verb, list(dataset.verbs), args.repeat)
+
+    results = [
+        {"measure": "index", "calls": len(verbs), "us_per_call": round(index_ms * 1e3 / len(verbs), 2),
+         "note": f"{index_ms:.1f} ms to resolve {len(verbs)} verbs to their models"},
+        {"measure": "cold", "calls": len(verbs), "us_per_call": round(cold_us, 2),
+         "note": "full table (16 tenses) from the rule tables"},
+        {"measure": "cached", "calls": len(verbs), "us_per_call": round(cached_us, 3), "note": "memoised table"},
+        {"measure": "form", "calls": len(verbs), "us_per_call": round(form_us, 3),
+         "note": "form(verb, 'subjonctif', 'nous')"},
+        {"measure": "dataset", "calls": len(dataset.verbs), "us_per_call": round(dataset_us, 3),
+         "note": "conjugations.json lookup, for comparison"},
+    ]
+
+    if args.json:
+        print(json.dumps({"verbs": len(verbs), "repeat": args.repeat, "results": results}, indent=2))
+        return
+
+    print(f"{len(verbs)} verbs, best of {args.repeat}\n")
+    print(f"{'measure':<10}{'calls':>7}{'µs/call':>10}  note")
+    for r in results:
+        print(f"{r['measure']:<10}{r['calls']:>7}{r['us_per_call']:>10.3f}  {r['note']}")
+
+
+if __name__ == "__main__":
+    main()
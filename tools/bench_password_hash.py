@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+bench_password_hash.py - Pick password-hash parameters for this server
+
+Times werkzeug's generate_password_hash for a ladder of scrypt and pbkdf2
+costs (verifying a password costs the same as hashing it), and runs a burst
+of --burst logins over --workers processes to show how long a class logging
+in at once waits.  With --target-ms the strongest setting of each algorithm
+that stays under the target is suggested as PASSWORD_HASH_METHOD for
+password_policy.py.
+
+Usage:
+  python3 tools/bench_password_hash.py [--target-ms 50] [--burst 30] [--workers 4]
+  python3 tools/bench_password_hash.py --method scrypt:65536:8:1 --method pbkdf2:sha256:1000000 [--json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from werkzeug.security import generate_password_hash
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from password_policy import SALT_LENGTH, policy_method  # noqa: E402
+
+# Weakest to strongest within each algorithm
+DEFAULT_METHODS = (
+    "scrypt:4096:8:1",
+    "scrypt:8192:8:1",
+    "scrypt:16384:8:1",
+    "scrypt:32768:8:1",
+    "scrypt:65536:8:1",
+    "pbkdf2:sha256:100000",
+    "pbkdf2:sha256:260000",
+    "pbkdf2:sha256:600000",
+    "pbkdf2:sha256:1000000",
+)
+
+
+def hash_ms(method: str) -> float:
+    start = time.perf_counter()
+    generate_password_hash("benchmark-password", method=method, salt_length=SALT_LENGTH)
+    return (time.perf_counter() - start) * 1e3
+
+
+def best_ms(method: str, repeat: int) -> float:
+    return min(hash_ms(method) for _ in range(repeat))
+
+
+def burst_ms(method: str, logins: int, workers: int) -> float:
+    """Wall time for `logins` hashes spread over `workers` processes."""
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(hash_ms, [method] * workers))  # start the workers first
+        start = time.perf_counter()
+        list(pool.map(hash_ms, [method] * logins))
+        return (time.perf_counter() - start) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark password-hash methods for password_policy.py.")
+    parser.add_argument("--method", action="append", help="Method to time (repeatable; default a scrypt/pbkdf2 ladder)")
+    parser.add_argument("--repeat", type=int, default=3, help="Hashes per method; the best is kept")
+    parser.add_argument("--burst", type=int, default=30, help="Logins arriving at once (0 to skip)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Processes hashing in parallel, e.g. mod_wsgi processes (default: CPU count)")
+    parser.add_argument("--target-ms", type=float, help="Suggest the strongest method under this many ms per login")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    methods = args.method or list(DEFAULT_METHODS)
+    results = []
+    for method in methods:
+        try:
+            ms = best_ms(method, args.repeat)
+        except ValueError as e:
+            print(f"ERROR: {method}: {e}")
+            sys.exit(1)
+        row = {"method": method, "ms_per_hash": round(ms, 1), "logins_per_s_per_core": round(1e3 / ms, 1)}
+        if args.burst:
+            row["burst_ms"] = round(burst_ms(method, args.burst, args.workers), 1)
+        results.append(row)
+        if not args.json:
+            print(f"[INFO] {method}: {ms:.1f} ms", file=sys.stderr)
+
+    # The slowest method of each algorithm that is still under the target
+    suggestions = {}
+    if args.target_ms:
+        fastest_first = sorted(results, key=lambda r: r["ms_per_hash"])
+        for row in fastest_first:
+            if row["ms_per_hash"] <= args.target_ms:
+                suggestions[row["method"].split(":", 1)[0]] = row["method"]
+
+    if args.json:
+        print(json.dumps({"policy": policy_method(), "salt_length": SALT_LENGTH, "burst": args.burst,
+                          "workers": args.workers, "results": results, "suggestions": suggestions}, indent=2))
+        return
+
+    print(f"\ncurrent policy: {policy_method()}")
+    header = f"{'method':<24}{'ms/hash':>9}{'logins/s/core':>15}"
+    if args.burst:
+        header += f"{f'{args.burst} logins, {args.workers} procs (ms)':>36}"
+    print(header)
+    for row in results:
+        line = f"{row['method']:<24}{row['ms_per_hash']:>9.1f}{row['logins_per_s_per_core']:>15.1f}"
+        if args.burst:
+            line += f"{row['burst_ms']:>36.1f}"
+        print(line)
+    if args.target_ms:
+        print()
+        if not suggestions:
+            print(f"No method hashes in under {args.target_ms:g} ms on this machine.")
+        for algorithm, method in suggestions.items():
+            print(f"{algorithm}: PASSWORD_HASH_METHOD={method}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+bench_pipelines.py - Benchmark the OpenAI pipelines offline
+
+Starts tools/fake_openai.py on a free port, points the pipelines at it
+through OPENAI_BASE_URL, runs each one and reports throughput plus how much
+of the wall time was spent waiting on the (fake) API versus in our own code.
+
+Scenarios:
+  make_mp3         tools/make_mp3.py over the first N rows of the vêtements CSV
+  generate-single  tools/generate-single.py for N expressions (image, MP3, examples, HTML)
+  make-examples    static/bathroom-vocabulary/make-examples.py (writes to the
+                   examples table, so only with --with-db; see below)
+  flask            /pronounce and /upload-audio through the Flask test client
+                   (needs FLASK_SECRET_KEY and NEON_DATABASE_URL to import api_app)
+
+The LLM answer cache is switched off (LLM_CACHE_MODE=off) so every run
+measures real request traffic.
+
+make-examples runs against --db-url (default BENCH_DATABASE_URL), a scratch
+database with the examples schema.  Falling back to NEON_DATABASE_URL, the
+production database, needs --allow-neon as well.  Either way the rows it
+adds, all under made-up "zz-bench ..." expressions, are deleted afterwards,
+even if the run fails.
+
+Usage:
+  python3 tools/bench_pipelines.py [--items 5] [--latency-ms 300] [--jitter-ms 0]
+                                   [--rate-limit-every 0] [--only make_mp3,flask] [--json]
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from fake_openai import start_fake_server
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+TOOLS_DIR = BASE_DIR / "tools"
+VOCAB_CSV = BASE_DIR / "static" / "vetements-vocabulary" / "vetements-a1-a2.csv"
+
+SCENARIOS = ("make_mp3", "generate-single", "make-examples", "flask")
+
+# Helper scripts generate-single.py runs from its working directory.
+GENERATE_SINGLE_DEPS = [
+    TOOLS_DIR / "generate-single.py",
+    TOOLS_DIR / "make_mp3_single.py",
+    TOOLS_DIR / "resize_png.py",
+    BASE_DIR / "static" / "vetements-vocabulary" / "generate-french-examples.py",
+]
+
+
+def vocab_rows(n: int) -> list[tuple[str, str, str]]:
+    with VOCAB_CSV.open(encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        rows = [(r["English"].strip(), r["French"].strip(), (r.get("Gender") or "").strip())
+                for r in reader if r.get("English") and r.get("French")]
+    return rows[:n]
+
+
+def pipeline_env(server) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "OPENAI_BASE_URL": server.base_url,
+        "OPENAI_API_KEY": "sk-fake",
+        "LLM_CACHE_MODE": "off",
+        "PYTHONUNBUFFERED": "1",
+    })
+    return env
+
+
+def run(cmd: list[str], cwd: Path, env: dict) -> subprocess.CompletedProcess:
+    return subprocess.run(cmd, cwd=cwd, env=env, capture_output=True, text=True)
+
+
+# ---------------------------------------------------------------------
+# Scenarios: each returns (items processed, failures, note)
+# ---------------------------------------------------------------------
+def bench_make_mp3(server, items: int, work: Path, args):
+    rows = vocab_rows(items)
+    csv_path = work / "bench.csv"
+    with csv_path.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["English", "French", "Gender"])
+        writer.writerows(rows)
+    proc = run([sys.executable, str(TOOLS_DIR / "make_mp3.py"), str(csv_path)], work, pipeline_env(server))
+    failed = proc.stdout.count("MP3 ERROR") + (proc.returncode != 0)
+    return len(rows), failed, proc.stderr.strip().splitlines()[-1:] if proc.returncode else ""
+
+
+def bench_generate_single(server, items: int, work: Path, args):
+    for dep in GENERATE_SINGLE_DEPS:
+        (work / dep.name).symlink_to(dep)
+    env = pipeline_env(server)
+    failed = 0
+    rows = vocab_rows(items)
+    for _, french, _ in rows:
+        proc = run([sys.executable, "generate-single.py", french], work, env)
+        if proc.returncode != 0:
+            failed += 1
+    return len(rows), failed, ""
+
+
+# Prefix of the made-up expressions make-examples is run on
+BENCH_EXPRESSION_PREFIX = "zz-bench "
+
+
+def bench_dsn(args) -> tuple[str | None, str]:
+    """(database URL for make-examples, or None with the reason it is skipped)."""
+    if not args.with_db:
+        return None, "skipped: writes to the examples table, pass --with-db"
+    if args.db_url:
+        return args.db_url, ""
+    if not os.getenv("NEON_DATABASE_URL"):
+        return None, "skipped: no --db-url / BENCH_DATABASE_URL"
+    if not args.allow_neon:
+        return None, "skipped: refusing NEON_DATABASE_URL (production) without --allow-neon; use --db-url"
+    return os.getenv("NEON_DATABASE_URL"), ""
+
+
+def delete_bench_rows(dsn: str) -> int:
+    import psycopg
+    with psycopg.connect(dsn) as conn:
+        return conn.execute("DELETE FROM examples WHERE expression LIKE %s",
+                            (BENCH_EXPRESSION_PREFIX + "%",)).rowcount
+
+
+def bench_make_examples(server, items: int, work: Path, args):
+    dsn, reason = bench_dsn(args)
+    if dsn is None:
+        return 0, 0, reason
+    csv_path = work / "bench.csv"
+    with csv_path.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["English", "French", "Gender"])
+        # Made-up expressions so the run never touches real rows' counts.
+        writer.writerows((en, BENCH_EXPRESSION_PREFIX + fr, g) for en, fr, g in vocab_rows(items))
+    script = BASE_DIR / "static" / "bathroom-vocabulary" / "make-examples.py"
+    env = dict(pipeline_env(server), NEON_DATABASE_URL=dsn)
+    try:
+        proc = run([sys.executable, str(script), str(csv_path)], work, env)
+    finally:
+        deleted = delete_bench_rows(dsn)
+    failed = proc.stderr.count("Failed to generate/insert") + (proc.returncode != 0)
+    return items, failed, f"{deleted} bench row(s) deleted from examples afterwards"
+
+
+def bench_flask(server, items: int, work: Path, args):
+    os.environ.update({k: v for k, v in pipeline_env(server).items()
+                       if k in ("OPENAI_BASE_URL", "OPENAI_API_KEY", "LLM_CACHE_MODE")})
+    sys.path.insert(0, str(BASE_DIR))
+    try:
+        import api_app
+    except Exception as e:
+        return 0, 0, f"skipped: cannot import api_app ({e})"
+
+    app = api_app.app
+    app.config.update(TESTING=True, LOGIN_DISABLED=True)
+    client = app.test_client()
+    failed = 0
+    rows = vocab_rows(items)
+    for _, french, _ in rows:
+        r = client.post("/pronounce", json={"text": french})
+        failed += r.status_code != 200
+        r = client.post("/upload-audio", content_type="multipart/form-data", data={
+            "audio": (io.BytesIO(b"\x1aE\xdf\xa3fake-webm"), "bench.webm"),
+            "expected_text": french,
+        })
+        failed += r.status_code != 200
+    return len(rows) * 2, failed, "requests = /pronounce + /upload-audio"
+
+
+BENCHES = {
+    "make_mp3": bench_make_mp3,
+    "generate-single": bench_generate_single,
+    "make-examples": bench_make_examples,
+    "flask": bench_flask,
+}
+
+
+def api_delta(before: dict, after: dict) -> tuple[int, int, float]:
+    """(requests, 429s, seconds spent inside the fake API) between two snapshots."""
+    requests = rate_limited = 0
+    seconds = 0.0
+    for name, stats in after["endpoints"].items():
+        prev = before["endpoints"].get(name, {})
+        requests += stats["requests"] - prev.get("requests", 0)
+        rate_limited += stats["rate_limited"] - prev.get("rate_limited", 0)
+        seconds += stats["seconds"] - prev.get("seconds", 0.0)
+    return requests, rate_limited, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pipelines against the fake OpenAI API.")
+    parser.add_argument("--items", type=int, default=5, help="Rows/expressions per scenario")
+    parser.add_argument("--only", default=",".join(SCENARIOS), help="Comma-separated scenarios")
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--rate-limit-every", type=int, default=0)
+    parser.add_argument("--mp3-kb", type=int, default=24)
+    parser.add_argument("--image-px", type=int, default=256)
+    parser.add_argument("--with-db", action="store_true", help="Also run scenarios that write to the database")
+    parser.add_argument("--db-url", default=os.getenv("BENCH_DATABASE_URL"),
+                        help="Scratch database for --with-db (default BENCH_DATABASE_URL)")
+    parser.add_argument("--allow-neon", action="store_true",
+                        help="Let --with-db fall back to NEON_DATABASE_URL, the production database")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    selected = [s.strip() for s in args.only.split(",") if s.strip()]
+    unknown = [s for s in selected if s not in BENCHES]
+    if unknown:
+        print(f"ERROR: unknown scenario(s) {', '.join(unknown)}; choose from {', '.join(SCENARIOS)}")
+        sys.exit(1)
+
+    server = start_fake_server(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, rate_limit_every=args.rate_limit_every,
+        mp3_kb=args.mp3_kb, image_px=args.image_px,
+    )
+
+    results = []
+    for name in selected:
+        with tempfile.TemporaryDirectory(prefix=f"bench-{name}-") as tmp:
+            before = server.stats.snapshot()
+            start = time.perf_counter()
+            items, failed, note = BENCHES[name](server, args.items, Path(tmp), args)
+            wall = time.perf_counter() - start
+            requests, rate_limited, api_seconds = api_delta(before, server.stats.snapshot())
+        results.append({
+            "scenario": name, "items": items, "failed": failed, "wall_s": round(wall, 3),
+            "items_per_s": round(items / wall, 2) if items and wall else None,
+            "api_requests": requests, "rate_limited": rate_limited,
+            "api_s": round(api_seconds, 3), "own_s": round(max(0.0, wall - api_seconds), 3),
+            "note": note if isinstance(note, str) else " ".join(note),
+        })
+    server.shutdown()
+
+    if args.json:
+        print(json.dumps({"latency_ms": args.latency_ms, "results": results}, indent=2))
+        return
+
+    print(f"Fake API latency {args.latency_ms:g} ms ± {args.jitter_ms:g}, "
+          f"429 every {args.rate_limit_every or 'never'}\n")
+    print(f"{'scenario':<16}{'items':>6}{'fail':>6}{'wall s':>9}{'items/s':>9}"
+          f"{'API req':>9}{'429s':>6}{'API s':>8}{'own s':>8}")
+    for r in results:
+        print(f"{r['scenario']:<16}{r['items']:>6}{r['failed']:>6}{r['wall_s']:>9.2f}"
+              f"{r['items_per_s'] or 0:>9.2f}{r['api_requests']:>9}{r['rate_limited']:>6}"
+              f"{r['api_s']:>8.2f}{r['own_s']:>8.2f}")
+        if r["note"]:
+            print(f"{'':<16}{r['note']}")
+    print("\n'own s' is wall time not spent inside the API: process start-up, imports,")
+    print("file I/O and image resizing.  For concurrent pipelines it can reach zero.")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,41 @@ Usage: python bldwebpage.py <image.png> <audio.mp3> <text> <test_number> <max_nu
 
 import sys
 import os
+import json
+
+# Written by tools/build_image_variants.py next to the images
+DECK_MANIFEST = "deck-manifest.json"
+
+def picture_html(image_path):
+    """
+    Build the card image markup.  If the image directory has a deck manifest,
+    emit a <picture> with AVIF/WebP/PNG srcsets so phones fetch a small
+    variant; otherwise fall back to the plain full-size <img>.
+    """
+    image_filename = os.path.basename(image_path)
+    img_tag = f'<img src="{image_filename}" alt="Image à identifier" class="main-image img-fluid"'
+
+    manifest_path = os.path.join(os.path.dirname(image_path), DECK_MANIFEST)
+    entry = None
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            entry = json.load(f).get("cards", {}).get(os.path.splitext(image_filename)[0])
+    if not entry:
+        return img_tag + ">"
+
+    def srcset(fmt):
+        return ", ".join(f"{v['file']} {v['w']}w" for v in entry["variants"].get(fmt, []))
+
+    sizes = "(max-width: 576px) 90vw, 45vw"
+    sources = ""
+    for fmt in ("avif", "webp"):
+        if entry["variants"].get(fmt):
+            sources += f'\n                <source type="image/{fmt}" srcset="{srcset(fmt)}" sizes="{sizes}">'
+    png_srcset = srcset("png")
+    if png_srcset:
+        img_tag += f' srcset="{png_srcset}" sizes="{sizes}"'
+    img_tag += f' width="{entry["width"]}" height="{entry["height"]}">'
+    return f"<picture>{sources}\n                {img_tag}\n            </picture>"
 
 def generate_html(image_path, audio_path, text, test_number, max_number):
     """Generate HTML content with Bootstrap v4"""
@@ -20,8 +55,8 @@ def generate_html(image_path, audio_path, text, test_number, max_number):
         next_page = f"tst-{next_number}.html"
     
     # Extract just the filename without directory path for HTML references
-    image_filename = os.path.basename(image_path)
     audio_filename = os.path.basename(audio_path)
+    image_html = picture_html(image_path)
     
     html_content = f"""<!DOCTYPE html>
 <html lang="fr">
@@ -66,7 +101,7 @@ def generate_html(image_path, audio_path, text, test_number, max_number):
         <h1 class="text-center my-4">Nommez cette Image</h1>
         
         <div class="image-container">
-            <img src="{image_filename}" alt="Image à identifier" class="main-image img-fluid">
+            {image_html}
         </div>
         
         <div class="button-container">
@@ -4,3 +4,5 @@ python3 tools/generate_build_script.py
 #cp tst-*.html /var/www/americancentrist/.
 #cp lesanimaux/* /var/www/americancentrist/lesanimaux/.
 
+python3 search_index.py
+python3 accents.py
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+build_audio_sprite.py - Join a story's phrase clips into one MP3 "sprite"
+
+A story page used to fetch one small MP3 per gloss span.  This joins the
+phrase clips listed in the story's audio-manifest.json (written by
+compile_story_audio.py) into <story>-sprite.mp3, with GAP_SECONDS of
+silence between clips, and records where each clip starts:
+
+    "sprite": {"file": "lrrh-sprite.mp3",
+               "clips": {"lrrh_un_jour.mp3": [0.0, 1.254], ...}}   # [start, duration] seconds
+
+static/stories/story-sprite.js reads that section and plays a phrase by
+seeking within the one sprite file.
+
+MP3 frames are self-contained enough to be joined as bytes: ID3 tags and
+Xing/Info header frames are dropped, every clip must share one sample
+rate and channel mode (true for one TTS voice/model), and clip lengths
+come from the frame headers, so no audio library is needed.
+
+A story whose clips were made before compile_story_audio.py (one
+make_mp3_single.py call per phrase) has no manifest; --from-pages writes
+one from the pages' data-audio spans and the MP3s already on disk first.
+
+Usage:
+  python3 build_audio_sprite.py ../static/stories/lrrh
+  python3 build_audio_sprite.py STORY_DIR [--gap 0.25] [--name lrrh-sprite.mp3] [--from-pages]
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+MANIFEST_NAME = "audio-manifest.json"
+GAP_SECONDS = 0.25
+
+# MPEG Layer III tables
+BITRATES_KBPS = {
+    1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+SAMPLE_RATES = {
+    1: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    2.5: (11025, 12000, 8000),
+}
+VERSIONS = {0: 2.5, 2: 2, 3: 1}
+
+
+class Frame:
+    __slots__ = ("data", "version", "sample_rate", "channels", "samples", "header")
+
+    def __init__(self, data: bytes, version, sample_rate: int, channels: int, samples: int):
+        self.data = data
+        self.version = version
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.samples = samples
+        self.header = data[:4]
+
+
+def parse_header(b: bytes):
+    """(version, frame length, sample rate, channel mode, samples, protected) or None."""
+    if len(b) < 4 or b[0] != 0xFF or (b[1] & 0xE0) != 0xE0:
+        return None
+    version = VERSIONS.get((b[1] >> 3) & 3)
+    layer = (b[1] >> 1) & 3
+    bitrate_idx = b[2] >> 4
+    rate_idx = (b[2] >> 2) & 3
+    if version is None or layer != 1 or bitrate_idx in (0, 15) or rate_idx == 3:
+        return None  # not Layer III, free format or reserved values
+    bitrate = BITRATES_KBPS[1 if version == 1 else 2][bitrate_idx] * 1000
+    sample_rate = SAMPLE_RATES[version][rate_idx]
+    padding = (b[2] >> 1) & 1
+    per_frame = 1152 if version == 1 else 576
+    length = (per_frame // 8) * bitrate // sample_rate + padding
+    return version, length, sample_rate, b[3] >> 6, per_frame, not (b[1] & 1)
+
+
+def is_info_frame(frame: bytes, version, channel_mode: int, protected: bool) -> bool:
+    """True for the Xing/Info/VBRI header frame encoders put first (no audio)."""
+    mono = channel_mode == 3
+    side_info = (17 if mono else 32) if version == 1 else (9 if mono else 17)
+    offset = 4 + (2 if protected else 0) + side_info
+    return frame[offset:offset + 4] in (b"Xing", b"Info") or frame[36:40] == b"VBRI"
+
+
+def read_frames(data: bytes) -> list[Frame]:
+    """Audio frames of an MP3 file, without ID3 tags or Xing/Info frames."""
+    pos = 0
+    if data[:3] == b"ID3" and len(data) >= 10:
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        pos = 10 + size + (10 if data[5] & 0x10 else 0)
+
+    frames = []
+    while pos + 4 <= len(data):
+        parsed = parse_header(data[pos:pos + 4])
+        if parsed is None:
+            if data[pos:pos + 3] == b"TAG":
+                break  # ID3v1 trailer
+            pos += 1   # resync on garbage between frames
+            continue
+        version, length, sample_rate, channel_mode, samples, protected = parsed
+        frame = data[pos:pos + length]
+        if len(frame) < length:
+            break      # truncated last frame
+        if not (not frames and is_info_frame(frame, version, channel_mode, protected)):
+            frames.append(Frame(frame, version, sample_rate, channel_mode, samples))
+        pos += length
+    return frames
+
+
+def silent_frame(like: Frame) -> bytes:
+    """
+    A frame with the same header as `like` whose side information is all
+    zeros: no Huffman data and global_gain 0, which decodes to silence.
+    """
+    h = bytearray(like.header)
+    h[1] |= 0x01        # no CRC
+    h[2] &= ~0x02       # no padding
+    parsed = parse_header(bytes(h))
+    return bytes(h) + bytes(parsed[1] - 4)
+
+
+def duration(frames: list[Frame]) -> float:
+    return sum(f.samples for f in frames) / frames[0].sample_rate if frames else 0.0
+
+
+def seed_manifest(story_dir: Path) -> Path:
+    """
+    Write the manifest's "pages" and "clips" sections from the story's pages
+    and the clips on disk.  The clips get no "key", so compile_story_audio.py
+    re-synthesises them the first time it runs on the story.
+    """
+    from compile_story_audio import parse_page   # it imports build_sprite from here
+
+    manifest_path = story_dir / MANIFEST_NAME
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        manifest = {}
+    pages = manifest.setdefault("pages", {})
+    clips = manifest.setdefault("clips", {})
+    page_paths = sorted(story_dir.glob("*.html"))
+    for page in page_paths:
+        parsed = parse_page(page)
+        if not parsed["phrases"]:
+            continue
+        pages[page.name] = {"full": parsed["full"], "phrases": [p["file"] for p in parsed["phrases"]]}
+        for phrase in parsed["phrases"]:
+            path = story_dir / phrase["file"]
+            if not path.is_file():
+                raise ValueError(f"{page.name}: {phrase['file']} not found")
+            clips.setdefault(phrase["file"], {"text": phrase["text"], "en": phrase["en"],
+                                              "bytes": path.stat().st_size})
+    if not pages:
+        raise ValueError(f"no page in {story_dir} has data-audio phrases")
+    tmp = manifest_path.with_name(manifest_path.name + ".tmp")
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp, manifest_path)
+    return manifest_path
+
+
+def build_sprite(story_dir: Path, gap: float = GAP_SECONDS, name: str | None = None) -> dict:
+    """Write the sprite and return the manifest's "sprite" section."""
+    manifest_path = story_dir / MANIFEST_NAME
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    name = name or f"{story_dir.name}-sprite.mp3"
+
+    # Every phrase clip of every page, in page order, each file once.
+    files = []
+    for page in sorted(manifest.get("pages", {})):
+        for file in manifest["pages"][page].get("phrases", []):
+            if file not in files:
+                files.append(file)
+    if not files:
+        raise ValueError(f"{manifest_path} lists no phrase clips")
+
+    chunks = []
+    clips = {}
+    offset = 0.0
+    first = None
+    by_key = {}
+    for file in files:
+        key = manifest.get("clips", {}).get(file, {}).get("key")
+        if key and key in by_key:
+            clips[file] = clips[by_key[key]]   # same text: reuse the same stretch
+            continue
+        frames = read_frames((story_dir / file).read_bytes())
+        if not frames:
+            raise ValueError(f"{file}: no MPEG Layer III frames found")
+        first = first or frames[0]
+        if (frames[0].sample_rate, frames[0].channels, frames[0].version) != \
+                (first.sample_rate, first.channels, first.version):
+            raise ValueError(f"{file}: sample rate/channels differ from {files[0]}; "
+                             "re-synthesise the story with one voice and model")
+
+        if chunks and gap > 0:
+            silence = silent_frame(first)
+            n = max(1, round(gap * first.sample_rate / first.samples))
+            chunks.append(silence * n)
+            offset += n * first.samples / first.sample_rate
+
+        length = duration(frames)
+        clips[file] = [round(offset, 4), round(length, 4)]
+        if key:
+            by_key[key] = file
+        chunks.append(b"".join(f.data for f in frames))
+        offset += length
+
+    sprite_path = story_dir / name
+    tmp = sprite_path.with_name(sprite_path.name + ".tmp")
+    tmp.write_bytes(b"".join(chunks))
+    os.replace(tmp, sprite_path)
+
+    section = {"file": name, "duration": round(offset, 4), "gap": gap, "clips": clips}
+    manifest["sprite"] = section
+    tmp = manifest_path.with_name(manifest_path.name + ".tmp")
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp, manifest_path)
+    return section
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Join a story's phrase MP3s into one sprite.")
+    parser.add_argument("story_dir", type=Path, help=f"Directory with the pages and {MANIFEST_NAME}")
+    parser.add_argument("--gap", type=float, default=GAP_SECONDS, help="Seconds of silence between clips")
+    parser.add_argument("--name", help="Sprite file name (default <story>-sprite.mp3)")
+    parser.add_argument("--from-pages", action="store_true",
+                        help=f"Write {MANIFEST_NAME} from the pages and the MP3s on disk first")
+    args = parser.parse_args()
+
+    story_dir = args.story_dir.resolve()
+    if args.from_pages:
+        try:
+            print(f"[INFO] Wrote {seed_manifest(story_dir)}")
+        except (OSError, ValueError) as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+    if not (story_dir / MANIFEST_NAME).is_file():
+        print(f"ERROR: {story_dir / MANIFEST_NAME} not found; run compile_story_audio.py "
+              "(or this script with --from-pages) first")
+        sys.exit(1)
+    try:
+        section = build_sprite(story_dir, args.gap, args.name)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    size_kb = (story_dir / section["file"]).stat().st_size / 1024
+    print(f"[✅] {section['file']}: {len(section['clips'])} clip(s), "
+          f"{section['duration']:.1f}s, {size_kb:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
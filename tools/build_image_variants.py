@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+build_image_variants.py - Responsive image variants for flashcard decks
+
+For every card PNG in a deck directory, writes width variants
+(<stem>-160w.png, <stem>-320w.webp, ...) in PNG, WebP and optionally AVIF,
+and records them in the directory's deck-manifest.json:
+
+  {"version": 1,
+   "cards": {"la-cuillère": {"src": "la-cuillère.png", "width": 384, "height": 849,
+                             "source_sha256": "...",
+                             "variants": {"webp": [{"w": 160, "file": "...", "bytes": 4012}, ...],
+                                          "png":  [...]}}}}
+
+The Nommez-image.html templates and bldwebpage.py read this manifest to emit
+<picture>/srcset markup.  Cards whose source hash is unchanged are skipped.
+
+Usage:
+  python3 tools/build_image_variants.py [--formats png,webp,avif] [--jobs N] [dir ...]
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from PIL import Image
+
+from optimize_image import (
+    DEFAULT_MIN_PSNR,
+    FORMAT_EXT,
+    VARIANT_RE,
+    VARIANT_WIDTHS,
+    avif_supported,
+    file_sha256,
+    make_variants,
+    variant_path,
+)
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DECK_MANIFEST = "deck-manifest.json"
+
+# <picture> source order: the browser takes the first type it supports.
+SOURCE_ORDER = ("avif", "webp")
+
+
+def default_directories() -> list[Path]:
+    return [d for d in sorted((BASE_DIR / "static").glob("*-vocabulary")) if d.is_dir()]
+
+
+def load_deck_manifest(directory: Path) -> dict:
+    path = Path(directory) / DECK_MANIFEST
+    if path.exists():
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            print(f"⚠️  Ignoring unreadable manifest {path}")
+    return {"version": 1, "cards": {}}
+
+
+def save_deck_manifest(directory: Path, manifest: dict) -> None:
+    path = Path(directory) / DECK_MANIFEST
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=1, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def srcset(entry: dict, fmt: str, prefix: str = "") -> str:
+    """'a-160w.webp 160w, a-320w.webp 320w' for one format of a manifest entry."""
+    return ", ".join(f"{prefix}{v['file']} {v['w']}w" for v in entry["variants"].get(fmt, []))
+
+
+def build_card(png: str, formats: tuple, widths: tuple, min_psnr: float) -> dict:
+    """Write every variant of one card and return its manifest entry."""
+    path = Path(png)
+    with Image.open(path) as im:
+        im.load()
+        img = im.copy()
+
+    variants = {}
+    for cand in make_variants(img, widths=widths, formats=formats, min_psnr=min_psnr):
+        out = variant_path(path, cand["width"], cand["format"])
+        out.write_bytes(cand["data"])
+        variants.setdefault(cand["format"], []).append(
+            {"w": cand["width"], "file": out.name, "bytes": cand["bytes"]}
+        )
+
+    return {
+        "src": path.name,
+        "width": img.size[0],
+        "height": img.size[1],
+        "source_sha256": file_sha256(path),
+        "variants": variants,
+    }
+
+
+def _up_to_date(entry: dict | None, png: Path) -> bool:
+    if not entry or entry.get("source_sha256") != file_sha256(png):
+        return False
+    return all((png.parent / v["file"]).exists() for vs in entry["variants"].values() for v in vs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build responsive image variants and deck manifests.")
+    parser.add_argument("dirs", nargs="*", help="Deck directories (default: static/*-vocabulary)")
+    parser.add_argument("--formats", default="png,webp", help="Comma-separated formats: png,webp,avif")
+    parser.add_argument("--widths", default=",".join(map(str, VARIANT_WIDTHS)),
+                        help=f"Comma-separated widths in px (default {','.join(map(str, VARIANT_WIDTHS))})")
+    parser.add_argument("--min-psnr", type=float, default=DEFAULT_MIN_PSNR, help="Quality floor in dB")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    args = parser.parse_args()
+
+    formats = tuple(f.strip().lower() for f in args.formats.split(",") if f.strip())
+    if any(f not in FORMAT_EXT for f in formats):
+        print(f"ERROR: --formats may only use {', '.join(FORMAT_EXT)}")
+        sys.exit(1)
+    if "avif" in formats and not avif_supported():
+        print("⚠️  AVIF not supported by this Pillow build, skipping AVIF")
+        formats = tuple(f for f in formats if f != "avif")
+    try:
+        widths = tuple(int(w) for w in args.widths.split(",") if w.strip())
+    except ValueError:
+        print("ERROR: --widths must be integers")
+        sys.exit(1)
+
+    directories = [Path(d).resolve() for d in args.dirs] if args.dirs else default_directories()
+
+    print("=" * 60)
+    print(f"Image Variants - widths {widths}, formats {formats}")
+    print("=" * 60)
+
+    failed = 0
+    for directory in directories:
+        if not directory.is_dir():
+            print(f"ERROR: Directory '{directory}' does not exist!")
+            sys.exit(1)
+
+        manifest = load_deck_manifest(directory)
+        cards = manifest["cards"]
+        pngs = [p for p in sorted(directory.glob("*.png")) if not VARIANT_RE.search(p.stem)]
+        todo = [p for p in pngs if not _up_to_date(cards.get(p.stem), p)]
+        print(f"\n📁 {directory.name}: {len(pngs)} card(s), {len(todo)} to build")
+
+        # Drop entries whose card image no longer exists.
+        for stem in set(cards) - {p.stem for p in pngs}:
+            del cards[stem]
+
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            futures = {pool.submit(build_card, str(p), formats, widths, args.min_psnr): p for p in todo}
+            for fut in as_completed(futures):
+                png = futures[fut]
+                try:
+                    entry = fut.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"  ❌ {png.name}: {e}")
+                    continue
+                cards[png.stem] = entry
+                total = sum(v["bytes"] for vs in entry["variants"].values() for v in vs)
+                print(f"  ✓ {png.name}: {sum(len(vs) for vs in entry['variants'].values())} variant(s), "
+                      f"{total / 1024:.1f} KB total")
+
+        save_deck_manifest(directory, manifest)
+        print(f"  ✓ wrote {directory.name}/{DECK_MANIFEST}")
+
+    print("\nDone." if not failed else f"\nDone with {failed} failure(s).")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,16 @@
 #!/usr/bin/env python3
 """
-Check for duplicate identical French sentences in the examples table.
+Check for duplicate French sentences in the examples table.
 Delete duplicates, keeping only one unique sentence per expression.
 
+Sentences count as duplicates when they are equal after normalisation:
+accents folded, case ignored, punctuation dropped and whitespace collapsed
+(see examples_sql.py).  So "Je mets mon manteau." and "je mets  mon manteau"
+are the same sentence; the one with the lowest ID is kept.
+
+All duplicates are found with a single window-function query and removed
+with one batched DELETE, instead of one query per expression.
+
 Usage:
     python3 check_examples.py --trial-run    # Show what would be deleted
     python3 check_examples.py                # Actually delete duplicates
@@ -13,89 +21,98 @@ from dotenv import load_dotenv
 import os
 import sys
 
+from examples_sql import normalized_french_sql
+
 # Load environment variables
 load_dotenv('/home/ubuntu/.env')
 
+# Delete in chunks so one statement never carries an unbounded id list
+DELETE_BATCH_SIZE = 1000
+
+FIND_DUPLICATES = f"""
+    WITH ranked AS (
+        SELECT id, expression, french,
+               ROW_NUMBER() OVER w AS rn,
+               COUNT(*)     OVER w AS group_size,
+               MIN(id)      OVER w AS keep_id
+          FROM examples
+         WHERE id >= 2
+        WINDOW w AS (PARTITION BY expression, {normalized_french_sql('french')} ORDER BY id
+                     ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING)
+    )
+    SELECT expression, keep_id, id, french, rn
+      FROM ranked
+     WHERE group_size > 1
+     ORDER BY expression, keep_id, rn
+"""
+
+
+def find_duplicate_groups(cur):
+    """
+    Return a list of groups, one per (expression, normalized French) with
+    more than one row: {expression, keep_id, keep_french, delete: [(id, french)]}.
+    """
+    cur.execute(FIND_DUPLICATES)
+    groups = []
+    for expression, keep_id, row_id, french, rn in cur.fetchall():
+        if rn == 1:
+            groups.append({"expression": expression, "keep_id": keep_id,
+                           "keep_french": french, "delete": []})
+        else:
+            groups[-1]["delete"].append((row_id, french))
+    return groups
+
+
+def delete_ids(cur, ids):
+    deleted = 0
+    for start in range(0, len(ids), DELETE_BATCH_SIZE):
+        batch = ids[start:start + DELETE_BATCH_SIZE]
+        cur.execute("DELETE FROM examples WHERE id = ANY(%s)", (batch,))
+        deleted += cur.rowcount
+    return deleted
+
+
 def check_and_cleanup_examples(trial_run=False):
     conn = psycopg2.connect(os.getenv('NEON_DATABASE_URL'))
     cur = conn.cursor()
-    
-    # Get all distinct expressions starting from id 2
-    cur.execute("""
-        SELECT DISTINCT expression 
-        FROM examples 
-        WHERE id >= 2 
-        ORDER BY expression
-    """)
-    
-    expressions = [row[0] for row in cur.fetchall()]
-    
+
     mode = "TRIAL RUN" if trial_run else "LIVE MODE"
-    print(f"{mode}: Checking {len(expressions)} expressions...\n")
-    
-    duplicates_found = 0
-    total_deleted = 0
-    
-    for expression in expressions:
-        # Get all records for this expression
-        cur.execute("""
-            SELECT id, french, english 
-            FROM examples 
-            WHERE expression = %s AND id >= 2
-            ORDER BY id
-        """, (expression,))
-        
-        rows = cur.fetchall()
-        
-        if len(rows) < 2:
-            # Only 1 record - leave it alone
-            continue
-        
-        # Group by identical French sentences
-        french_groups = {}
-        for row in rows:
-            french_text = row[1]
-            if french_text not in french_groups:
-                french_groups[french_text] = []
-            french_groups[french_text].append(row)
-        
-        # Check each group for duplicates
-        for french_text, group_rows in french_groups.items():
-            if len(group_rows) > 1:
-                # Found duplicates!
-                duplicates_found += 1
-                keep_id = group_rows[0][0]  # Keep the first one (lowest ID)
-                delete_ids = [row[0] for row in group_rows[1:]]  # Delete the rest
-                
-                print(f"{'❌ DUPLICATE' if not trial_run else '⚠️  WOULD DELETE'}: Expression '{expression}'")
-                print(f"   Identical French: '{french_text[:60]}{'...' if len(french_text) > 60 else ''}'")
-                print(f"   Found {len(group_rows)} identical records")
-                print(f"   Keeping ID: {keep_id}")
-                print(f"   {'Deleting' if not trial_run else 'Would delete'} IDs: {', '.join(map(str, delete_ids))}")
-                
-                if not trial_run:
-                    # Actually delete the duplicates
-                    for del_id in delete_ids:
-                        cur.execute("DELETE FROM examples WHERE id = %s", (del_id,))
-                        total_deleted += 1
-                    conn.commit()
-                    print(f"   ✓ Deleted {len(delete_ids)} duplicate(s)")
-                else:
-                    total_deleted += len(delete_ids)
-                
-                print()
-    
+    print(f"{mode}: Checking examples for duplicates...\n")
+
+    groups = find_duplicate_groups(cur)
+    duplicate_expressions = {g["expression"] for g in groups}
+
+    for group in groups:
+        french_text = group["keep_french"]
+        delete = group["delete"]
+        print(f"{'❌ DUPLICATE' if not trial_run else '⚠️  WOULD DELETE'}: Expression '{group['expression']}'")
+        print(f"   Identical French: '{french_text[:60]}{'...' if len(french_text) > 60 else ''}'")
+        for _, other in delete:
+            if other != french_text:
+                print(f"   Near-duplicate:   '{other[:60]}{'...' if len(other) > 60 else ''}'")
+        print(f"   Found {len(delete) + 1} identical records")
+        print(f"   Keeping ID: {group['keep_id']}")
+        print(f"   {'Deleting' if not trial_run else 'Would delete'} IDs: {', '.join(str(i) for i, _ in delete)}")
+        print()
+
+    all_ids = [row_id for g in groups for row_id, _ in g["delete"]]
+    if trial_run:
+        total_deleted = len(all_ids)
+    else:
+        total_deleted = delete_ids(cur, all_ids)
+        conn.commit()
+
     cur.close()
     conn.close()
-    
+
     print(f"\n{'='*60}")
-    if duplicates_found > 0:
+    if groups:
         if trial_run:
-            print(f"⚠️  TRIAL RUN: Found {duplicates_found} expressions with duplicates")
+            print(f"⚠️  TRIAL RUN: Found {len(duplicate_expressions)} expressions with duplicates")
             print(f"⚠️  Would delete {total_deleted} duplicate records")
             print(f"\nRun without --trial-run to actually delete them")
         else:
-            print(f"✅ CLEANED: Found and removed {duplicates_found} expressions with duplicates")
+            print(f"✅ CLEANED: Found and removed {len(duplicate_expressions)} expressions with duplicates")
             print(f"✅ Deleted {total_deleted} duplicate records")
     else:
         print("✅ All expressions have unique French sentences!")
@@ -104,7 +121,7 @@ def check_and_cleanup_examples(trial_run=False):
 if __name__ == '__main__':
     # Check for --trial-run flag
     trial_run = '--trial-run' in sys.argv
-    
+
     if trial_run:
         print("🔍 Running in TRIAL RUN mode - no changes will be made\n")
     else:
@@ -113,5 +130,5 @@ if __name__ == '__main__':
         if confirm.lower() != 'yes':
             print("Cancelled.")
             sys.exit(0)
-    
+
     check_and_cleanup_examples(trial_run)
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+compile_story_audio.py - Build every MP3 a glossed story page needs, in one process
+
+Reads story pages (static/stories/<story>/*.html), collects
+  - each <span data-audio="x.mp3">phrase</span>  -> x.mp3 says the phrase
+  - <audio id="player" src="y.mp3">                -> y.mp3 reads the whole .story text
+and synthesises them concurrently with one OpenAI client under a shared
+rate limit.  Identical texts are synthesised once ("dit" on page 2 is used
+twice), and clips whose text, voice and model have not changed since the
+last run are skipped, so re-running after editing one phrase costs one call.
+
+Writes audio-manifest.json next to the pages:
+  {"model", "voice",
+   "pages": {"lrrh-p1.html": {"full": "lrrh_full.mp3", "phrases": ["lrrh_un_jour.mp3", ...]}},
+   "clips": {"lrrh_un_jour.mp3": {"text", "en", "key", "bytes"}}}
+
+Then joins the phrase clips into <story>-sprite.mp3 for story-sprite.js
+(see build_audio_sprite.py) unless --no-sprite is given.
+
+Phrases are read as "En français, on dit << phrase >>", like
+make_mp3_single.py; pass --plain to read the bare phrase.
+
+Replaces the per-phrase make_mp3_single.py calls in lrrh.sh / lrrh-p2.sh.
+
+Usage:
+  python3 compile_story_audio.py ../static/stories/lrrh/lrrh-p1.html ../static/stories/lrrh/lrrh-p2.html
+  python3 compile_story_audio.py PAGE... [--jobs 4] [--rpm 50] [--instructions "clear, formal, use a woman's voice"]
+                                         [--model gpt-4o-mini-tts] [--plain] [--force] [--no-sprite]
+                                         [--trial-run]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from html.parser import HTMLParser
+from pathlib import Path
+
+from openai import OpenAI, RateLimitError
+
+from build_audio_sprite import build_sprite
+from llm_batch import RateLimiter
+from make_mp3_single import DEFAULT_MODEL, choose_voice
+
+DEFAULT_INSTRUCTIONS = "clear, formal, use a woman's voice"
+PHRASE_TEMPLATE = "En français, on dit << {text} >>"
+MANIFEST_NAME = "audio-manifest.json"
+DEFAULT_JOBS = 4
+DEFAULT_RPM = 50
+MAX_429_RETRIES = 4
+
+# Elements without an end tag, which must not open a nesting level
+VOID_TAGS = {"area", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+
+def collapse(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class StoryPageParser(HTMLParser):
+    """Collects data-audio phrases, the .story text and the main player's src."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.phrases = []       # [{"file", "text", "en"}]
+        self.full_src = None
+        self.story_text = []
+        self._open = []         # [[kind, depth, parts, attrs]]
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "audio" and attrs.get("id") == "player" and attrs.get("src"):
+            self.full_src = attrs["src"]
+        if tag in VOID_TAGS:
+            return
+        for entry in self._open:
+            entry[1] += 1
+        if attrs.get("data-audio"):
+            self._open.append(["phrase", 1, [], attrs])
+        if "story" in (attrs.get("class") or "").split():
+            self._open.append(["story", 1, self.story_text, attrs])
+
+    def handle_endtag(self, tag):
+        if tag in VOID_TAGS:
+            return
+        still_open = []
+        for entry in self._open:
+            entry[1] -= 1
+            if entry[1] > 0:
+                still_open.append(entry)
+            elif entry[0] == "phrase":
+                attrs = entry[3]
+                self.phrases.append({
+                    "file": attrs["data-audio"],
+                    "text": collapse("".join(entry[2])),
+                    "en": attrs.get("data-en", ""),
+                })
+        self._open = still_open
+
+    def handle_data(self, data):
+        for entry in self._open:
+            entry[2].append(data)
+
+
+def parse_page(path: Path) -> dict:
+    parser = StoryPageParser()
+    parser.feed(path.read_text(encoding="utf-8"))
+    parser.close()
+    return {
+        "phrases": parser.phrases,
+        "full": parser.full_src,
+        "full_text": collapse("".join(parser.story_text)),
+    }
+
+
+def clip_key(model: str, voice: str, tts_input: str) -> str:
+    return hashlib.sha256(f"{model}\0{voice}\0{tts_input}".encode("utf-8")).hexdigest()[:16]
+
+
+def load_manifest(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {"pages": {}, "clips": {}}
+
+
+def write_atomic(path: Path, data: bytes):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def synthesize(client: OpenAI, model: str, voice: str, text: str, limiter: RateLimiter) -> bytes:
+    """One TTS call; 429s are retried with exponential backoff."""
+    for attempt in range(MAX_429_RETRIES + 1):
+        limiter.acquire()
+        try:
+            resp = client.audio.speech.create(model=model, voice=voice, input=text, response_format="mp3")
+            break
+        except RateLimitError:
+            if attempt == MAX_429_RETRIES:
+                raise
+            time.sleep(2 ** attempt)
+    data = resp.read() if hasattr(resp, "read") else resp.content
+    if not data:
+        raise RuntimeError("audio.speech.create returned empty data")
+    return data
+
+
+def plan_clips(pages: list[Path], model: str, voice: str, plain: bool) -> tuple[dict, dict]:
+    """
+    Returns (clips, page_entries): clips maps output path -> {"text", "en",
+    "tts_input", "key"}; page_entries is the manifest's "pages" section.
+    """
+    clips = {}
+    page_entries = {}
+    for page in pages:
+        parsed = parse_page(page)
+        entry = {"full": parsed["full"], "phrases": []}
+        for phrase in parsed["phrases"]:
+            tts_input = phrase["text"] if plain else PHRASE_TEMPLATE.format(text=phrase["text"])
+            out = page.parent / phrase["file"]
+            clips[out] = {**phrase, "tts_input": tts_input, "key": clip_key(model, voice, tts_input)}
+            entry["phrases"].append(phrase["file"])
+        if parsed["full"] and parsed["full_text"]:
+            out = page.parent / parsed["full"]
+            clips[out] = {"file": parsed["full"], "text": parsed["full_text"], "en": "",
+                          "tts_input": parsed["full_text"],
+                          "key": clip_key(model, voice, parsed["full_text"])}
+        page_entries[page.name] = entry
+    return clips, page_entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthesise all phrase and full-text MP3s of story pages.")
+    parser.add_argument("pages", nargs="+", type=Path, help="Story HTML pages (same directory)")
+    parser.add_argument("--instructions", default=DEFAULT_INSTRUCTIONS,
+                        help="Voice/tone hints, as for make_mp3_single.py")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help="Concurrent TTS requests")
+    parser.add_argument("--rpm", type=float, default=DEFAULT_RPM, help="TTS requests per minute")
+    parser.add_argument("--plain", action="store_true", help="Read phrases without the 'En français, on dit' frame")
+    parser.add_argument("--force", action="store_true", help="Re-synthesise clips that are up to date")
+    parser.add_argument("--no-sprite", action="store_true", help="Do not rebuild the story's audio sprite")
+    parser.add_argument("--trial-run", action="store_true", help="Show what would be synthesised and exit")
+    args = parser.parse_args()
+
+    pages = [p.resolve() for p in args.pages]
+    missing = [p for p in pages if not p.is_file()]
+    if missing:
+        print(f"ERROR: page(s) not found: {', '.join(map(str, missing))}")
+        sys.exit(1)
+    story_dir = pages[0].parent
+    if any(p.parent != story_dir for p in pages):
+        print("ERROR: all pages must be in the same story directory")
+        sys.exit(1)
+
+    voice = choose_voice(args.instructions)
+    clips, page_entries = plan_clips(pages, args.model, voice, args.plain)
+
+    manifest_path = story_dir / MANIFEST_NAME
+    manifest = load_manifest(manifest_path)
+    done = manifest.get("clips", {})
+
+    def up_to_date(out: Path, clip: dict) -> bool:
+        return (not args.force and out.exists() and out.stat().st_size > 0
+                and done.get(out.name, {}).get("key") == clip["key"])
+
+    # One synthesis per distinct key; any up-to-date file with that key can be copied.
+    by_key = {}
+    for out, clip in clips.items():
+        by_key.setdefault(clip["key"], []).append(out)
+    todo = {}
+    copies = []   # (stale clip, up-to-date clip with the same key)
+    for key, outs in by_key.items():
+        stale = [o for o in outs if not up_to_date(o, clips[o])]
+        if not stale:
+            continue
+        fresh = [o for o in outs if o not in stale]
+        if fresh:
+            copies.extend((out, fresh[0]) for out in stale)
+        else:
+            todo[key] = stale
+
+    print(f"[INFO] {len(clips)} clip(s) on {len(pages)} page(s), voice {voice}, model {args.model}")
+    print(f"[INFO] {len(todo)} to synthesise, {len(clips) - sum(map(len, todo.values())) - len(copies)} up to date"
+          + (f", {len(copies)} copied from identical text" if copies else ""))
+    if args.trial_run:
+        for key, outs in todo.items():
+            print(f"  {', '.join(o.name for o in outs)}: {clips[outs[0]]['tts_input']}")
+        for out, source in copies:
+            print(f"  {out.name}: copy of {source.name}")
+        return
+
+    for out, source in copies:
+        write_atomic(out, source.read_bytes())
+
+    failed = []
+    if todo:
+        client = OpenAI()
+        limiter = RateLimiter(args.rpm, burst=args.jobs)
+        with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+            futures = {pool.submit(synthesize, client, args.model, voice,
+                                   clips[outs[0]]["tts_input"], limiter): outs
+                       for outs in todo.values()}
+            for fut in as_completed(futures):
+                outs = futures[fut]
+                try:
+                    data = fut.result()
+                except Exception as e:
+                    print(f"[ERROR] {outs[0].name}: {e}", file=sys.stderr)
+                    failed.extend(outs)
+                    continue
+                for out in outs:
+                    write_atomic(out, data)
+                    print(f"[✅] {out.name} ({len(data)} bytes)")
+
+    # Record what is on disk now; failed clips keep their previous entry.
+    for out, clip in clips.items():
+        if out in failed:
+            continue
+        done[out.name] = {"text": clip["text"], "en": clip["en"], "key": clip["key"],
+                          "bytes": out.stat().st_size}
+    manifest.update({"model": args.model, "voice": voice})
+    manifest.setdefault("pages", {}).update(page_entries)
+    manifest["clips"] = done
+    write_atomic(manifest_path, (json.dumps(manifest, ensure_ascii=False, indent=2) + "\n").encode("utf-8"))
+    print(f"[INFO] Wrote {manifest_path}")
+
+    if failed:
+        print(f"[ERROR] {len(failed)} clip(s) failed; re-run to retry them", file=sys.stderr)
+        sys.exit(3)
+
+    if not args.no_sprite:
+        try:
+            sprite = build_sprite(story_dir)
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] Sprite not built: {e}", file=sys.stderr)
+            sys.exit(3)
+        print(f"[✅] {sprite['file']} ({len(sprite['clips'])} clip(s), {sprite['duration']:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+examples_sql.py - SQL snippets shared by the tools that work on the examples table
+
+Imported by check-examples.py and load_examples_copy.py (same directory),
+and by the example loaders under static/ for the ON CONFLICT target.
+"""
+
+# One row per (expression_key, french_key); added by migration 0003.
+UNIQUE_SENTENCE = "examples_unique_sentence"
+UNIQUE_SENTENCE_MIGRATION = 3
+
+# Accented letters and their plain equivalents, one-for-one for translate().
+# œ/æ expand to two letters, so they are handled with replace() instead.
+ACCENTED = "àâäáãåçéèêëíìîïñóòôöõúùûüýÿÀÂÄÁÃÅÇÉÈÊËÍÌÎÏÑÓÒÔÖÕÚÙÛÜÝŸ"
+UNACCENTED = "aaaaaaceeeeiiiinooooouuuuyyAAAAAACEEEEIIIINOOOOOUUUUYY"
+
+
+def fold_sql(col: str) -> str:
+    """SQL expression: col lowercased with accents, œ and æ folded to ASCII."""
+    return (
+        f"lower(replace(replace(replace(replace(translate({col}, '{ACCENTED}', '{UNACCENTED}'),"
+        f" 'œ', 'oe'), 'Œ', 'OE'), 'æ', 'ae'), 'Æ', 'AE'))"
+    )
+
+
+def normalized_french_sql(col: str) -> str:
+    """
+    SQL expression used to spot duplicate example sentences: accent-folded,
+    lowercased, punctuation removed (apostrophes become spaces so "l'eau"
+    and "l eau" agree) and whitespace collapsed.
+    """
+    no_apostrophes = f"regexp_replace({fold_sql(col)}, '[''’]', ' ', 'g')"
+    no_punct = f"regexp_replace({no_apostrophes}, '[[:punct:]«»…“”]', '', 'g')"
+    return f"btrim(regexp_replace({no_punct}, '\\s+', ' ', 'g'))"
+
+
+def require_migration(cur, version: int = UNIQUE_SENTENCE_MIGRATION) -> None:
+    """Exit with a clear message unless `version` is recorded in schema_migrations."""
+    cur.execute("SELECT to_regclass('schema_migrations') IS NOT NULL")
+    if cur.fetchone()[0]:
+        cur.execute("SELECT 1 FROM schema_migrations WHERE version = %s", (version,))
+        if cur.fetchone():
+            return
+    raise SystemExit(
+        f"ERROR: migration {version:04d} is not applied to this database "
+        f"(the examples table needs the {UNIQUE_SENTENCE} constraint); run: python3 tools/migrate.py"
+    )
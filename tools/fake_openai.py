@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+fake_openai.py - Offline, deterministic stand-in for the OpenAI API
+
+Serves the subset of endpoints our pipelines call:
+
+  POST /v1/chat/completions        chat.completions.create
+  POST /v1/audio/speech            audio.speech.create        (valid MPEG frames)
+  POST /v1/images/generations      images.generate            (valid PNG, b64_json)
+  POST /v1/audio/transcriptions    audio.transcriptions.create
+
+The official SDK reads OPENAI_BASE_URL, so pointing any script (and the
+subprocesses it starts) at the fake only needs:
+
+  OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=sk-fake python3 make_mp3.py ...
+
+Answers are derived from a hash of the request body, so the same request
+always gets the same answer.  Latency, injected 429s and payload sizes are
+configurable; GET /_stats returns per-endpoint request counts and timings.
+
+Chat answers follow the shape the caller asked for: JSON mode echoes
+{"items": [...]} batches from tools/llm_batch.py with "english" and
+"examples" filled in, and otherwise returns {"french": ..., "english": ...}.
+Plain-text answers are a few short French lines.
+
+Usage:
+  python3 tools/fake_openai.py [--port 8765] [--latency-ms 300] [--jitter-ms 100]
+                               [--rate-limit-every 0] [--mp3-kb 24] [--image-px 256]
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import re
+import struct
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_PORT = 8765
+
+# MPEG-1 Layer III, 128 kbit/s, 44.1 kHz, no padding: 417-byte frames.
+MP3_FRAME_HEADER = bytes([0xFF, 0xFB, 0x90, 0x64])
+MP3_FRAME_LEN = 417
+
+ENDPOINTS = {
+    "/v1/chat/completions": "chat",
+    "/v1/audio/speech": "speech",
+    "/v1/images/generations": "images",
+    "/v1/audio/transcriptions": "transcriptions",
+}
+
+
+class FakeConfig:
+    def __init__(self, latency_ms=300.0, jitter_ms=100.0, rate_limit_every=0,
+                 mp3_kb=24, image_px=256, endpoint_latency_ms=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        # Every Nth request gets a 429 (0 = never).
+        self.rate_limit_every = rate_limit_every
+        self.mp3_kb = mp3_kb
+        # Images are served at most this many pixels wide, whatever size was asked.
+        self.image_px = image_px
+        self.endpoint_latency_ms = endpoint_latency_ms or {}
+
+
+class FakeStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.per_endpoint = {}
+
+    def record(self, endpoint: str, status: int, seconds: float, sent: int):
+        with self.lock:
+            self.requests += 1
+            s = self.per_endpoint.setdefault(
+                endpoint, {"requests": 0, "rate_limited": 0, "seconds": 0.0, "bytes_sent": 0}
+            )
+            s["requests"] += 1
+            s["seconds"] += seconds
+            s["bytes_sent"] += sent
+            if status == 429:
+                s["rate_limited"] += 1
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {"requests": self.requests,
+                    "endpoints": {k: dict(v) for k, v in self.per_endpoint.items()}}
+
+
+# ---------------------------------------------------------------------
+# Payloads
+# ---------------------------------------------------------------------
+def fake_mp3(seed: int, size_kb: int) -> bytes:
+    rng = random.Random(seed)
+    frames = max(1, size_kb * 1024 // MP3_FRAME_LEN)
+    body = bytes(rng.getrandbits(8) for _ in range(MP3_FRAME_LEN - 4))
+    return (MP3_FRAME_HEADER + body) * frames
+
+
+def fake_png(seed: int, width: int, height: int) -> bytes:
+    """An RGB PNG with a seeded gradient, so files differ per prompt."""
+    rng = random.Random(seed)
+    r0, g0, b0 = rng.randrange(256), rng.randrange(256), rng.randrange(256)
+    rows = bytearray()
+    for y in range(height):
+        rows.append(0)  # filter: none
+        for x in range(width):
+            rows += bytes(((r0 + x) & 255, (g0 + y) & 255, (b0 + x + y) & 255))
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", ihdr)
+            + chunk(b"IDAT", zlib.compress(bytes(rows), 6)) + chunk(b"IEND", b""))
+
+
+SUBJECTS = [("Je vois", "I see"), ("Tu vois", "You see"), ("Nous voyons", "We see"), ("Elle voit", "She sees")]
+
+
+def fake_sentence(seed: int, expression: str = "") -> tuple[str, str]:
+    fr, en = SUBJECTS[seed % len(SUBJECTS)]
+    french = f"{fr} {expression or 'quelque chose'} (exemple {seed % 1000})."
+    return french, f"{en} {expression or 'something'} (example {seed % 1000})."
+
+
+def chat_content(body: dict, seed: int) -> str:
+    messages = body.get("messages") or []
+    user = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+    if not isinstance(user, str):
+        user = json.dumps(user)
+
+    if (body.get("response_format") or {}).get("type") == "json_object":
+        try:
+            request = json.loads(user)
+        except json.JSONDecodeError:
+            request = None
+        if isinstance(request, dict) and isinstance(request.get("items"), list):
+            answers = []
+            for i, item in enumerate(request["items"]):
+                expression = str(item.get("expression", ""))
+                count = int(item.get("count", 1) or 1)
+                examples = [dict(zip(("french", "english"), fake_sentence(seed + i * 31 + n, expression)))
+                            for n in range(count)]
+                answers.append({"id": item.get("id"),
+                                "english": f"[en] {item.get('french', '')}".strip(),
+                                "examples": examples})
+            return json.dumps({"items": answers}, ensure_ascii=False)
+
+        m = re.search(r"Expression:\s*(.+)", user)
+        french, english = fake_sentence(seed, m.group(1).strip() if m else "")
+        return json.dumps({"french": french, "english": english}, ensure_ascii=False)
+
+    m = re.search(r"\b(\d+)\b", user)
+    lines = min(int(m.group(1)), 10) if m else 1
+    return "\n".join(fake_sentence(seed + n)[0] for n in range(max(1, lines)))
+
+
+def _multipart_field(body: bytes, name: str) -> str:
+    m = re.search(rb'name="' + name.encode() + rb'"\r\n\r\n(.*?)\r\n', body, re.S)
+    return m.group(1).decode("utf-8", "replace") if m else ""
+
+
+# ---------------------------------------------------------------------
+# HTTP handler
+# ---------------------------------------------------------------------
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    server_version = "FakeOpenAI/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def _send(self, status: int, payload: bytes, content_type: str, extra_headers=None) -> int:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        for k, v in (extra_headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(payload)
+        return len(payload)
+
+    def _json(self, status: int, obj: dict, extra_headers=None) -> int:
+        return self._send(status, json.dumps(obj, ensure_ascii=False).encode("utf-8"),
+                          "application/json", extra_headers)
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/_stats":
+            self._json(200, self.server.stats.snapshot())
+        else:
+            self._json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+
+    def do_POST(self):
+        start = time.perf_counter()
+        cfg = self.server.config
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        endpoint = ENDPOINTS.get(self.path.split("?")[0].rstrip("/"))
+        if endpoint is None:
+            self._json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+            return
+
+        seed = int.from_bytes(hashlib.sha256(raw).digest()[:8], "big")
+        n = self.server.next_request_number()
+
+        latency = cfg.endpoint_latency_ms.get(endpoint, cfg.latency_ms)
+        jitter = random.Random(seed ^ n).uniform(-cfg.jitter_ms, cfg.jitter_ms) if cfg.jitter_ms else 0
+        time.sleep(max(0.0, latency + jitter) / 1000.0)
+
+        if cfg.rate_limit_every and n % cfg.rate_limit_every == 0:
+            sent = self._json(429, {"error": {"message": "Rate limit reached (fake)", "type": "requests",
+                                              "code": "rate_limit_exceeded"}},
+                              {"Retry-After": "0", "retry-after-ms": "50"})
+            self.server.stats.record(endpoint, 429, time.perf_counter() - start, sent)
+            return
+
+        if endpoint == "transcriptions":
+            prompt = _multipart_field(raw, "prompt")
+            text = prompt or fake_sentence(seed)[0]
+            fmt = _multipart_field(raw, "response_format") or "json"
+            if fmt == "text":
+                sent = self._send(200, text.encode("utf-8"), "text/plain; charset=utf-8")
+            else:
+                sent = self._json(200, {"text": text})
+        else:
+            body = json.loads(raw or b"{}")
+            if endpoint == "chat":
+                sent = self._json(200, self._chat_response(body, seed))
+            elif endpoint == "speech":
+                sent = self._send(200, fake_mp3(seed, cfg.mp3_kb), "audio/mpeg")
+            else:
+                w, _, h = str(body.get("size") or "1024x1024").partition("x")
+                scale = min(1.0, cfg.image_px / max(1, int(w or 1024)))
+                png = fake_png(seed, max(1, int(int(w or 1024) * scale)), max(1, int(int(h or 1024) * scale)))
+                sent = self._json(200, {"created": int(time.time()),
+                                        "data": [{"b64_json": base64.b64encode(png).decode("ascii")}]})
+
+        self.server.stats.record(endpoint, 200, time.perf_counter() - start, sent)
+
+    def _chat_response(self, body: dict, seed: int) -> dict:
+        content = chat_content(body, seed)
+        prompt_tokens = len(json.dumps(body.get("messages", []))) // 4
+        completion_tokens = max(1, len(content) // 4)
+        return {
+            "id": f"chatcmpl-fake{seed % 10**12}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int = DEFAULT_PORT, config: FakeConfig | None = None, verbose=False):
+        super().__init__(("127.0.0.1", port), FakeOpenAIHandler)
+        self.config = config or FakeConfig()
+        self.stats = FakeStats()
+        self.verbose = verbose
+        self._counter = 0
+        self._counter_lock = threading.Lock()
+
+    def next_request_number(self) -> int:
+        with self._counter_lock:
+            self._counter += 1
+            return self._counter
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def start_background(self) -> "FakeOpenAIServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def start_fake_server(port: int = 0, **config) -> FakeOpenAIServer:
+    """Start a fake server on a background thread (port 0 = any free port)."""
+    return FakeOpenAIServer(port, FakeConfig(**config)).start_background()
+
+
+def fake_client(server: FakeOpenAIServer, **kwargs):
+    """An OpenAI SDK client talking to `server`."""
+    from openai import OpenAI
+    return OpenAI(api_key="sk-fake", base_url=server.base_url, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run an offline fake of the OpenAI API.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Mean response latency")
+    parser.add_argument("--jitter-ms", type=float, default=100.0, help="Uniform +/- jitter on latency")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="Answer every Nth request with 429")
+    parser.add_argument("--mp3-kb", type=int, default=24, help="Size of generated MP3s")
+    parser.add_argument("--image-px", type=int, default=256, help="Max width of generated images")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(args.port, FakeConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, rate_limit_every=args.rate_limit_every,
+        mp3_kb=args.mp3_kb, image_px=args.image_px,
+    ), verbose=args.verbose)
+    print(f"Fake OpenAI API on {server.base_url}  (stats: http://127.0.0.1:{args.port}/_stats)")
+    print(f"  export OPENAI_BASE_URL={server.base_url} OPENAI_API_KEY=sk-fake")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
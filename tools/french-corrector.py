@@ -6,19 +6,76 @@ french-corrector.py
 
 Usage:
   python3 french-corrector.py "<student_text>"
+  python3 french-corrector.py --batch sentences.txt [--jsonl]    # one sentence per line
+  some-command | python3 french-corrector.py --batch -           # stream from stdin
+      [--batch-size 20] [--workers 4] [--rpm 60] [--prescreen]
 
 Example:
   python3 french-corrector.py "etre bien dans ses baskets"
   → être bien dans ses baskets
+
+Each sentence (whitespace and apostrophes normalised) is answered by the
+first of:
+  1. the correction cache - llm_cache.py's SQLite file, keyed by the
+     normalised sentence, so repeats never reach the API;
+  2. with --prescreen only, the local accent index (accents.py) - when every
+     word is known and unambiguous, the sentence is answered with its accents
+     restored and nothing else checked;
+  3. the model - in batch mode --batch-size sentences per JSON request with
+     at most --workers requests in flight (tools/llm_batch.py).
+
+Batch input is read --batch-size x --workers lines at a time and answered in
+order, one output line per input line, so long streams start printing early.
+With --jsonl each line is {"input", "corrected", "source"} where source is
+cache, local, model, empty or failed.
+
+The pre-screen is off by default: a dictionary lookup shows the words exist,
+not that the sentence is right ("il sont grand", "je suis aller" pass it
+unchanged), so it only suits input known to need accents alone.
 """
 
+import argparse
+import json
 import sys
 import os
+import unicodedata
 from pathlib import Path
 from dotenv import load_dotenv
 from openai import OpenAI
 
+# Shared answer cache and accent index live at the top of the repo
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from accents import get_accent_index  # noqa: E402
+from llm_batch import (  # noqa: E402
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_REQUESTS_PER_MINUTE,
+    DEFAULT_WORKERS,
+    RateLimiter,
+    run_batched,
+)
+from llm_cache import get_llm_cache, request_key  # noqa: E402
+
 MODEL = "gpt-4o-mini"
+TEMPERATURE = 0.2
+
+PROMPT = (
+    "Tu es un professeur de français corrigeant la phrase écrite par un élève. "
+    "Corrige la grammaire, l’orthographe et ajoute les accents français manquants, "
+    "sans ajouter d’explications ni de texte supplémentaire. "
+    "Renvoie seulement la phrase corrigée."
+)
+
+BATCH_PROMPT = (
+    "Tu es un professeur de français corrigeant des phrases écrites par des élèves. "
+    "Tu reçois un objet JSON {\"items\": [{\"id\", \"text\"}, ...]}. "
+    "Pour chaque phrase, corrige la grammaire, l’orthographe et ajoute les accents français manquants, "
+    "sans explications. Réponds uniquement avec "
+    "{\"items\": [{\"id\": <même id>, \"corrected\": <phrase corrigée>}, ...]}, un élément par phrase."
+)
+
+# Corrections remembered in-process, on top of the SQLite cache
+MEMO_SIZE = 10000
+
 
 def load_api_key():
     """Load OPENAI_API_KEY from ~/.env or environment."""
@@ -34,36 +91,182 @@ def load_api_key():
     return api_key
 
 
+def normalize(text: str) -> str:
+    """NFC, single spaces: the text that is corrected and shown."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(text: str) -> tuple:
+    """Cache key for a normalised sentence; ’ and ' are the same sentence."""
+    return request_key({"model": MODEL, "temperature": TEMPERATURE,
+                        "system": PROMPT, "correct": text.replace("’", "'")})
+
+
+def validate_correction(item: dict, answer: dict) -> str:
+    corrected = answer.get("corrected")
+    if not isinstance(corrected, str) or not corrected.strip():
+        raise ValueError("no corrected sentence")
+    return normalize(corrected)
+
+
+class Corrector:
+    def __init__(self, args):
+        self.args = args
+        self.cache = get_llm_cache()
+        self.accents = get_accent_index() if args.prescreen else None
+        self.limiter = RateLimiter(args.rpm)
+        self.memo = {}
+        self.counts = {"cache": 0, "local": 0, "model": 0, "empty": 0, "failed": 0}
+        self._client = None
+
+    def client(self) -> OpenAI:
+        # Only created once a sentence actually needs the API
+        if self._client is None:
+            self._client = OpenAI(api_key=load_api_key())
+        return self._client
+
+    def _cached(self, key) -> str | None:
+        if key in self.memo:
+            return self.memo[key]
+        stored = self.cache.get(key)
+        return json.loads(stored)["corrected"] if stored else None
+
+    def _remember(self, key, corrected: str):
+        if len(self.memo) < MEMO_SIZE:
+            self.memo[key] = corrected
+        self.cache.put(key, json.dumps({"corrected": corrected}, ensure_ascii=False))
+
+    def _ask_model(self, texts: dict[str, str]) -> tuple[dict[str, str], dict[str, str]]:
+        """id -> corrected for the texts the model answered, id -> error for the rest."""
+        if self.cache.mode == "replay":
+            return {}, {i: "no cached answer (LLM_CACHE_MODE=replay)" for i in texts}
+        if len(texts) == 1:
+            # One sentence: the plain prompt, no JSON envelope
+            (item_id, text), = texts.items()
+            try:
+                response = self.client().chat.completions.create(
+                    model=MODEL,
+                    messages=[
+                        {"role": "system", "content": PROMPT},
+                        {"role": "user", "content": text},
+                    ],
+                    temperature=TEMPERATURE,
+                )
+                return {item_id: normalize(response.choices[0].message.content or "")}, {}
+            except Exception as e:
+                return {}, {item_id: str(e)}
+        items = {i: {"text": t} for i, t in texts.items()}
+        return run_batched(self.client(), MODEL, BATCH_PROMPT, items, validate_correction,
+                           batch_size=self.args.batch_size, workers=self.args.workers,
+                           limiter=self.limiter, temperature=TEMPERATURE)
+
+    def correct(self, sentences: list[str]) -> list[tuple[str, str, str]]:
+        """(input, corrected, source) per sentence, in order."""
+        results = [None] * len(sentences)
+        pending = {}   # cache key -> (text, [positions])
+        for pos, sentence in enumerate(sentences):
+            text = normalize(sentence)
+            if not text:
+                results[pos] = (sentence, "", "empty")
+                continue
+            key = cache_key(text)
+            if key in pending:
+                pending[key][1].append(pos)
+                continue
+            corrected = self._cached(key)
+            if corrected is not None:
+                results[pos] = (sentence, corrected, "cache")
+                continue
+            if self.accents is not None:
+                restored, complete = self.accents.restore(text)
+                if complete:
+                    results[pos] = (sentence, restored, "local")
+                    continue
+            pending[key] = (text, [pos])
+
+        if pending:
+            keys = list(pending)
+            answers, failed = self._ask_model({str(n): pending[k][0] for n, k in enumerate(keys)})
+            for n, key in enumerate(keys):
+                text, positions = pending[key]
+                corrected = answers.get(str(n))
+                if corrected:
+                    self._remember(key, corrected)
+                    source = "model"
+                else:
+                    print(f"[ERROR] {text!r}: {failed.get(str(n), 'no answer')}", file=sys.stderr)
+                    corrected, source = text, "failed"
+                for pos in positions:
+                    results[pos] = (sentences[pos], corrected, source)
+
+        for _, _, source in results:
+            self.counts[source] += 1
+        return results
+
+
+def iter_chunks(lines, size: int):
+    chunk = []
+    for line in lines:
+        chunk.append(line.rstrip("\n"))
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def run_batch(corrector: Corrector, source: str, as_jsonl: bool):
+    f = sys.stdin if source == "-" else open(source, encoding="utf-8")
+    try:
+        for chunk in iter_chunks(f, corrector.args.batch_size * corrector.args.workers):
+            for sentence, corrected, how in corrector.correct(chunk):
+                if as_jsonl:
+                    print(json.dumps({"input": sentence, "corrected": corrected, "source": how},
+                                     ensure_ascii=False))
+                else:
+                    print(corrected)
+            sys.stdout.flush()
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+    counts = corrector.counts
+    print(f"[INFO] {sum(counts.values())} sentence(s): " + ", ".join(f"{n} {k}" for k, n in counts.items()),
+          file=sys.stderr)
+
+
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python3 french-corrector.py \"<student_text>\"")
+    parser = argparse.ArgumentParser(description="Correct French sentences written by students.")
+    parser.add_argument("text", nargs="?", help="One sentence to correct")
+    parser.add_argument("--batch", metavar="FILE", help="Correct every line of FILE ('-' for stdin)")
+    parser.add_argument("--jsonl", action="store_true", help="Batch output as JSON lines with the source")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Sentences per API request (default {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"API requests in flight (default {DEFAULT_WORKERS})")
+    parser.add_argument("--rpm", type=float, default=DEFAULT_REQUESTS_PER_MINUTE,
+                        help=f"API requests per minute (default {DEFAULT_REQUESTS_PER_MINUTE:g})")
+    parser.add_argument("--prescreen", action="store_true",
+                        help="Answer sentences whose words are all known locally, restoring accents only "
+                             "(no grammar check)")
+    args = parser.parse_args()
+
+    if (args.text is None) == (args.batch is None):
+        print("Usage: python3 french-corrector.py \"<student_text>\"  |  --batch FILE|-")
         sys.exit(1)
 
-    student_text = sys.argv[1].strip()
+    corrector = Corrector(args)
+    if args.batch is not None:
+        run_batch(corrector, args.batch, args.jsonl)
+        sys.exit(1 if corrector.counts["failed"] else 0)
+
+    student_text = args.text.strip()
     if not student_text:
         print("")
         sys.exit(0)
-
-    client = OpenAI(api_key=load_api_key())
-
-    prompt = (
-        "Tu es un professeur de français corrigeant la phrase écrite par un élève. "
-        "Corrige la grammaire, l’orthographe et ajoute les accents français manquants, "
-        "sans ajouter d’explications ni de texte supplémentaire. "
-        "Renvoie seulement la phrase corrigée."
-    )
-
-    response = client.chat.completions.create(
-        model=MODEL,
-        messages=[
-            {"role": "system", "content": prompt},
-            {"role": "user", "content": student_text},
-        ],
-        temperature=0.2,
-    )
-
-    corrected = response.choices[0].message.content.strip()
+    (_, corrected, source), = corrector.correct([student_text])
     print(corrected)
+    sys.exit(1 if source == "failed" else 0)
 
 
 if __name__ == "__main__":
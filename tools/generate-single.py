@@ -8,19 +8,42 @@ Generate a single image, MP3, and HTML flash card for a French word or idiom.
 
 Usage:
   python3 generate-single.py [--only-mp3 | --only-png] [--trial-run] "french expression"
+  python3 generate-single.py --list expressions.txt|vocab.csv [--jobs 4] [--index cards.html] [--restart]
+
+With --list, every expression in the file (one per line, or the French
+column of a vocabulary CSV) becomes a card.  Image, MP3 and examples for
+different cards run concurrently, each card's HTML is written as soon as its
+assets are ready, and --index keeps a page of finished cards up to date.
+Finished steps are recorded in generate-single.progress.jsonl, so an
+interrupted run picks up where it stopped; --restart ignores that file.
+
+Generated images are optimised in memory (optimize_image.py) and written
+once, already web-sized, with an optional <name>-<w>w.png thumbnail; the
+full-size original is kept only with --archive.
 """
 
 import os
 import sys
 import base64
+import csv
+import json
 import subprocess
+import threading
+import html as html_lib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from dotenv import load_dotenv
 from openai import OpenAI, APIError, APIConnectionError, RateLimitError
 
+from optimize_image import optimize_bytes
+
 MODEL = "gpt-image-1"
 IMAGE_SIZE = "1024x1024"
 BACKGROUND = "plain white background"
+MP3_INSTRUCTIONS = "clear, natural, use a calm woman's French voice"
+PROGRESS_FILE = Path("generate-single.progress.jsonl")
+IMAGE_MAX_KB = 64
+ARCHIVE_DIR = Path("originals")
 
 
 def load_api_key() -> str:
@@ -126,15 +149,223 @@ def build_html_page(expr: str, png: str, mp3: str, examples_html: str, footer_ht
     )
 
 
+def make_image(client: OpenAI, expr: str, png_path: Path, args) -> None:
+    """Generate, optimise in memory and write the web-ready PNG in one pass."""
+    img = generate_image(client, build_prompt(expr))
+    optimize_bytes(img, png_path, args.max_kb, thumbnail_width=args.thumbnail or None,
+                   archive_dir=ARCHIVE_DIR if args.archive else None)
+    print(f"✅ Saved {png_path}")
+
+
+def read_expressions(list_path: Path) -> list[str]:
+    """One expression per line, or the French column of a vocabulary CSV."""
+    expressions = []
+    with list_path.open(encoding="utf-8", newline="") as f:
+        if list_path.suffix.lower() == ".csv":
+            reader = csv.reader(f)
+            header = next(reader, [])
+            names = [h.strip().lower() for h in header]
+            col = names.index("french") if "french" in names else 1
+            for row in reader:
+                if len(row) > col and row[col].strip():
+                    expressions.append(row[col].strip())
+        else:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    expressions.append(line)
+    # Keep input order, drop repeats
+    return list(dict.fromkeys(expressions))
+
+
+class Progress:
+    """
+    Append-only journal of finished steps: {"expression", "step", ...} per line.
+    With restart the journal is ignored; it is only removed by clear().
+    """
+
+    def __init__(self, path: Path, restart: bool = False):
+        self.path = path
+        self.lock = threading.Lock()
+        self.done: dict[str, dict[str, dict]] = {}
+        if not restart and path.exists():
+            for line in path.read_text(encoding="utf-8").splitlines():
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line after a crash
+                self.done.setdefault(entry["expression"], {})[entry["step"]] = entry
+
+    def has(self, expr: str, step: str) -> bool:
+        return step in self.done.get(expr, {})
+
+    def get(self, expr: str, step: str) -> dict | None:
+        return self.done.get(expr, {}).get(step)
+
+    def clear(self):
+        with self.lock:
+            self.done.clear()
+            self.path.unlink(missing_ok=True)
+
+    def record(self, expr: str, step: str, **data):
+        entry = {"expression": expr, "step": step, **data}
+        with self.lock:
+            self.done.setdefault(expr, {})[step] = entry
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def write_index(index_path: Path, expressions: list[str], progress: Progress):
+    """Page linking every finished card, in input order; replaced atomically."""
+    items = []
+    for expr in expressions:
+        if progress.has(expr, "html"):
+            base = safe_filename_from_text(expr)
+            items.append(
+                f'    <li><a href="{html_lib.escape(base)}.html">'
+                f'<img src="{html_lib.escape(base)}.png" alt="" width="64" loading="lazy"> '
+                f"{html_lib.escape(expr)}</a></li>"
+            )
+    page = (
+        "<!DOCTYPE html>\n<html lang=\"fr\">\n<head>\n  <meta charset=\"utf-8\">\n"
+        f"  <title>Cartes ({len(items)}/{len(expressions)})</title>\n</head>\n<body>\n"
+        "  <ul>\n" + "\n".join(items) + "\n  </ul>\n</body>\n</html>\n"
+    )
+    tmp = index_path.with_suffix(".tmp")
+    tmp.write_text(page, encoding="utf-8")
+    os.replace(tmp, index_path)
+
+
+def build_many(expressions: list[str], args) -> int:
+    """
+    Build many cards with their image, MP3 and examples steps interleaved on
+    one pool.  A card's HTML is written by whichever of its steps finishes
+    last.  Returns the number of cards that did not complete.
+    """
+    progress = Progress(PROGRESS_FILE, restart=args.restart)
+    footer_path = Path("footer.html")
+    footer_html = footer_path.read_text(encoding="utf-8") if footer_path.exists() else "<!-- footer missing -->"
+    index_path = Path(args.index) if args.index else None
+    index_lock = threading.Lock()
+
+    cards = []
+    for expr in expressions:
+        base = safe_filename_from_text(expr)
+        steps = []
+        if not Path(f"{base}.png").exists():
+            steps.append("image")
+        if not progress.has(expr, "mp3"):
+            steps.append("mp3")
+        if not progress.has(expr, "examples"):
+            steps.append("examples")
+        if steps or not progress.has(expr, "html"):
+            cards.append((expr, base, steps))
+
+    print(f"→ {len(expressions)} expression(s), {len(cards)} card(s) to build, "
+          f"{sum(len(c[2]) for c in cards)} step(s), {args.jobs} at a time")
+    if args.trial_run:
+        for expr, base, steps in cards:
+            print(f"[TRIAL] {expr}: {', '.join(steps) or 'html only'} → {base}.html")
+        return 0
+
+    if args.restart:
+        progress.clear()
+    client = OpenAI(api_key=load_api_key())
+
+    failed = set()
+    failed_steps: dict[str, set] = {}
+    pending = {expr: len(steps) for expr, _, steps in cards}
+    pending_lock = threading.Lock()
+
+    def finish_card(expr: str, base: str):
+        if expr in failed:
+            print(f"❌ [{expr}] not written: {', '.join(sorted(failed_steps[expr]))} failed")
+            return
+        examples = progress.get(expr, "examples")
+        examples_html = examples["html"] if examples else "<!-- examples failed -->"
+        page = build_html_page(expr, f"{base}.png", f"{base}.mp3", examples_html, footer_html)
+        Path(f"{base}.html").write_text(page, encoding="utf-8")
+        if examples:
+            progress.record(expr, "html")
+        print(f"✅ [{expr}] wrote {base}.html")
+        if index_path:
+            with index_lock:
+                write_index(index_path, expressions, progress)
+
+    def run_step(expr: str, base: str, step: str):
+        try:
+            if step == "image":
+                make_image(client, expr, Path(f"{base}.png"), args)
+            elif step == "mp3":
+                proc = subprocess.run(["python3", "make_mp3_single.py", base, MP3_INSTRUCTIONS, expr],
+                                      capture_output=True, text=True)
+                if proc.returncode != 0:
+                    raise RuntimeError(proc.stderr.strip() or f"exit {proc.returncode}")
+                progress.record(expr, "mp3")
+            else:
+                proc = subprocess.run(["python3", "generate-french-examples.py", "3", expr],
+                                      capture_output=True, text=True)
+                if proc.returncode != 0:
+                    lines = proc.stderr.strip().splitlines()
+                    raise RuntimeError(lines[-1] if lines else f"exit {proc.returncode}")
+                progress.record(expr, "examples", html=proc.stdout.strip())
+            print(f"   [{expr}] {step} done")
+        except Exception as e:
+            # Examples are optional on the page; image and MP3 are not.
+            if step != "examples":
+                failed.add(expr)
+                failed_steps.setdefault(expr, set()).add(step)
+            print(f"⚠️  [{expr}] {step} failed: {e}")
+        finally:
+            with pending_lock:
+                pending[expr] -= 1
+                last = pending[expr] == 0
+            if last:
+                finish_card(expr, base)
+
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        for expr, base, steps in cards:
+            if not steps:
+                finish_card(expr, base)
+            for step in steps:
+                pool.submit(run_step, expr, base, step)
+
+    if index_path:
+        write_index(index_path, expressions, progress)
+    print(f"\nDone: {len(cards) - len(failed)} card(s) built, {len(failed)} failed.")
+    return len(failed)
+
+
 def main():
     import argparse
     parser = argparse.ArgumentParser(description="Generate a French flashcard (image, mp3, html).")
-    parser.add_argument("expression", help="French expression to generate")
+    parser.add_argument("expression", nargs="?", help="French expression to generate")
     parser.add_argument("--only-mp3", action="store_true", help="Only generate/rebuild the MP3, skipping others")
     parser.add_argument("--only-png", action="store_true", help="Only generate/rebuild the PNG, skipping others")
     parser.add_argument("--trial-run", action="store_true", help="Show what would be done without executing")
+    parser.add_argument("--list", help="Build a card for every expression in this .txt or vocabulary .csv")
+    parser.add_argument("--jobs", type=int, default=4, help="Steps run at the same time with --list (default 4)")
+    parser.add_argument("--index", help="With --list, keep this HTML page of finished cards up to date")
+    parser.add_argument("--restart", action="store_true", help="With --list, ignore the progress journal")
+    parser.add_argument("--max-kb", type=float, default=IMAGE_MAX_KB,
+                        help=f"Size budget for the card image (default {IMAGE_MAX_KB} KB)")
+    parser.add_argument("--thumbnail", type=int, default=0, metavar="WIDTH",
+                        help="Also write a <name>-<WIDTH>w.png thumbnail")
+    parser.add_argument("--archive", action="store_true",
+                        help=f"Keep the full-size generated PNG in {ARCHIVE_DIR}/")
     args = parser.parse_args()
 
+    if args.list:
+        if args.expression or args.only_mp3 or args.only_png:
+            parser.error("--list cannot be combined with an expression, --only-mp3 or --only-png")
+        list_path = Path(args.list)
+        if not list_path.exists():
+            print(f"[FATAL] List not found: {list_path}")
+            sys.exit(1)
+        sys.exit(1 if build_many(read_expressions(list_path), args) else 0)
+    if not args.expression:
+        parser.error("an expression or --list is required")
+
     expr = args.expression
     safe_text_name = safe_filename_from_text(expr)
 
@@ -158,7 +389,7 @@ def main():
     # --- ONLY MP3 MODE ---
     if args.only_mp3:
         print("🎵 Only-MP3 mode enabled.")
-        cmd = ["python3", "make_mp3_single.py", safe_text_name, "clear, natural, use a calm woman's French voice", expr]
+        cmd = ["python3", "make_mp3_single.py", safe_text_name, MP3_INSTRUCTIONS, expr]
         run_subprocess(cmd)
         print(f"✅ MP3 regenerated as {safe_text_name}.mp3 for: {expr}")
         sys.exit(0)
@@ -172,10 +403,7 @@ def main():
             print(f"[TRIAL] Would generate image for '{expr}', file {str(png_path)}")
         else:
             try:
-                img = generate_image(client, build_prompt(expr))
-                png_path.write_bytes(img)
-                print(f"✅ Saved {png_path}")
-                subprocess.run(["python3", "resize_png.py", str(png_path), "64"])
+                make_image(client, expr, png_path, args)
             except Exception as e:
                 explain_openai_error(e, "image")
                 sys.exit(2)
@@ -194,18 +422,14 @@ def main():
             print(f"[TRIAL] Would generate image for '{expr}'")
         else:
             try:
-                img = generate_image(client, build_prompt(expr))
-                png_path.write_bytes(img)
-                print(f"✅ Saved {png_path}")
-                subprocess.run(["python3", "resize_png.py", str(png_path), "64"])
+                make_image(client, expr, png_path, args)
             except Exception as e:
                 explain_openai_error(e, "image")
                 sys.exit(2)
 
     # 2️⃣ Audio
     print("⏳ Generating MP3...")
-    run_subprocess(["python3", "make_mp3_single.py", safe_text_name,
-                    "clear, natural, use a calm woman's French voice", expr])
+    run_subprocess(["python3", "make_mp3_single.py", safe_text_name, MP3_INSTRUCTIONS, expr])
 
     # 3️⃣ Examples
     print("⏳ Generating French examples...")
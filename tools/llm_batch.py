@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+llm_batch.py - Batched, concurrent JSON requests to the chat completions API
+
+Packs many small jobs (one expression to illustrate, one line to translate,
+...) into a single structured JSON request, runs several such requests at
+once under a shared rate limiter, validates every returned item on its own
+and retries only the items that failed.
+
+    items = {"0": {"french": "Je mets mon manteau."}, "1": {...}}
+    results, failed = run_batched(client, model, SYSTEM, items, validate)
+
+The model receives {"items": [{"id": "0", ...}, ...]} as the user message
+and must answer {"items": [{"id": "0", ...}, ...]}.  `validate(item, answer)`
+turns one answer into a result or raises ValueError; invalid, missing or
+errored items go round again in smaller batches, up to `max_rounds`.
+
+With an llm_cache.cached_client, only answers that parse as {"items": [...]}
+are cached, and each retry round asks under its own cache_variant: a lone
+item that failed is sent with the same payload again, and must not get the
+cached answer it failed on.
+
+Used by make-examples-1.py and build-examples-csv.py (--batch).
+"""
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from openai import OpenAI, RateLimitError
+
+logger = logging.getLogger("llm_batch")
+
+DEFAULT_BATCH_SIZE = 20
+DEFAULT_WORKERS = 4
+DEFAULT_REQUESTS_PER_MINUTE = 60
+DEFAULT_MAX_ROUNDS = 3
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket: at most `per_minute` acquisitions per minute,
+    with bursts of up to `burst`.
+    """
+
+    def __init__(self, per_minute: float, burst: int | None = None):
+        self.rate = per_minute / 60.0
+        self.capacity = float(burst or max(1, int(per_minute // 10)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def chunked(ids: list, size: int) -> list[list]:
+    return [ids[i:i + size] for i in range(0, len(ids), size)]
+
+
+def parse_items(response) -> list:
+    """The "items" list of a batch answer; ValueError if there is none."""
+    data = json.loads(response.choices[0].message.content or "")
+    items = data.get("items") if isinstance(data, dict) else None
+    if not isinstance(items, list):
+        raise ValueError("answer has no items list")
+    return items
+
+
+def request_batch(client: OpenAI, model: str, system_msg: str, batch: dict[str, dict],
+                  limiter: RateLimiter, temperature: float | None = None,
+                  max_429_retries: int = 4, round_num: int = 1) -> dict[str, dict]:
+    """
+    Send one batch and return the answers keyed by id.  429s are retried
+    here with exponential backoff; other errors propagate to the caller.
+    """
+    payload = {"items": [{"id": item_id, **item} for item_id, item in batch.items()]}
+    kwargs = {}
+    if temperature is not None:
+        kwargs["temperature"] = temperature
+    if getattr(client, "cache", None) is not None:   # llm_cache.CachedClient
+        kwargs["cache_validate"] = parse_items
+        if round_num > 1:
+            kwargs["cache_variant"] = f"retry-{round_num}"
+
+    for attempt in range(max_429_retries + 1):
+        limiter.acquire()
+        try:
+            response = client.chat.completions.create(
+                model=model,
+                response_format={"type": "json_object"},
+                messages=[
+                    {"role": "system", "content": system_msg},
+                    {"role": "user", "content": json.dumps(payload, ensure_ascii=False)},
+                ],
+                **kwargs,
+            )
+            break
+        except RateLimitError:
+            if attempt == max_429_retries:
+                raise
+            delay = 2 ** attempt
+            logger.warning("Rate limited; retrying batch of %d in %ds", len(batch), delay)
+            time.sleep(delay)
+
+    answers = {}
+    for answer in parse_items(response):
+        if isinstance(answer, dict) and "id" in answer:
+            answers[str(answer["id"])] = answer
+    return answers
+
+
+def run_batched(client: OpenAI, model: str, system_msg: str, items: dict[str, dict], validate,
+                batch_size: int = DEFAULT_BATCH_SIZE, workers: int = DEFAULT_WORKERS,
+                limiter: RateLimiter | None = None, max_rounds: int = DEFAULT_MAX_ROUNDS,
+                temperature: float | None = None):
+    """
+    Run `items` through the model in batches.
+
+    Returns (results, failed): results maps id -> validate()'s return value,
+    failed maps id -> the last error message for items that never validated.
+    """
+    limiter = limiter or RateLimiter(DEFAULT_REQUESTS_PER_MINUTE)
+    results = {}
+    failed = {}
+    pending = list(items)
+
+    for round_num in range(1, max_rounds + 1):
+        if not pending:
+            break
+        # Retries go in smaller batches: a batch that keeps failing is often
+        # one the model could not finish in a single answer.
+        size = max(1, batch_size // (2 ** (round_num - 1)))
+        batches = chunked(pending, size)
+        logger.info("Round %d: %d item(s) in %d request(s)", round_num, len(pending), len(batches))
+        pending = []
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(request_batch, client, model, system_msg,
+                            {i: items[i] for i in batch}, limiter, temperature,
+                            round_num=round_num): batch
+                for batch in batches
+            }
+            for fut in as_completed(futures):
+                batch = futures[fut]
+                try:
+                    answers = fut.result()
+                except Exception as e:
+                    logger.error("Batch of %d failed: %s", len(batch), e)
+                    for item_id in batch:
+                        failed[item_id] = str(e)
+                    pending.extend(batch)
+                    continue
+
+                for item_id in batch:
+                    answer = answers.get(item_id)
+                    try:
+                        if answer is None:
+                            raise ValueError("missing from response")
+                        results[item_id] = validate(items[item_id], answer)
+                        failed.pop(item_id, None)
+                    except (ValueError, KeyError, TypeError) as e:
+                        failed[item_id] = str(e)
+                        pending.append(item_id)
+
+    return results, failed
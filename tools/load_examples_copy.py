@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Bulk-load an examples CSV into the examples table with COPY.
+
+The CSV (as written by build-examples-csv.py) is streamed into a temporary
+staging table with a single COPY, then merged into `examples` with one
+set-based INSERT ... SELECT that skips:
+  - rows repeated inside the CSV itself
+  - rows already in the table for the same expression
+Duplicates are matched on (expression, normalized French), using the same
+normalisation as check-examples.py (see examples_sql.py).
+
+Usage:
+    python3 load_examples_copy.py examples.csv              # load
+    python3 load_examples_copy.py examples.csv --trial-run  # report only, roll back
+"""
+
+import csv
+import os
+import sys
+from pathlib import Path
+
+import psycopg
+from dotenv import load_dotenv
+
+from examples_sql import normalized_french_sql
+
+# Load environment variables
+load_dotenv('/home/ubuntu/.env')
+
+CREATE_STAGING = """
+    CREATE TEMP TABLE examples_staging (
+        expression  TEXT,
+        french      TEXT,
+        english     TEXT
+    ) ON COMMIT DROP
+"""
+
+MERGE = f"""
+    WITH incoming AS (
+        SELECT DISTINCT ON (expression, {normalized_french_sql('french')})
+               expression, french, english
+          FROM examples_staging
+         WHERE expression <> '' AND french <> '' AND english <> ''
+         ORDER BY expression, {normalized_french_sql('french')}
+    )
+    INSERT INTO examples (expression, french, english)
+    SELECT i.expression, i.french, i.english
+      FROM incoming i
+     WHERE NOT EXISTS (
+            SELECT 1
+              FROM examples e
+             WHERE e.expression = i.expression
+               AND {normalized_french_sql('e.french')}
+                 = {normalized_french_sql('i.french')}
+           )
+    -- Once the migrations are applied, the unique (expression_key, french_key)
+    -- constraint also catches case/accent variants of the expression.
+    ON CONFLICT DO NOTHING
+"""
+
+COUNT_DISTINCT_STAGED = f"""
+    SELECT count(*) FROM (
+        SELECT DISTINCT expression, {normalized_french_sql('french')}
+          FROM examples_staging
+         WHERE expression <> '' AND french <> '' AND english <> ''
+    ) d
+"""
+
+
+def iter_csv_rows(csv_path: Path):
+    """Yield (expression, french, english); skips the header and short rows."""
+    with csv_path.open("r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        for row_num, row in enumerate(reader, start=1):
+            if row_num == 1 and row and row[0].strip().lower().startswith("expression"):
+                continue
+            if len(row) < 3:
+                print(f"⚠️  Skipping row {row_num}: not enough columns")
+                continue
+            yield row[0].strip(), row[1].strip(), row[2].strip()
+
+
+def load_examples(csv_path: Path, trial_run=False):
+    dsn = os.getenv('NEON_DATABASE_URL')
+    if not dsn:
+        print("❌ NEON_DATABASE_URL not set in environment")
+        sys.exit(1)
+
+    with psycopg.connect(dsn) as conn:
+        with conn.cursor() as cur:
+            cur.execute(CREATE_STAGING)
+
+            staged = 0
+            with cur.copy("COPY examples_staging (expression, french, english) FROM STDIN") as copy:
+                for row in iter_csv_rows(csv_path):
+                    copy.write_row(row)
+                    staged += 1
+
+            cur.execute(COUNT_DISTINCT_STAGED)
+            (distinct,) = cur.fetchone()
+
+            cur.execute(MERGE)
+            inserted = cur.rowcount
+
+            if trial_run:
+                conn.rollback()
+            else:
+                conn.commit()
+
+    in_file_dupes = staged - distinct
+    already_present = distinct - inserted
+
+    print(f"\n{'='*60}")
+    print(f"{'TRIAL RUN' if trial_run else 'LOADED'}: {csv_path}")
+    print(f"  {'Rows read:':<27}{staged}")
+    print(f"  {'Duplicate/empty in file:':<27}{in_file_dupes}")
+    print(f"  {'Already in examples:':<27}{already_present}")
+    print(f"  {'Would insert:' if trial_run else 'Inserted:':<27}{inserted}")
+    print(f"{'='*60}")
+
+
+if __name__ == '__main__':
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    if len(args) != 1:
+        print(__doc__)
+        sys.exit(1)
+
+    csv_path = Path(args[0])
+    if not csv_path.exists():
+        print(f"❌ CSV file not found: {csv_path}")
+        sys.exit(1)
+
+    trial_run = '--trial-run' in sys.argv
+    if trial_run:
+        print("🔍 Running in TRIAL RUN mode - no changes will be made")
+
+    load_examples(csv_path, trial_run)
@@ -2,21 +2,50 @@
 """
 User password management script for frflashy.com
 Usage:
-    python3 manage-passwords.py list
+    python3 manage-passwords.py list [<page> [<page_size>]]
     python3 manage-passwords.py add <username> <email> <password> <tier>
     python3 manage-passwords.py del <username>
     python3 manage-passwords.py check <username> <password>
+    python3 manage-passwords.py import <users.csv> [--workers N] [--trial-run]
+    python3 manage-passwords.py export <users.csv | ->
+    python3 manage-passwords.py revoke <username | *>
+
+import reads a CSV with a username,email,password,tier header.  Every row
+needs an explicit tier, in the numbering api_app.py checks (0 GRATIS,
+1 BASIC, 2 PRO, 3 PREMIUM, 4 ADMIN, not TIER_NAMES below); rows with a blank
+tier are skipped and reported rather than given a default.  Passwords are hashed across a process pool, only
+for users not already in the table, and all new users are written with one
+COPY into a staging table plus one INSERT ... SELECT, in a single
+transaction: either the whole file is added or nothing is.  Rows repeated in
+the file or clashing with an existing username/email are skipped and
+reported.  --trial-run does everything, then rolls back.
+
+export writes id,username,email,tier,created_at (never password hashes),
+streamed through a server-side cursor.  list without a page streams the
+same way; list <page> shows one page of <page_size> users (default 50).
+
+revoke makes the user's (or, with *, everyone's) signed session claims
+re-validate against the database on their next request, for sites running
+with STATELESS_SESSIONS (see session_tokens.py); del does it too.
 """
 
+import csv
+import io
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 import psycopg2
-from werkzeug.security import generate_password_hash, check_password_hash
 from dotenv import load_dotenv
 import os
 
 # Load environment variables
 load_dotenv('/home/ubuntu/.env')
 
+# Same hashing policy as the site (PASSWORD_HASH_METHOD, read after the .env)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from password_policy import hash_password, needs_rehash, policy_method, verify_password  # noqa: E402
+from session_tokens import ALL_USERS, get_revocations  # noqa: E402
+
 # Tier constants for reference
 TIER_ADMIN   = 0
 TIER_GRATIS  = 1
@@ -24,6 +53,15 @@ TIER_BASIC   = 2
 TIER_PRO     = 3
 TIER_PREMIUM = 4
 
+TIER_NAMES = {0: 'ADMIN', 1: 'GRATIS', 2: 'BASIC', 3: 'PRO', 4: 'PREMIUM'}
+
+# Rows fetched per round trip by the server-side cursors (list, export)
+FETCH_SIZE = 1000
+PAGE_SIZE = 50
+
+IMPORT_COLUMNS = ('username', 'email', 'password', 'tier')
+EXPORT_COLUMNS = ('id', 'username', 'email', 'tier', 'created_at')
+
 def get_db_connection():
     """Get database connection"""
     try:
@@ -33,29 +71,48 @@ def get_db_connection():
         print(f"❌ Database connection failed: {e}")
         sys.exit(1)
 
-def list_users():
-    """List all users"""
+def list_users(page=None, page_size=PAGE_SIZE):
+    """List all users, or one page of them"""
     conn = get_db_connection()
-    cur = conn.cursor()
-    
-    cur.execute("SELECT id, username, email, tier, created_at FROM users ORDER BY id")
-    users = cur.fetchall()
-    
-    if not users:
-        print("No users found.")
+
+    if page is None:
+        # Server-side cursor: rows arrive FETCH_SIZE at a time, never all at once
+        cur = conn.cursor(name='list_users')
+        cur.itersize = FETCH_SIZE
+        cur.execute("SELECT id, username, email, tier, created_at FROM users ORDER BY id")
+        total = None
+    else:
+        cur = conn.cursor()
+        cur.execute("SELECT count(*) FROM users")
+        total = cur.fetchone()[0]
+        cur.execute(
+            "SELECT id, username, email, tier, created_at FROM users ORDER BY id LIMIT %s OFFSET %s",
+            (page_size, (page - 1) * page_size)
+        )
+
+    shown = 0
+    for user in cur:
+        if shown == 0:
+            print("\n" + "="*85)
+            print(f"{'ID':<5} {'Username':<20} {'Email':<30} {'Tier':<6} {'Created':<15}")
+            print("="*85)
+        user_id, username, email, tier, created_at = user
+        created_str = created_at.strftime('%Y-%m-%d') if created_at else 'N/A'
+        tier_str = str(tier) if tier is not None else 'N/A'
+        print(f"{user_id:<5} {username:<20} {email:<30} {tier_str:<6} {created_str:<15}")
+        shown += 1
+
+    if not shown:
+        print("No users found." if not total else f"No users on page {page} ({total} users).")
     else:
-        print("\n" + "="*85)
-        print(f"{'ID':<5} {'Username':<20} {'Email':<30} {'Tier':<6} {'Created':<15}")
-        print("="*85)
-        for user in users:
-            user_id, username, email, tier, created_at = user
-            created_str = created_at.strftime('%Y-%m-%d') if created_at else 'N/A'
-            tier_str = str(tier) if tier is not None else 'N/A'
-            print(f"{user_id:<5} {username:<20} {email:<30} {tier_str:<6} {created_str:<15}")
         print("="*85)
-        print(f"Total users: {len(users)}\n")
+        if page is None:
+            print(f"Total users: {shown}\n")
+        else:
+            pages = (total + page_size - 1) // page_size
+            print(f"Page {page}/{pages}: users {(page - 1) * page_size + 1}-{(page - 1) * page_size + shown} of {total}\n")
         print("Tier levels: 0=ADMIN, 1=GRATIS, 2=BASIC, 3=PRO, 4=PREMIUM\n")
-    
+
     cur.close()
     conn.close()
 
@@ -88,7 +145,7 @@ def add_user(username, email, password, tier):
         return
     
     # Hash the password
-    password_hash = generate_password_hash(password)
+    password_hash = hash_password(password)
     
     try:
         cur.execute(
@@ -96,10 +153,9 @@ def add_user(username, email, password, tier):
             (username, email, password_hash, tier)
         )
         conn.commit()
-        tier_names = {0: 'ADMIN', 1: 'GRATIS', 2: 'BASIC', 3: 'PRO', 4: 'PREMIUM'}
         print(f"✓ User '{username}' created successfully!")
         print(f"  Email: {email}")
-        print(f"  Tier: {tier} ({tier_names.get(tier, 'UNKNOWN')})")
+        print(f"  Tier: {tier} ({TIER_NAMES.get(tier, 'UNKNOWN')})")
     except Exception as e:
         print(f"❌ Error creating user: {e}")
     
@@ -133,6 +189,7 @@ def delete_user(username):
     if confirm.lower() == 'yes':
         cur.execute("DELETE FROM users WHERE username = %s", (username,))
         conn.commit()
+        get_revocations().revoke(user[0])
         print(f"✓ User '{username}' deleted successfully!")
     else:
         print("Deletion cancelled.")
@@ -158,14 +215,173 @@ def check_password(username, password):
     stored_hash = user[1]
     
     # Check if password matches
-    if check_password_hash(stored_hash, password):
+    ok, _ = verify_password(stored_hash, password)
+    if ok:
         print(f"✓ Password is CORRECT for user '{username}'")
+        if needs_rehash(stored_hash):
+            print(f"  Hash uses {stored_hash.split('$', 1)[0]}; it is upgraded to {policy_method()} at the next login")
     else:
         print(f"❌ Password is INCORRECT for user '{username}'")
     
     cur.close()
     conn.close()
 
+def revoke_sessions(username):
+    """Make a user's stateless sessions (or everyone's, for '*') re-validate"""
+    revocations = get_revocations()
+    if username == ALL_USERS:
+        revocations.revoke(ALL_USERS)
+        print(f"✓ All sessions revoked ({revocations.path})")
+        return
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute("SELECT id FROM users WHERE username = %s", (username,))
+    user = cur.fetchone()
+    cur.close()
+    conn.close()
+
+    if not user:
+        print(f"❌ Error: User '{username}' not found")
+        return
+    revocations.revoke(user[0])
+    print(f"✓ Sessions of '{username}' revoked ({revocations.path})")
+
+def read_import_csv(path):
+    """Return (rows, problems): valid (username, email, password, tier) rows and skipped-row messages"""
+    rows, problems = [], []
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        header = [h.strip().lower() for h in (reader.fieldnames or [])]
+        missing = [c for c in IMPORT_COLUMNS if c not in header]
+        if missing:
+            print(f"❌ Error: {path} has no {', '.join(missing)} column(s); expected header {','.join(IMPORT_COLUMNS)}")
+            sys.exit(1)
+        reader.fieldnames = header
+
+        seen = set()
+        for line, row in enumerate(reader, start=2):
+            username = (row['username'] or '').strip()
+            email = (row['email'] or '').strip()
+            password = row['password'] or ''
+            tier = (row['tier'] or '').strip()
+            if not username or not email or not password:
+                problems.append(f"line {line}: username, email and password are required")
+                continue
+            if not tier:
+                problems.append(f"line {line}: tier is required (0 GRATIS ... 4 ADMIN, as in api_app.py)")
+                continue
+            if not tier.isdigit() or int(tier) > 4:
+                problems.append(f"line {line}: tier must be between 0 and 4, got {tier!r}")
+                continue
+            if username in seen or email in seen:
+                problems.append(f"line {line}: '{username}' / '{email}' repeated in the file")
+                continue
+            seen.update((username, email))
+            rows.append((username, email, password, int(tier)))
+    return rows, problems
+
+def import_users(path, workers=None, trial_run=False):
+    """Add every user in a CSV file in one transaction"""
+    rows, problems = read_import_csv(path)
+    for problem in problems:
+        print(f"⚠️  Skipping {problem}")
+    if not rows:
+        print("No users to import.")
+        return
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+
+    # Hashing is the slow part, so skip users that are already there
+    cur.execute(
+        "SELECT username, email FROM users WHERE username = ANY(%s) OR email = ANY(%s)",
+        ([r[0] for r in rows], [r[1] for r in rows])
+    )
+    taken = {value for pair in cur.fetchall() for value in pair}
+    new_rows = [r for r in rows if r[0] not in taken and r[1] not in taken]
+    for username, email, _, _ in rows:
+        if username in taken or email in taken:
+            print(f"⚠️  Skipping '{username}': user or email '{email}' already exists")
+    if not new_rows:
+        print("No new users to import.")
+        cur.close()
+        conn.close()
+        return
+
+    # Password hashing is deliberately slow: spread it over every core
+    print(f"Hashing {len(new_rows)} password(s)...")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunksize = max(1, len(new_rows) // ((workers or os.cpu_count() or 1) * 4))
+        hashes = list(pool.map(hash_password, [r[2] for r in new_rows], chunksize=chunksize))
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for (username, email, _, tier), password_hash in zip(new_rows, hashes):
+        writer.writerow((username, email, password_hash, tier))
+    buffer.seek(0)
+
+    try:
+        cur.execute("""
+            CREATE TEMP TABLE users_staging (
+                username       TEXT,
+                email          TEXT,
+                password_hash  TEXT,
+                tier           INTEGER
+            ) ON COMMIT DROP
+        """)
+        cur.copy_expert("COPY users_staging (username, email, password_hash, tier) FROM STDIN WITH (FORMAT csv)", buffer)
+        # Guard again in SQL, in case a user was added since the check above
+        cur.execute("""
+            INSERT INTO users (username, email, password_hash, tier)
+            SELECT s.username, s.email, s.password_hash, s.tier
+              FROM users_staging s
+             WHERE NOT EXISTS (
+                    SELECT 1 FROM users u
+                     WHERE u.username = s.username OR u.email = s.email
+                   )
+        """)
+        inserted = cur.rowcount
+        if trial_run:
+            conn.rollback()
+            print(f"✓ Trial run: {inserted} user(s) would be created (rolled back)")
+        else:
+            conn.commit()
+            print(f"✓ {inserted} user(s) created from {path}")
+        skipped = len(problems) + len(rows) - inserted
+        if skipped:
+            print(f"  {skipped} row(s) skipped")
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error importing users, nothing was added: {e}")
+        sys.exit(1)
+    finally:
+        cur.close()
+        conn.close()
+
+def export_users(path):
+    """Write all users (without password hashes) to a CSV file, or stdout for '-'"""
+    conn = get_db_connection()
+    cur = conn.cursor(name='export_users')
+    cur.itersize = FETCH_SIZE
+    cur.execute(f"SELECT {', '.join(EXPORT_COLUMNS)} FROM users ORDER BY id")
+
+    out = sys.stdout if path == '-' else open(path, 'w', newline='', encoding='utf-8')
+    try:
+        writer = csv.writer(out)
+        writer.writerow(EXPORT_COLUMNS)
+        count = 0
+        for user_id, username, email, tier, created_at in cur:
+            writer.writerow((user_id, username, email, tier, created_at.isoformat() if created_at else ''))
+            count += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    cur.close()
+    conn.close()
+    if path != '-':
+        print(f"✓ {count} user(s) exported to {path}")
+
 def show_usage():
     """Show usage instructions"""
     print(__doc__)
@@ -178,7 +394,12 @@ def main():
     command = sys.argv[1].lower()
     
     if command == 'list':
-        list_users()
+        if len(sys.argv) > 4 or not all(a.isdigit() and int(a) > 0 for a in sys.argv[2:]):
+            print("Usage: python3 manage-passwords.py list [<page> [<page_size>]]")
+            sys.exit(1)
+        page = int(sys.argv[2]) if len(sys.argv) > 2 else None
+        page_size = int(sys.argv[3]) if len(sys.argv) > 3 else PAGE_SIZE
+        list_users(page, page_size)
     
     elif command == 'add':
         if len(sys.argv) != 6:
@@ -206,6 +427,36 @@ def main():
         password = sys.argv[3]
         check_password(username, password)
     
+    elif command == 'import':
+        args = sys.argv[2:]
+        trial_run = '--trial-run' in args
+        args = [a for a in args if a != '--trial-run']
+        workers = None
+        if '--workers' in args:
+            i = args.index('--workers')
+            if i + 1 >= len(args) or not args[i + 1].isdigit() or int(args[i + 1]) < 1:
+                print("❌ Error: --workers needs a positive number")
+                sys.exit(1)
+            workers = int(args[i + 1])
+            del args[i:i + 2]
+        if len(args) != 1:
+            print("Usage: python3 manage-passwords.py import <users.csv> [--workers N] [--trial-run]")
+            print(f"CSV header: {','.join(IMPORT_COLUMNS)}")
+            sys.exit(1)
+        import_users(args[0], workers, trial_run)
+
+    elif command == 'export':
+        if len(sys.argv) != 3:
+            print("Usage: python3 manage-passwords.py export <users.csv | ->")
+            sys.exit(1)
+        export_users(sys.argv[2])
+
+    elif command == 'revoke':
+        if len(sys.argv) != 3:
+            print("Usage: python3 manage-passwords.py revoke <username | *>")
+            sys.exit(1)
+        revoke_sessions(sys.argv[2])
+
     else:
         print(f"❌ Unknown command: {command}")
         show_usage()
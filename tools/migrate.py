@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Apply the versioned SQL migrations in tools/neon/migrations to the Neon database.
+
+Each migration is a file named NNNN_description.sql.  Applied versions are
+recorded in a schema_migrations table together with a checksum of the file,
+so running the tool again only applies what is new.  Every migration runs in
+its own transaction with its bookkeeping row, and the SQL itself is written
+to be idempotent (IF NOT EXISTS, CREATE OR REPLACE) so a half-applied schema
+can be brought forward safely.
+
+Usage:
+    python3 migrate.py               # apply pending migrations
+    python3 migrate.py --status      # list applied / pending migrations
+    python3 migrate.py --trial-run   # apply pending migrations, then roll back
+"""
+
+import hashlib
+import os
+import re
+import sys
+from pathlib import Path
+
+import psycopg
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv('/home/ubuntu/.env')
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent / "neon" / "migrations"
+MIGRATION_RE = re.compile(r"^(\d{4})_([\w-]+)\.sql$")
+
+# Any constant works; it only has to be the same for every runner.
+ADVISORY_LOCK_ID = 0x6672666C  # "frfl"
+
+CREATE_SCHEMA_MIGRATIONS = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version     INTEGER PRIMARY KEY,
+        name        TEXT NOT NULL,
+        checksum    TEXT NOT NULL,
+        applied_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+"""
+
+
+def discover_migrations(directory: Path = MIGRATIONS_DIR) -> list[tuple[int, str, Path]]:
+    """Return (version, name, path) for every migration file, sorted by version."""
+    migrations = []
+    seen = {}
+    for path in sorted(directory.glob("*.sql")):
+        m = MIGRATION_RE.match(path.name)
+        if not m:
+            print(f"⚠️  Ignoring {path.name}: expected NNNN_description.sql")
+            continue
+        version = int(m.group(1))
+        if version in seen:
+            print(f"❌ Duplicate migration version {version}: {seen[version]} and {path.name}")
+            sys.exit(1)
+        seen[version] = path.name
+        migrations.append((version, m.group(2), path))
+    return migrations
+
+
+def checksum(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def applied_migrations(cur) -> dict[int, str]:
+    cur.execute("SELECT version, checksum FROM schema_migrations ORDER BY version")
+    return dict(cur.fetchall())
+
+
+def show_status(conn, migrations):
+    with conn.cursor() as cur:
+        cur.execute(CREATE_SCHEMA_MIGRATIONS)
+        applied = applied_migrations(cur)
+    conn.commit()
+
+    for version, name, path in migrations:
+        if version not in applied:
+            state = "pending"
+        elif applied[version] != checksum(path):
+            state = "applied (file changed since)"
+        else:
+            state = "applied"
+        print(f"  {version:04d}  {name:<40} {state}")
+
+
+def run_migrations(conn, migrations, trial_run=False) -> int:
+    """Apply every pending migration; return how many were applied."""
+    with conn.cursor() as cur:
+        cur.execute(CREATE_SCHEMA_MIGRATIONS)
+        conn.commit()
+
+        # Serialise concurrent runners; released when the session ends.
+        cur.execute("SELECT pg_advisory_lock(%s)", (ADVISORY_LOCK_ID,))
+        applied = applied_migrations(cur)
+        conn.commit()
+
+        for version, name, path in migrations:
+            if version in applied and applied[version] != checksum(path):
+                print(f"⚠️  {path.name} was edited after it was applied; "
+                      f"add a new migration instead of changing old ones")
+
+        pending = [m for m in migrations if m[0] not in applied]
+        if not pending:
+            print("✅ Database schema is up to date")
+            return 0
+
+        for version, name, path in pending:
+            print(f"{'Would apply' if trial_run else 'Applying'} {path.name} ...")
+            try:
+                cur.execute(path.read_text(encoding="utf-8"))
+                cur.execute(
+                    "INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+                    (version, name, checksum(path)),
+                )
+            except psycopg.Error as e:
+                conn.rollback()
+                print(f"❌ {path.name} failed, rolled back: {e}")
+                sys.exit(1)
+
+            if trial_run:
+                # Later migrations may depend on this one, so keep going
+                # inside the same transaction and roll back at the end.
+                continue
+            conn.commit()
+            print(f"✅ Applied {path.name}")
+
+        if trial_run:
+            conn.rollback()
+            print(f"🔍 TRIAL RUN: {len(pending)} migration(s) applied cleanly and rolled back")
+
+    return len(pending)
+
+
+if __name__ == '__main__':
+    dsn = os.getenv('NEON_DATABASE_URL')
+    if not dsn:
+        print("❌ NEON_DATABASE_URL not set in environment")
+        sys.exit(1)
+
+    migrations = discover_migrations()
+    with psycopg.connect(dsn) as conn:
+        if '--status' in sys.argv:
+            show_status(conn, migrations)
+        else:
+            run_migrations(conn, migrations, trial_run='--trial-run' in sys.argv)
@@ -0,0 +1,8 @@
+-- get_examples filters on expression and orders by id; a composite index
+-- answers both from the index.  It also covers plain lookups on expression,
+-- so the old single-column index is dropped.
+
+CREATE INDEX IF NOT EXISTS idx_examples_expression_id
+  ON examples (expression, id);
+
+DROP INDEX IF EXISTS idx_examples_expression;
@@ -0,0 +1,18 @@
+-- Accent-folded, lowercased, whitespace-collapsed lookup key, so
+-- "Le Manteau", "le  manteau" and "le mânteau" all find the same examples.
+-- Keep fold_french in step with fold_sql() in tools/examples_sql.py.
+
+CREATE OR REPLACE FUNCTION fold_french(t TEXT) RETURNS TEXT
+  LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE
+AS $$
+  SELECT btrim(regexp_replace(
+    lower(replace(replace(replace(replace(translate(t, 'àâäáãåçéèêëíìîïñóòôöõúùûüýÿÀÂÄÁÃÅÇÉÈÊËÍÌÎÏÑÓÒÔÖÕÚÙÛÜÝŸ', 'aaaaaaceeeeiiiinooooouuuuyyAAAAAACEEEEIIIINOOOOOUUUUYY'), 'œ', 'oe'), 'Œ', 'OE'), 'æ', 'ae'), 'Æ', 'AE')),
+    '\s+', ' ', 'g'))
+$$;
+
+ALTER TABLE examples
+  ADD COLUMN IF NOT EXISTS expression_key TEXT
+  GENERATED ALWAYS AS (fold_french(expression)) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_examples_expression_key_id
+  ON examples (expression_key, id);
@@ -0,0 +1,32 @@
+-- One row per (expression_key, normalized French sentence).  Sentences are
+-- compared with punctuation dropped and apostrophes treated as spaces, the
+-- same rule check-examples.py uses (normalized_french_sql() in
+-- tools/examples_sql.py).  Existing duplicates are removed first, keeping
+-- the lowest id, so the constraint can be added.
+
+CREATE OR REPLACE FUNCTION normalize_french(t TEXT) RETURNS TEXT
+  LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE
+AS $$
+  SELECT btrim(regexp_replace(
+    regexp_replace(regexp_replace(fold_french(t), '[''’]', ' ', 'g'), '[[:punct:]«»…“”]', '', 'g'),
+    '\s+', ' ', 'g'))
+$$;
+
+ALTER TABLE examples
+  ADD COLUMN IF NOT EXISTS french_key TEXT
+  GENERATED ALWAYS AS (normalize_french(french)) STORED;
+
+DELETE FROM examples e
+ USING examples k
+ WHERE k.expression_key = e.expression_key
+   AND k.french_key = e.french_key
+   AND k.id < e.id;
+
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'examples_unique_sentence') THEN
+    ALTER TABLE examples
+      ADD CONSTRAINT examples_unique_sentence UNIQUE (expression_key, french_key);
+  END IF;
+END
+$$;
@@ -0,0 +1,28 @@
+-- Forgiving /examples lookups: "manteau", "un manteau" and "le  mantaeu"
+-- should all find the examples stored for "le manteau".
+--
+-- match_french() is fold_french() with apostrophes read as spaces and one
+-- leading article dropped ("l'imperméable" -> "impermeable").  expression_match
+-- holds it per row, with a btree index for equality and a pg_trgm GIN index
+-- for similarity (%) matches.  get_examples in api_app.py tries
+-- expression_key, then expression_match, then the trigram match.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE OR REPLACE FUNCTION match_french(t TEXT) RETURNS TEXT
+  LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE
+AS $$
+  SELECT regexp_replace(
+    btrim(regexp_replace(regexp_replace(fold_french(t), '[''’]', ' ', 'g'), '\s+', ' ', 'g')),
+    '^(le|la|les|l|un|une|des|du|de la|de l|d) ', '')
+$$;
+
+ALTER TABLE examples
+  ADD COLUMN IF NOT EXISTS expression_match TEXT
+  GENERATED ALWAYS AS (match_french(expression)) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_examples_expression_match
+  ON examples (expression_match);
+
+CREATE INDEX IF NOT EXISTS idx_examples_expression_match_trgm
+  ON examples USING gin (expression_match gin_trgm_ops);
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+optimize_all_images.py - Bulk image optimisation over the vocabulary directories
+
+Walks static/*-vocabulary, secondpage and static/stories, and runs
+optimize_image.py's optimiser on every PNG across a process pool.  Files whose
+SHA-256 is already in their directory's .optimize-manifest.json (either as an
+input or as an output we produced) are skipped without being decoded.
+
+Usage:
+  python3 tools/optimize_all_images.py [--max-kb KB] [--jobs N] [--formats png,webp] [--dry-run] [dir ...]
+
+Examples:
+  python3 tools/optimize_all_images.py                 # all default dirs, 100 KB
+  python3 tools/optimize_all_images.py --max-kb 64 static/vetements-vocabulary
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from optimize_image import (
+    DEFAULT_MIN_PSNR,
+    FORMAT_EXT,
+    VARIANT_RE,
+    already_optimized,
+    file_sha256,
+    load_manifest,
+    optimize_file,
+    save_manifest,
+)
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_MAX_KB = 100
+
+
+def default_directories() -> list[Path]:
+    dirs = sorted((BASE_DIR / "static").glob("*-vocabulary"))
+    dirs.append(BASE_DIR / "secondpage")
+    dirs.append(BASE_DIR / "static" / "stories")
+    return [d for d in dirs if d.is_dir()]
+
+
+def find_pngs(directories) -> dict[Path, list[Path]]:
+    """Map each directory containing PNGs to its PNG files (recursively)."""
+    found = {}
+    for directory in directories:
+        for png in sorted(directory.rglob("*.png")):
+            # Skip temp files and responsive variants (build_image_variants.py)
+            if png.stem.endswith("_temp") or VARIANT_RE.search(png.stem):
+                continue
+            found.setdefault(png.parent, []).append(png)
+    return found
+
+
+def _display(path: Path) -> Path:
+    try:
+        return path.relative_to(BASE_DIR)
+    except ValueError:
+        return path
+
+
+def _worker(path: str, max_kb: float, formats: tuple, min_psnr: float, backup: bool) -> dict:
+    # Each worker gets a throwaway manifest; the parent owns the real ones.
+    return optimize_file(path, max_kb, formats=formats, min_psnr=min_psnr, backup=backup,
+                         manifest={}, verbose=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Optimise every PNG in the vocabulary directories.")
+    parser.add_argument("dirs", nargs="*", help="Directories to scan (default: vocabulary, secondpage, stories)")
+    parser.add_argument("--max-kb", type=float, default=DEFAULT_MAX_KB,
+                        help=f"Target maximum size in KB (default {DEFAULT_MAX_KB})")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--formats", default="png", help="Comma-separated formats: png,webp,avif")
+    parser.add_argument("--min-psnr", type=float, default=DEFAULT_MIN_PSNR, help="Quality floor in dB")
+    parser.add_argument("--no-backup", action="store_true", help="Do not keep <file>.png.bak")
+    parser.add_argument("--dry-run", action="store_true", help="Only list files that would be optimised")
+    args = parser.parse_args()
+
+    formats = tuple(f.strip().lower() for f in args.formats.split(",") if f.strip())
+    if "png" not in formats or any(f not in FORMAT_EXT for f in formats):
+        print(f"ERROR: --formats must include png and only use {', '.join(FORMAT_EXT)}")
+        sys.exit(1)
+
+    directories = [Path(d).resolve() for d in args.dirs] if args.dirs else default_directories()
+    for d in directories:
+        if not d.is_dir():
+            print(f"ERROR: Directory '{d}' does not exist!")
+            sys.exit(1)
+
+    print("=" * 60)
+    print(f"Bulk Image Optimiser - max {args.max_kb} KB, {args.jobs} worker(s)")
+    print("=" * 60)
+
+    by_dir = find_pngs(directories)
+    manifests = {d: load_manifest(d) for d in by_dir}
+
+    # Hashing is cheap compared with encoding, so the skip check runs here.
+    todo = []
+    skipped = 0
+    for directory, pngs in by_dir.items():
+        for png in pngs:
+            digest = file_sha256(png)
+            if already_optimized(manifests[directory], digest) is not None:
+                skipped += 1
+            else:
+                todo.append((png, digest))
+
+    print(f"Found {skipped + len(todo)} PNG(s): {skipped} already optimised, {len(todo)} to do")
+    if args.dry_run:
+        for png, _ in todo:
+            print(f"  would optimise {_display(png)}")
+        return
+    if not todo:
+        print("✓ Nothing to do.")
+        return
+
+    start = time.time()
+    before = after = 0
+    failed = []
+    dirty = set()
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = {
+            pool.submit(_worker, str(png), args.max_kb, formats, args.min_psnr, not args.no_backup): (png, digest)
+            for png, digest in todo
+        }
+        for done, fut in enumerate(as_completed(futures), start=1):
+            png, digest = futures[fut]
+            rel = _display(png)
+            try:
+                entry = fut.result()
+            except Exception as e:
+                failed.append((rel, e))
+                print(f"  [{done}/{len(todo)}] ❌ {rel}: {e}")
+                continue
+            manifests[png.parent][digest] = entry
+            dirty.add(png.parent)
+            before += entry["original_bytes"]
+            after += entry["bytes"]
+            print(f"  [{done}/{len(todo)}] ✓ {rel}: "
+                  f"{entry['original_bytes'] / 1024:.1f} KB → {entry['bytes'] / 1024:.1f} KB")
+
+    for directory in dirty:
+        save_manifest(directory, manifests[directory])
+
+    elapsed = time.time() - start
+    saved = before - after
+    print("\n" + "=" * 60)
+    print("SUMMARY:")
+    print(f"  Optimised:     {len(todo) - len(failed)}")
+    print(f"  Skipped:       {skipped}")
+    print(f"  Failed:        {len(failed)}")
+    print(f"  Bytes before:  {before / 1024 / 1024:.2f} MB")
+    print(f"  Bytes after:   {after / 1024 / 1024:.2f} MB")
+    if before:
+        print(f"  Saved:         {saved / 1024 / 1024:.2f} MB ({saved / before * 100:.1f}%)")
+    print(f"  Elapsed:       {elapsed:.1f}s")
+    print("=" * 60)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
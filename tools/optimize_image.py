@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+optimize_image.py - Budget-driven image optimiser for flashcard PNGs
+
+Resizes to 4" wide at 96 DPI (like resize_png-2.py), then binary-searches
+the PNG palette size and the WebP/AVIF quality for the smallest encoding
+that still meets a PSNR quality floor.  The PNG result replaces the input
+(original kept as .bak), unless the input already fits the budget and the
+result is no smaller; WebP/AVIF results are written next to it only when
+they beat the PNG.
+
+Results are recorded in .optimize-manifest.json (per directory), keyed by
+the SHA-256 of the input, so the same image is never optimised twice.
+
+Usage: python optimize_image.py <input.png> <fileMAX_kb> [--min-psnr 35] [--formats png,webp,avif]
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import math
+import os
+import re
+import shutil
+import sys
+import threading
+from pathlib import Path
+
+from PIL import Image, ImageChops, ImageStat
+
+MANIFEST_NAME = ".optimize-manifest.json"
+
+DEFAULT_MIN_PSNR = 35.0      # dB; below ~32 banding/blocking becomes visible
+DEFAULT_WIDTH_INCHES = 4
+DEFAULT_DPI = 96
+MIN_SCALE = 0.5              # never shrink below half the 4" width to hit a budget
+
+FORMAT_EXT = {"png": ".png", "webp": ".webp", "avif": ".avif"}
+
+# Responsive variants are written as <stem>-<width>w.<ext>, e.g. la-cuillère-320w.webp
+VARIANT_WIDTHS = (160, 320, 480, 640)
+VARIANT_RE = re.compile(r"-\d+w$")
+
+# optimize_bytes() may run on several threads writing into one directory.
+_manifest_lock = threading.Lock()
+
+
+# ---------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------
+def file_sha256(path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def avif_supported() -> bool:
+    """AVIF needs Pillow >= 11.2 or the pillow-avif-plugin package."""
+    try:
+        import pillow_avif  # noqa: F401
+    except ImportError:
+        pass
+    return ".avif" in Image.registered_extensions()
+
+
+def flatten(img: Image.Image) -> Image.Image:
+    """RGB view of img, alpha composited onto white (our card background)."""
+    if img.mode in ("RGBA", "LA", "P"):
+        img = img.convert("RGBA")
+        bg = Image.new("RGBA", img.size, (255, 255, 255, 255))
+        return Image.alpha_composite(bg, img).convert("RGB")
+    return img.convert("RGB")
+
+
+def psnr(reference: Image.Image, candidate: Image.Image) -> float:
+    """Peak signal-to-noise ratio in dB between two same-sized images."""
+    diff = ImageChops.difference(flatten(reference), flatten(candidate))
+    rms = ImageStat.Stat(diff).rms
+    mse = sum(r * r for r in rms) / len(rms)
+    if mse == 0:
+        return math.inf
+    return 20 * math.log10(255.0 / math.sqrt(mse))
+
+
+def encode(img: Image.Image, fmt: str, quality: int | None = None, colors: int | None = None) -> bytes:
+    buf = io.BytesIO()
+    if fmt == "png":
+        if colors:
+            method = Image.Quantize.FASTOCTREE if img.mode == "RGBA" else Image.Quantize.MEDIANCUT
+            img = img.quantize(colors=colors, method=method)
+        img.save(buf, "PNG", optimize=True)
+    elif fmt == "webp":
+        img.save(buf, "WEBP", quality=quality, method=6)
+    elif fmt == "avif":
+        img.save(buf, "AVIF", quality=quality)
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+    return buf.getvalue()
+
+
+def _candidate(img, fmt, data, quality=None, colors=None):
+    decoded = Image.open(io.BytesIO(data))
+    return {
+        "format": fmt,
+        "data": data,
+        "bytes": len(data),
+        "quality": quality,
+        "colors": colors,
+        "psnr": psnr(img, decoded),
+        "size": img.size,
+    }
+
+
+def _search(lo: int, hi: int, make):
+    """
+    Binary search the smallest setting in [lo, hi] whose candidate meets the
+    floor.  make(setting) returns a candidate or None if below the floor.
+    Quality (and palette size) are monotonic, so ~log2(hi-lo) encodes suffice.
+    """
+    best = None
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        cand = make(mid)
+        if cand is not None:
+            best = cand
+            hi = mid - 1
+        else:
+            lo = mid + 1
+    return best
+
+
+def best_for_format(img: Image.Image, fmt: str, min_psnr: float):
+    """Smallest encoding of img in fmt that meets min_psnr, or None."""
+    def floor_ok(cand):
+        return cand if cand["psnr"] >= min_psnr else None
+
+    if fmt == "png":
+        lossless = _candidate(img, "png", encode(img, "png"))
+        quantized = _search(2, 256, lambda c: floor_ok(_candidate(img, "png", encode(img, "png", colors=c), colors=c)))
+        if quantized and quantized["bytes"] < lossless["bytes"]:
+            return quantized
+        return lossless
+
+    return _search(1, 100, lambda q: floor_ok(_candidate(img, fmt, encode(img, fmt, quality=q), quality=q)))
+
+
+def optimize(img: Image.Image, target_kb: float, formats=("png",), min_psnr: float = DEFAULT_MIN_PSNR,
+             target_width: int = DEFAULT_WIDTH_INCHES * DEFAULT_DPI) -> dict:
+    """
+    Optimise an in-memory image.
+
+    Returns {"png": cand, "webp": cand, ...} for each format that could meet
+    the floor, where cand has keys format, data, bytes, quality, colors,
+    psnr and size.  If nothing fits target_kb at full width, the width is
+    binary searched down (to MIN_SCALE) rather than shrunk step by step.
+    """
+    budget = target_kb * 1024
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA")
+    width, height = img.size
+    full_w = min(target_width, width)
+
+    def at_width(w):
+        h = max(1, round(height * w / width))
+        resized = img.resize((w, h), Image.Resampling.LANCZOS) if (w, h) != img.size else img.copy()
+        out = {}
+        for fmt in formats:
+            cand = best_for_format(resized, fmt, min_psnr)
+            if cand:
+                out[fmt] = cand
+        return out
+
+    def smallest(results):
+        return min((c["bytes"] for c in results.values()), default=math.inf)
+
+    results = at_width(full_w)
+    if smallest(results) <= budget:
+        return results
+
+    # Widest width that fits the budget (bytes grow with width).
+    lo, hi = int(full_w * MIN_SCALE), full_w - 1
+    fitted = None
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        trial = at_width(mid)
+        if smallest(trial) <= budget:
+            fitted = trial
+            lo = mid + 1
+        else:
+            hi = mid - 1
+    return fitted or results
+
+
+def make_variants(img: Image.Image, widths=VARIANT_WIDTHS, formats=("png", "webp"),
+                  min_psnr: float = DEFAULT_MIN_PSNR) -> list[dict]:
+    """
+    Smallest floor-meeting encoding of img at each width (capped at the
+    source width) in each format.  Returns candidates with an extra "width".
+    """
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA")
+    width, height = img.size
+    targets = sorted({min(w, width) for w in widths})
+
+    variants = []
+    for w in targets:
+        h = max(1, round(height * w / width))
+        resized = img.resize((w, h), Image.Resampling.LANCZOS) if w != width else img
+        for fmt in formats:
+            cand = best_for_format(resized, fmt, min_psnr)
+            if cand:
+                cand["width"] = w
+                variants.append(cand)
+    return variants
+
+
+def variant_path(path: Path, width: int, fmt: str) -> Path:
+    return path.with_name(f"{path.stem}-{width}w{FORMAT_EXT[fmt]}")
+
+
+# ---------------------------------------------------------------------
+# Manifest
+# ---------------------------------------------------------------------
+def load_manifest(directory: Path) -> dict:
+    path = directory / MANIFEST_NAME
+    if path.exists():
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            print(f"⚠️  Ignoring unreadable manifest {path}")
+    return {}
+
+
+def save_manifest(directory: Path, manifest: dict) -> None:
+    path = directory / MANIFEST_NAME
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def already_optimized(manifest: dict, digest: str) -> dict | None:
+    """Entry for digest if it is either a known input or a file we produced."""
+    if digest in manifest:
+        return manifest[digest]
+    for entry in manifest.values():
+        if entry.get("output_sha256") == digest:
+            return entry
+    return None
+
+
+# ---------------------------------------------------------------------
+# File-level entry point
+# ---------------------------------------------------------------------
+def optimize_file(input_path, target_kb: float, formats=("png",), min_psnr: float = DEFAULT_MIN_PSNR,
+                  backup: bool = True, manifest: dict | None = None, verbose: bool = True) -> dict:
+    """
+    Optimise input_path in place and write smaller WebP/AVIF siblings.
+
+    Returns the manifest entry.  When manifest is None the directory's
+    manifest is loaded and saved here; callers processing many files can
+    pass their own dict and save it once.
+    """
+    input_path = Path(input_path)
+    directory = input_path.parent
+    own_manifest = manifest is None
+    if own_manifest:
+        manifest = load_manifest(directory)
+
+    digest = file_sha256(input_path)
+    entry = already_optimized(manifest, digest)
+    if entry is not None:
+        if verbose:
+            print(f"✓ {input_path.name}: already optimised (manifest hit), skipping")
+        return entry
+
+    original_bytes = input_path.stat().st_size
+    with Image.open(input_path) as im:
+        im.load()
+        img = im.copy()
+
+    if "avif" in formats and not avif_supported():
+        print("⚠️  AVIF not supported by this Pillow build, skipping AVIF")
+        formats = tuple(f for f in formats if f != "avif")
+
+    results = optimize(img, target_kb, formats=formats, min_psnr=min_psnr)
+    if "png" not in results:
+        raise RuntimeError(f"No PNG encoding of {input_path} met PSNR {min_psnr}")
+
+    # Already within budget and the re-encode is no smaller: keep the file as is.
+    keep = original_bytes <= target_kb * 1024 and results["png"]["bytes"] >= original_bytes
+    if keep:
+        results["png"] = {"data": None, "bytes": original_bytes, "size": img.size, "colors": None,
+                          "psnr": math.inf}
+    elif backup:
+        shutil.copy2(input_path, f"{input_path}.bak")
+    entry = write_results(input_path, results, original_bytes, target_kb, min_psnr, verbose, keep_png=keep)
+    manifest[digest] = entry
+    if own_manifest:
+        save_manifest(directory, manifest)
+    return entry
+
+
+def write_results(output_path: Path, results: dict, original_bytes: int, target_kb: float,
+                  min_psnr: float, verbose: bool = True, keep_png: bool = False) -> dict:
+    """
+    Write optimize()'s PNG to output_path (atomically) and any smaller
+    WebP/AVIF siblings; return the manifest entry describing them.  With
+    keep_png the PNG already at output_path is left untouched.
+    """
+    output_path = Path(output_path)
+    png = results["png"]
+    if not keep_png:
+        tmp_path = output_path.with_name(output_path.stem + "_temp.png")
+        tmp_path.write_bytes(png["data"])
+        os.replace(tmp_path, output_path)
+
+    alternates = {}
+    for fmt, cand in results.items():
+        if fmt == "png" or cand["bytes"] >= png["bytes"]:
+            continue
+        alt_path = output_path.with_suffix(FORMAT_EXT[fmt])
+        alt_path.write_bytes(cand["data"])
+        alternates[fmt] = {"file": alt_path.name, "bytes": cand["bytes"], "quality": cand["quality"],
+                           "psnr": round(cand["psnr"], 2)}
+
+    entry = {
+        "file": output_path.name,
+        "output_sha256": file_sha256(output_path),
+        "original_bytes": original_bytes,
+        "bytes": png["bytes"],
+        "size": list(png["size"]),
+        "colors": png["colors"],
+        "psnr": None if math.isinf(png["psnr"]) else round(png["psnr"], 2),
+        "target_kb": target_kb,
+        "min_psnr": min_psnr,
+        "alternates": alternates,
+    }
+
+    if verbose and keep_png:
+        print(f"✓ {output_path.name}: {original_bytes / 1024:.1f} KB, within budget and no smaller "
+              "re-encoded; kept as is")
+    elif verbose:
+        w, h = png["size"]
+        print(f"✓ {output_path.name}: {original_bytes / 1024:.1f} KB → {png['bytes'] / 1024:.1f} KB "
+              f"({w}x{h}, {png['colors'] or 'lossless'} colors, PSNR {entry['psnr'] or '∞'} dB)")
+        for fmt, alt in alternates.items():
+            print(f"  + {alt['file']}: {alt['bytes'] / 1024:.1f} KB (q={alt['quality']}, PSNR {alt['psnr']} dB)")
+        if png["bytes"] > target_kb * 1024 and not alternates:
+            print(f"  ⚠️  Still above {target_kb} KB at the quality floor")
+    return entry
+
+
+def optimize_bytes(data: bytes, output_path, target_kb: float, formats=("png",),
+                   min_psnr: float = DEFAULT_MIN_PSNR, thumbnail_width: int | None = None,
+                   archive_dir=None, verbose: bool = True) -> dict:
+    """
+    Optimise freshly generated image bytes straight to output_path.
+
+    The full-size image is decoded in memory and never written unless
+    archive_dir is given.  The result is recorded in the directory manifest
+    under the hash of the original bytes, so later optimize_all_images runs
+    skip it.  With thumbnail_width, a <stem>-<w>w.png thumbnail is written
+    next to it.
+    """
+    output_path = Path(output_path)
+    directory = output_path.parent
+    digest = hashlib.sha256(data).hexdigest()
+
+    if archive_dir is not None:
+        archive_dir = Path(archive_dir)
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        (archive_dir / output_path.name).write_bytes(data)
+
+    with Image.open(io.BytesIO(data)) as im:
+        im.load()
+        img = im.copy()
+
+    if "avif" in formats and not avif_supported():
+        formats = tuple(f for f in formats if f != "avif")
+
+    results = optimize(img, target_kb, formats=formats, min_psnr=min_psnr)
+    if "png" not in results:
+        raise RuntimeError(f"No PNG encoding for {output_path.name} met PSNR {min_psnr}")
+    entry = write_results(output_path, results, len(data), target_kb, min_psnr, verbose)
+
+    if thumbnail_width:
+        w, h = img.size
+        thumb = flatten(img) if img.mode not in ("RGB", "RGBA") else img
+        thumb = thumb.resize((thumbnail_width, max(1, round(h * thumbnail_width / w))),
+                             Image.Resampling.LANCZOS)
+        cand = best_for_format(thumb, "png", min_psnr)
+        thumb_path = variant_path(output_path, thumbnail_width, "png")
+        thumb_path.write_bytes(cand["data"] if cand else encode(thumb, "png"))
+        entry["thumbnail"] = thumb_path.name
+        if verbose:
+            print(f"  + {thumb_path.name}: {thumb_path.stat().st_size / 1024:.1f} KB thumbnail")
+
+    with _manifest_lock:
+        manifest = load_manifest(directory)
+        manifest[digest] = entry
+        save_manifest(directory, manifest)
+    return entry
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Optimise a PNG to a KB budget with a quality floor.")
+    parser.add_argument("input", help="Input PNG file")
+    parser.add_argument("max_kb", type=float, help="Target maximum size in KB")
+    parser.add_argument("--min-psnr", type=float, default=DEFAULT_MIN_PSNR,
+                        help=f"Quality floor in dB (default {DEFAULT_MIN_PSNR})")
+    parser.add_argument("--formats", default="png",
+                        help="Comma-separated formats to try: png,webp,avif (default png)")
+    parser.add_argument("--no-backup", action="store_true", help="Do not keep <input>.bak")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"ERROR: File '{args.input}' not found!")
+        sys.exit(1)
+    if not args.input.lower().endswith(".png"):
+        print("ERROR: File must be a PNG image!")
+        sys.exit(1)
+    if args.max_kb <= 0:
+        print("ERROR: fileMAX_kb must be positive")
+        sys.exit(1)
+
+    formats = tuple(f.strip().lower() for f in args.formats.split(",") if f.strip())
+    unknown = [f for f in formats if f not in FORMAT_EXT]
+    if unknown or "png" not in formats:
+        print(f"ERROR: --formats must include png and only use {', '.join(FORMAT_EXT)}")
+        sys.exit(1)
+
+    print("=" * 60)
+    print(f"Image Optimiser - Target: 4\" wide, max {args.max_kb} KB, PSNR ≥ {args.min_psnr} dB")
+    print("=" * 60)
+
+    optimize_file(args.input, args.max_kb, formats=formats, min_psnr=args.min_psnr, backup=not args.no_backup)
+
+
+if __name__ == "__main__":
+    main()